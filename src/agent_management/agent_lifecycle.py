@@ -1,53 +1,196 @@
 # orbital-agent/src/agent_management/agent_lifecycle.py
 import logging
+import math
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from .agent_registry import DEFAULT_METRIC_FIELDS, AgentRegistry, AgentStatus, AgentStatusView
 
 logger = logging.getLogger(__name__)
 
 @dataclass
-class AgentStatus:
-    last_heartbeat: datetime
-    resource_usage: dict
-    active: bool = True
-    retry_count: int = 0
+class RecoveryState:
+    attempts: int = 0
+    next_attempt: float = 0.0
+    in_flight: bool = False
+
+class HeartbeatWheel:
+    """Hashed timing wheel of agent deadlines on the monotonic clock
+
+    Agents sit in the bucket of the first tick at or after their deadline.
+    A heartbeat moves the agent to a later bucket in O(1), so advancing the
+    wheel only visits agents whose deadline actually passed. Deadlines never lie more
+    than a few check intervals ahead, so one level is enough.
+    """
+
+    def __init__(self, resolution: float, now: float):
+        self.resolution = resolution
+        self.buckets: Dict[int, Set[str]] = {}
+        self.slot_of: Dict[str, int] = {}
+        self.cursor = self._slot(now)
+
+    def _slot(self, t: float) -> int:
+        return int(t // self.resolution)
+
+    def schedule(self, agent_id: str, deadline: float):
+        slot = max(math.ceil(deadline / self.resolution), self.cursor)
+        old = self.slot_of.get(agent_id)
+        if old == slot:
+            return
+        if old is not None:
+            self._discard(agent_id, old)
+        self.buckets.setdefault(slot, set()).add(agent_id)
+        self.slot_of[agent_id] = slot
+
+    def schedule_many(self, agent_ids: Iterable[str], deadline: float):
+        """Move a batch of agents that share one deadline into its bucket"""
+        slot = max(math.ceil(deadline / self.resolution), self.cursor)
+        moved: Dict[int, List[str]] = {}
+        for agent_id in agent_ids:
+            old = self.slot_of.get(agent_id)
+            if old != slot:
+                moved.setdefault(old, []).append(agent_id)
+        if not moved:
+            return
+
+        bucket = self.buckets.setdefault(slot, set())
+        for old, group in moved.items():
+            if old is not None and old in self.buckets:
+                self.buckets[old].difference_update(group)
+                if not self.buckets[old]:
+                    del self.buckets[old]
+            bucket.update(group)
+            self.slot_of.update(dict.fromkeys(group, slot))
+
+    def cancel(self, agent_id: str):
+        old = self.slot_of.pop(agent_id, None)
+        if old is not None:
+            self._discard(agent_id, old)
+
+    def advance(self, now: float) -> List[str]:
+        """Pop every agent whose deadline is at or before ``now``"""
+        target = self._slot(now)
+        if target - self.cursor > len(self.buckets):
+            due = sorted(slot for slot in self.buckets if slot <= target)
+        else:
+            due = range(self.cursor, target + 1)
+        expired: List[str] = []
+        for slot in due:
+            bucket = self.buckets.pop(slot, None)
+            if bucket:
+                for agent_id in bucket:
+                    del self.slot_of[agent_id]
+                expired.extend(bucket)
+        self.cursor = max(self.cursor, target + 1)
+        return expired
+
+    def _discard(self, agent_id: str, slot: int):
+        bucket = self.buckets.get(slot)
+        if bucket is not None:
+            bucket.discard(agent_id)
+            if not bucket:
+                del self.buckets[slot]
 
 class AgentLifecycleManager:
-    def __init__(self, swarm_coordinator, check_interval: int = 30):
-        self.agents: Dict[str, AgentStatus] = {}
+    def __init__(self, swarm_coordinator, check_interval: int = 30,
+                 clock: Callable[[], float] = time.monotonic,
+                 metric_fields: Sequence[str] = DEFAULT_METRIC_FIELDS,
+                 recovery_concurrency: int = 8, max_recovery_attempts: int = 3,
+                 recovery_backoff: float = 1.0, max_recovery_backoff: float = 60.0):
+        self.registry = AgentRegistry(metric_fields)
         self.swarm = swarm_coordinator
         self.check_interval = check_interval
         self.lock = threading.Lock()
         self.monitor_thread: Optional[threading.Thread] = None
         self.running = False
+        self._stop_event = threading.Event()
+        self._clock = clock
+        self._heartbeat_timeout = check_interval * 3
+        self._wheel = HeartbeatWheel(max(check_interval / 4, 0.01), clock())
+        # Failed agents awaiting recovery; restarts and task redistribution run
+        # on the pool so a mass failure never holds self.lock
+        self._failed: Dict[str, RecoveryState] = {}
+        self.max_recovery_attempts = max_recovery_attempts
+        self.recovery_backoff = recovery_backoff
+        self.max_recovery_backoff = max_recovery_backoff
+        self.recovery_concurrency = recovery_concurrency
+        self.recovery_pool = self._new_recovery_pool()
+        self._pool_closed = False
+        self._pending: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+
+    @property
+    def agents(self) -> Mapping[str, AgentStatus]:
+        """Read-only AgentStatus snapshots backed by the columnar registry"""
+        return AgentStatusView(self.registry)
 
     def register_agent(self, agent_id: str, initial_resources: dict):
         with self.lock:
-            self.agents[agent_id] = AgentStatus(
-                last_heartbeat=datetime.utcnow(),
-                resource_usage=initial_resources
-            )
+            self.registry.add(agent_id, initial_resources, time.time())
+            self._failed.pop(agent_id, None)
+            self._wheel.schedule(agent_id, self._clock() + self._heartbeat_timeout)
         logger.info(f"Registered new agent: {agent_id}")
 
     def update_heartbeat(self, agent_id: str, metrics: dict):
         with self.lock:
-            if agent_id in self.agents:
-                self.agents[agent_id].last_heartbeat = datetime.utcnow()
-                self.agents[agent_id].resource_usage = metrics
-                self.agents[agent_id].retry_count = 0
+            row = self.registry.update(agent_id, metrics, time.time())
+            if row is not None:
+                if self.registry.active[row]:
+                    self._wheel.schedule(agent_id, self._clock() + self._heartbeat_timeout)
                 logger.debug(f"Heartbeat updated for agent: {agent_id}")
 
+    def update_heartbeats(self, batch: Union[Mapping[str, dict], Iterable[Tuple[str, dict]]]) -> int:
+        """Apply many heartbeats under one lock acquisition; returns how many matched agents"""
+        items = batch.items() if isinstance(batch, Mapping) else batch
+        with self.lock:
+            known = self.registry.update_many(items, time.time())
+            active = [aid for aid in known if self.registry.active[self.registry.rows[aid]]]
+            self._wheel.schedule_many(active, self._clock() + self._heartbeat_timeout)
+        logger.debug(f"Applied {len(known)} heartbeats in batch")
+        return len(known)
+
+    def fleet_metric(self, field: str, reducer: str = "mean") -> float:
+        """Aggregate a metric over active agents, e.g. fleet_metric("cpu")"""
+        return self.registry.fleet_stat(field, reducer)
+
     def start_monitoring(self):
         if not self.running:
             self.running = True
+            if self._pool_closed:
+                self.recovery_pool = self._new_recovery_pool()
+                self._pool_closed = False
+            self._stop_event.clear()
             self.monitor_thread = threading.Thread(
                 target=self._monitor_loop, daemon=True)
             self.monitor_thread.start()
             logger.info("Started agent lifecycle monitoring")
 
+    def stop_monitoring(self, wait_for_recovery: bool = False, timeout: float = 5.0):
+        """Stop the monitor thread, waiting up to ``timeout`` seconds, then the recovery pool"""
+        self.running = False
+        self._stop_event.set()
+        thread, self.monitor_thread = self.monitor_thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Monitor thread still running after {timeout}s")
+        self._pool_closed = True
+        self.recovery_pool.shutdown(wait=wait_for_recovery)
+        logger.info("Stopped agent lifecycle monitoring")
+
+    def _new_recovery_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.recovery_concurrency, thread_name_prefix="agent-recovery")
+
+    def drain_recovery(self, timeout: Optional[float] = None) -> bool:
+        """Wait for in-flight restarts and redistributions; True if all finished"""
+        with self._pending_lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
     def _monitor_loop(self):
         while self.running:
             try:
@@ -56,50 +199,104 @@ class AgentLifecycleManager:
                 self._recover_failed_agents()
             except Exception as e:
                 logger.error(f"Monitoring error: {str(e)}")
-            time.sleep(self.check_interval)
+            self._stop_event.wait(self.check_interval)
 
     def _check_agent_health(self):
-        threshold = datetime.utcnow() - timedelta(
-            seconds=self.check_interval * 3)
-        
+        now = self._clock()
+        registry = self.registry
+        newly_failed: List[str] = []
         with self.lock:
-            for agent_id, status in self.agents.items():
-                if status.last_heartbeat < threshold:
-                    status.retry_count += 1
-                    logger.warning(f"Agent {agent_id} missed heartbeat")
-                    
-                    if status.retry_count > 2:
-                        status.active = False
-                        self._handle_agent_failure(agent_id)
+            for agent_id in self._wheel.advance(now):
+                row = registry.rows.get(agent_id)
+                if row is None or not registry.active[row]:
+                    continue
+                registry.retry_count[row] += 1
+                logger.warning(f"Agent {agent_id} missed heartbeat")
+
+                if registry.retry_count[row] > 2:
+                    registry.active[row] = False
+                    self._failed[agent_id] = RecoveryState(next_attempt=now)
+                    newly_failed.append(agent_id)
+                else:
+                    # Re-check on the next monitor pass, as the full scan did
+                    self._wheel.schedule(agent_id, now + self.check_interval)
+
+        if newly_failed:
+            self._handle_agent_failures(newly_failed)
 
     def _cleanup_inactive_agents(self):
+        """Drop agents whose recovery attempts are exhausted"""
+        registry = self.registry
         with self.lock:
             inactive_agents = [
-                aid for aid, status in self.agents.items() 
-                if not status.active
+                aid for aid, state in self._failed.items()
+                if not state.in_flight and state.attempts >= self.max_recovery_attempts
             ]
             
             for agent_id in inactive_agents:
-                del self.agents[agent_id]
+                registry.remove(agent_id)
+                del self._failed[agent_id]
                 logger.info(f"Cleaned up inactive agent: {agent_id}")
 
     def _recover_failed_agents(self):
+        now = self._clock()
         with self.lock:
-            failed_agents = [
-                aid for aid, status in self.agents.items()
-                if not status.active and status.retry_count <= 5
+            due = [
+                aid for aid, state in self._failed.items()
+                if not state.in_flight
+                and state.attempts < self.max_recovery_attempts
+                and state.next_attempt <= now
             ]
-            
-            for agent_id in failed_agents:
-                logger.info(f"Attempting recovery for agent: {agent_id}")
-                if self._restart_agent(agent_id):
-                    self.agents[agent_id].active = True
-                    self.agents[agent_id].retry_count = 0
-
-    def _handle_agent_failure(self, agent_id: str):
-        logger.error(f"Critical failure detected for agent: {agent_id}")
-        self.swarm.redistribute_tasks(agent_id)
-        
+            for agent_id in due:
+                self._failed[agent_id].in_flight = True
+
+        for agent_id in due:
+            logger.info(f"Attempting recovery for agent: {agent_id}")
+            self._submit(self._run_recovery, agent_id)
+
+    def _run_recovery(self, agent_id: str):
+        restarted = self._restart_agent(agent_id)
+        registry = self.registry
+        with self.lock:
+            state = self._failed.get(agent_id)
+            if state is None or agent_id not in registry:
+                return
+            if not restarted:
+                state.attempts += 1
+                state.in_flight = False
+                state.next_attempt = self._clock() + min(
+                    self.recovery_backoff * 2 ** (state.attempts - 1), self.max_recovery_backoff)
+                logger.warning(f"Recovery attempt {state.attempts} failed for agent: {agent_id}")
+                return
+            row = registry.rows[agent_id]
+            registry.active[row] = True
+            registry.retry_count[row] = 0
+            del self._failed[agent_id]
+            self._wheel.schedule(agent_id, self._clock() + self._heartbeat_timeout)
+            logger.info(f"Recovered agent: {agent_id}")
+        # Off the lock: the swarm may hand waiting tasks to the agent right away
+        self.swarm.reinstate_agent(agent_id)
+
+    def _handle_agent_failures(self, agent_ids: List[str]):
+        """Move the tasks of every newly failed agent in one planning pass, off the lock"""
+        for agent_id in agent_ids:
+            logger.error(f"Critical failure detected for agent: {agent_id}")
+
+        self._submit(self.swarm.redistribute_tasks_batch, list(agent_ids))
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        future = self.recovery_pool.submit(fn, *args)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_recovery_done)
+        return future
+
+    def _on_recovery_done(self, future: Future):
+        with self._pending_lock:
+            self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Recovery task failed: {str(future.exception())}")
+
     def _restart_agent(self, agent_id: str) -> bool:
         try:
             logger.info(f"Restarting agent: {agent_id}")
@@ -108,4 +305,4 @@ class AgentLifecycleManager:
             return True
         except Exception as e:
             logger.error(f"Agent restart failed: {str(e)}")
-            return False<i class="fl-spin"></i>
+            return False
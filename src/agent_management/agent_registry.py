@@ -0,0 +1,186 @@
+# orbital-agent/src/agent_management/agent_registry.py
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRIC_FIELDS = ("cpu", "memory", "disk", "network")
+
+@dataclass
+class AgentStatus:
+    last_heartbeat: datetime
+    resource_usage: dict
+    active: bool = True
+    retry_count: int = 0
+
+class AgentRegistry:
+    """Struct-of-arrays agent table: one row per agent, one NumPy column per field
+
+    Metrics listed in ``metric_fields`` are stored as float32 columns (NaN
+    when not reported); any other keys an agent reports are kept in a
+    sparse side table.
+    """
+
+    def __init__(self, metric_fields: Sequence[str] = DEFAULT_METRIC_FIELDS,
+                 initial_capacity: int = 1024):
+        self.metric_fields = tuple(metric_fields)
+        self.field_index = {f: i for i, f in enumerate(self.metric_fields)}
+        self._field_set = frozenset(self.metric_fields)
+        self.rows: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+        self.extra_metrics: Dict[int, dict] = {}
+        self._allocate(initial_capacity)
+
+    def _allocate(self, capacity: int):
+        self.last_heartbeat = np.zeros(capacity)
+        self.retry_count = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.metrics = np.full((capacity, len(self.metric_fields)), np.nan, dtype=np.float32)
+
+    def _grow(self):
+        old = (self.last_heartbeat, self.retry_count, self.active, self.live, self.metrics)
+        self._allocate(2 * len(self.live))
+        for new, prev in zip(
+            (self.last_heartbeat, self.retry_count, self.active, self.live, self.metrics), old
+        ):
+            new[:len(prev)] = prev
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rows)
+
+    def add(self, agent_id: str, metrics: dict, now: float) -> int:
+        row = self.rows.get(agent_id)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+                self.ids[row] = agent_id
+            else:
+                row = len(self.ids)
+                if row == len(self.live):
+                    self._grow()
+                self.ids.append(agent_id)
+            self.rows[agent_id] = row
+        self.live[row] = True
+        self.active[row] = True
+        self.retry_count[row] = 0
+        self._write_metrics(row, metrics)
+        self.last_heartbeat[row] = now
+        return row
+
+    def remove(self, agent_id: str):
+        row = self.rows.pop(agent_id, None)
+        if row is None:
+            return
+        self.ids[row] = None
+        self.live[row] = False
+        self.active[row] = False
+        self.metrics[row] = np.nan
+        self.extra_metrics.pop(row, None)
+        self._free_rows.append(row)
+
+    def update(self, agent_id: str, metrics: dict, now: float) -> Optional[int]:
+        row = self.rows.get(agent_id)
+        if row is None:
+            return None
+        self.last_heartbeat[row] = now
+        self.retry_count[row] = 0
+        self._write_metrics(row, metrics)
+        return row
+
+    def update_many(self, batch: Iterable[Tuple[str, dict]], now: float) -> List[str]:
+        """Apply a batch of heartbeats with one write per column; returns known agent IDs"""
+        known: List[str] = []
+        rows: List[int] = []
+        reports: List[dict] = []
+        for agent_id, metrics in batch:
+            row = self.rows.get(agent_id)
+            if row is not None:
+                known.append(agent_id)
+                rows.append(row)
+                reports.append(metrics)
+        if not rows:
+            return known
+
+        idx = np.fromiter(rows, dtype=np.intp, count=len(rows))
+        self.last_heartbeat[idx] = now
+        self.retry_count[idx] = 0
+        for field, col in self.field_index.items():
+            self.metrics[idx, col] = [m.get(field, np.nan) for m in reports]
+        for row, metrics in zip(rows, reports):
+            if not metrics.keys() <= self._field_set:
+                self._write_extras(row, metrics)
+            elif self.extra_metrics:
+                self.extra_metrics.pop(row, None)
+        return known
+
+    def status(self, agent_id: str) -> AgentStatus:
+        """Materialize an AgentStatus snapshot for one agent"""
+        row = self.rows[agent_id]
+        usage = {
+            field: float(self.metrics[row, col])
+            for field, col in self.field_index.items()
+            if not np.isnan(self.metrics[row, col])
+        }
+        usage.update(self.extra_metrics.get(row, {}))
+        return AgentStatus(
+            last_heartbeat=datetime.utcfromtimestamp(self.last_heartbeat[row]),
+            resource_usage=usage,
+            active=bool(self.active[row]),
+            retry_count=int(self.retry_count[row])
+        )
+
+    def metric_column(self, field: str, active_only: bool = True) -> np.ndarray:
+        mask = self.live & self.active if active_only else self.live
+        return self.metrics[mask, self.field_index[field]]
+
+    def fleet_stat(self, field: str, reducer: str = "mean") -> float:
+        """Fleet-wide aggregate of one metric as a single vector op, ignoring gaps"""
+        reducers = {"mean": np.nanmean, "max": np.nanmax, "min": np.nanmin, "sum": np.nansum}
+        if reducer not in reducers:
+            raise ValueError(f"Unknown reducer: {reducer}")
+        column = self.metric_column(field)
+        if not len(column) or np.isnan(column).all():
+            return float("nan")
+        return float(reducers[reducer](column))
+
+    def _write_metrics(self, row: int, metrics: dict):
+        for field, col in self.field_index.items():
+            self.metrics[row, col] = metrics.get(field, np.nan)
+        self._write_extras(row, metrics)
+
+    def _write_extras(self, row: int, metrics: dict):
+        extras = {k: v for k, v in metrics.items() if k not in self.field_index}
+        if extras:
+            self.extra_metrics[row] = extras
+        else:
+            self.extra_metrics.pop(row, None)
+
+class AgentStatusView(Mapping):
+    """Read-only ``agent_id -> AgentStatus`` mapping over an AgentRegistry"""
+
+    def __init__(self, registry: AgentRegistry):
+        self._registry = registry
+
+    def __getitem__(self, agent_id: str) -> AgentStatus:
+        if agent_id not in self._registry:
+            raise KeyError(agent_id)
+        return self._registry.status(agent_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._registry.rows))
+
+    def __len__(self) -> int:
+        return len(self._registry)
@@ -0,0 +1,138 @@
+# orbital-agent/src/agent_management/allocation_simulator.py
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .resource_allocator import ResourceAllocator, ResourceType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODE_RESOURCES = {ResourceType.CPU: 32.0, ResourceType.MEMORY: 128.0}
+
+@dataclass
+class SimulationReport:
+    strategy: str
+    events: int
+    placements: int
+    rejections: int
+    placements_per_sec: float
+    p50_latency_ms: float
+    p99_latency_ms: float
+    rejection_rate: float
+    fragmentation: float
+    peak_utilization: float
+    utilization_timeline: List[Tuple[int, float]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+def load_trace(trace_path: str) -> Iterator[Dict]:
+    """Stream allocate/release events from a JSONL trace file
+
+    Each line is ``{"op": "allocate", "task_id": ..., "requirements": {"cpu": 2, ...}}``
+    or ``{"op": "release", "task_id": ...}``.
+    """
+    with open(trace_path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid trace record on line {line_no}: {str(e)}")
+            if event.get("op") not in ("allocate", "release"):
+                raise ValueError(f"Unknown trace op on line {line_no}: {event.get('op')}")
+            yield event
+
+def generate_trace(trace_path: str, tasks: int, seed: int = 0,
+                   release_probability: float = 0.5) -> None:
+    """Write a synthetic trace with random task shapes and interleaved releases"""
+    rng = random.Random(seed)
+    live: List[str] = []
+    with open(trace_path, "w") as f:
+        for i in range(tasks):
+            task_id = f"task-{i}"
+            f.write(json.dumps({
+                "op": "allocate",
+                "task_id": task_id,
+                "requirements": {
+                    "cpu": rng.choice([0.5, 1, 2, 4, 8]),
+                    "memory": rng.choice([1, 2, 4, 8, 16, 32])
+                }
+            }) + "\n")
+            live.append(task_id)
+            if live and rng.random() < release_probability:
+                victim = live.pop(rng.randrange(len(live)))
+                f.write(json.dumps({"op": "release", "task_id": victim}) + "\n")
+
+def build_cluster(nodes: int, node_resources: Optional[Dict] = None,
+                  strategy: str = "bin_packing", rng: Optional[random.Random] = None) -> ResourceAllocator:
+    """Create an allocator over a homogeneous synthetic cluster"""
+    resources = {ResourceType(rt): amount for rt, amount in (node_resources or DEFAULT_NODE_RESOURCES).items()}
+    allocator = ResourceAllocator(allocation_strategy=strategy, rng=rng)
+    for i in range(nodes):
+        allocator.register_node(f"sim-node-{i}", resources)
+    return allocator
+
+def replay(events: Iterable[Dict], strategy: str, nodes: int,
+           node_resources: Optional[Dict] = None, sample_every: int = 100,
+           seed: int = 0) -> SimulationReport:
+    """Replay a trace against a fresh synthetic cluster using one strategy"""
+    allocator = build_cluster(nodes, node_resources, strategy, random.Random(seed))
+    placed: Dict[str, List[Tuple[str, Dict]]] = {}
+    latencies: List[float] = []
+    timeline: List[Tuple[int, float]] = []
+    count = rejections = 0
+
+    started = time.perf_counter()
+    for count, event in enumerate(events, 1):
+        if event["op"] == "allocate":
+            tick = time.perf_counter()
+            try:
+                placed[event["task_id"]] = allocator.allocate_resources(event["requirements"])
+            except RuntimeError:
+                rejections += 1
+            latencies.append(time.perf_counter() - tick)
+        else:
+            for node_id, alloc in placed.pop(event["task_id"], []):
+                allocator.release_resources(node_id, alloc)
+
+        if count % sample_every == 0:
+            timeline.append((count, allocator.index.cluster_utilization()))
+    elapsed = time.perf_counter() - started
+
+    decisions = len(latencies)
+    latency_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return SimulationReport(
+        strategy=strategy,
+        events=count,
+        placements=decisions - rejections,
+        rejections=rejections,
+        placements_per_sec=(decisions - rejections) / elapsed if elapsed > 0 else 0.0,
+        p50_latency_ms=float(np.percentile(latency_ms, 50)),
+        p99_latency_ms=float(np.percentile(latency_ms, 99)),
+        rejection_rate=rejections / decisions if decisions else 0.0,
+        fragmentation=allocator.index.fragmentation(),
+        peak_utilization=max((u for _, u in timeline), default=allocator.index.cluster_utilization()),
+        utilization_timeline=timeline
+    )
+
+def compare_strategies(trace_path: str, strategies: Iterable[str], nodes: int,
+                       node_resources: Optional[Dict] = None,
+                       sample_every: int = 100, seed: int = 0) -> List[SimulationReport]:
+    """Replay the same trace once per strategy"""
+    reports = []
+    for strategy in strategies:
+        report = replay(load_trace(trace_path), strategy, nodes, node_resources, sample_every, seed)
+        logger.info(
+            f"{strategy}: {report.placements_per_sec:.0f} placements/s, "
+            f"p99 {report.p99_latency_ms:.3f} ms, rejection rate {report.rejection_rate:.2%}"
+        )
+        reports.append(report)
+    return reports
@@ -0,0 +1,187 @@
+# orbital-agent/src/agent_management/assignment.py
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Above this many task x slot cells the exact solver is skipped
+EXACT_SOLVER_CELL_LIMIT = 250_000
+REGRET_CHUNK_ROWS = 1024
+
+class AssignmentTimeout(Exception):
+    """Raised internally when a solver exceeds its deadline"""
+
+@dataclass
+class AssignmentResult:
+    assignment: np.ndarray  # agent column per task row, -1 when unassigned
+    total_cost: float
+    method: str
+    optimal: bool
+
+    @property
+    def unassigned(self) -> int:
+        return int((self.assignment < 0).sum())
+
+def solve_assignment(cost: np.ndarray, capacity: Optional[np.ndarray] = None,
+                     time_budget: Optional[float] = None, method: str = "auto") -> AssignmentResult:
+    """Assign tasks (rows) to agents (columns) minimizing total cost
+
+    ``capacity[j]`` bounds how many tasks agent ``j`` may take (default 1).
+    Non-finite costs mark forbidden pairs. ``method`` is ``hungarian``,
+    ``regret`` or ``auto``; the exact solver falls back to the greedy-regret
+    approximation when it would overrun ``time_budget`` seconds. The fallback
+    gets a fresh budget, and whatever it has not placed by then is assigned
+    in one plain greedy pass, so a timeout never leaves feasible tasks out.
+    """
+    cost = np.asarray(cost)
+    if not np.issubdtype(cost.dtype, np.floating):
+        cost = cost.astype(float)
+    if cost.ndim != 2:
+        raise ValueError(f"Cost matrix must be 2-D, got shape {cost.shape}")
+    n, m = cost.shape
+    capacity = np.ones(m, dtype=int) if capacity is None else np.asarray(capacity, dtype=int)
+    if capacity.shape != (m,):
+        raise ValueError(f"Capacity vector must have {m} entries")
+    if method not in ("auto", "hungarian", "regret"):
+        raise ValueError(f"Unknown assignment method: {method}")
+
+    deadline = time.monotonic() + time_budget if time_budget else None
+    slots = int(np.minimum(capacity.clip(0), n).sum())
+    if method == "hungarian" or (method == "auto" and n * slots <= EXACT_SOLVER_CELL_LIMIT):
+        try:
+            assignment = _solve_hungarian(cost, capacity, deadline)
+            return AssignmentResult(assignment, _total_cost(cost, assignment), "hungarian", True)
+        except AssignmentTimeout:
+            logger.warning(f"Exact assignment of {n}x{m} exceeded {time_budget}s, using greedy regret")
+            deadline = time.monotonic() + time_budget
+
+    assignment = _solve_regret(cost, capacity, deadline)
+    return AssignmentResult(assignment, _total_cost(cost, assignment), "regret", False)
+
+def _total_cost(cost: np.ndarray, assignment: np.ndarray) -> float:
+    rows = np.flatnonzero(assignment >= 0)
+    return float(cost[rows, assignment[rows]].sum())
+
+def _solve_hungarian(cost: np.ndarray, capacity: np.ndarray, deadline: Optional[float]) -> np.ndarray:
+    """Shortest augmenting path Hungarian method over capacity-expanded columns"""
+    n, m = cost.shape
+    slot_agent = np.repeat(np.arange(m), np.minimum(capacity.clip(0), n))
+    assignment = np.full(n, -1)
+    if not len(slot_agent) or not n:
+        return assignment
+
+    expanded = cost[:, slot_agent]
+    forbidden = ~np.isfinite(expanded)
+    # Forbidden pairs get a cost no feasible assignment can beat
+    big = (np.abs(expanded[~forbidden]).max() + 1.0) * (n + 1) if (~forbidden).any() else 1.0
+    expanded = np.where(forbidden, big, expanded)
+
+    transposed = n > expanded.shape[1]
+    if transposed:
+        expanded = expanded.T
+    rows, cols = expanded.shape
+
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    owner = np.zeros(cols + 1, dtype=int)  # 1-based row holding each column, 0 if free
+    way = np.zeros(cols + 1, dtype=int)
+    for i in range(1, rows + 1):
+        if deadline and time.monotonic() > deadline:
+            raise AssignmentTimeout()
+        owner[0] = i
+        j0 = 0
+        minv = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            free_cols = np.flatnonzero(~used[1:]) + 1
+            reduced = expanded[i0 - 1, free_cols - 1] - u[i0] - v[free_cols]
+            improve = reduced < minv[free_cols]
+            minv[free_cols[improve]] = reduced[improve]
+            way[free_cols[improve]] = j0
+            j1 = free_cols[np.argmin(minv[free_cols])]
+            delta = minv[j1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv[free_cols] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    for col in range(1, cols + 1):
+        row = owner[col]
+        if not row:
+            continue
+        task, slot = (col - 1, row - 1) if transposed else (row - 1, col - 1)
+        if not forbidden[task, slot]:
+            assignment[task] = slot_agent[slot]
+    return assignment
+
+def _solve_regret(cost: np.ndarray, capacity: np.ndarray, deadline: Optional[float]) -> np.ndarray:
+    """Vectorized greedy-regret rounds: tasks with most to lose pick first"""
+    n, m = cost.shape
+    remaining = capacity.clip(0).copy()
+    assignment = np.full(n, -1)
+    pending = np.arange(n)
+
+    while len(pending) and (remaining > 0).any():
+        if deadline and time.monotonic() > deadline:
+            logger.warning(f"Assignment deadline reached with {len(pending)} tasks pending, placing greedily")
+            _greedy_fill(cost, remaining, pending, assignment)
+            break
+        open_cols = np.flatnonzero(remaining > 0)
+        best = np.empty(len(pending), dtype=int)
+        best_cost = np.empty(len(pending))
+        regret = np.empty(len(pending))
+        for start in range(0, len(pending), REGRET_CHUNK_ROWS):
+            chunk = cost[pending[start:start + REGRET_CHUNK_ROWS]][:, open_cols]
+            chunk[np.isnan(chunk)] = np.inf
+            idx = np.argmin(chunk, axis=1)
+            lowest = chunk[np.arange(len(chunk)), idx]
+            if chunk.shape[1] > 1:
+                second = np.partition(chunk, 1, axis=1)[:, 1]
+            else:
+                second = lowest
+            best[start:start + len(chunk)] = open_cols[idx]
+            best_cost[start:start + len(chunk)] = lowest
+            regret[start:start + len(chunk)] = np.where(np.isfinite(second), second - lowest, np.inf)
+
+        feasible = np.isfinite(best_cost)
+        pending, best, regret = pending[feasible], best[feasible], regret[feasible]
+        if not len(pending):
+            break
+
+        # Group proposals by agent, highest regret first, and accept up to capacity
+        order = np.lexsort((-regret, best))
+        agents = best[order]
+        group_start = np.searchsorted(agents, agents, side="left")
+        rank = np.arange(len(order)) - group_start
+        accepted = order[rank < remaining[agents]]
+
+        assignment[pending[accepted]] = best[accepted]
+        remaining -= np.bincount(best[accepted], minlength=m)
+        pending = np.delete(pending, accepted)
+    return assignment
+
+def _greedy_fill(cost: np.ndarray, remaining: np.ndarray, pending: np.ndarray, assignment: np.ndarray):
+    """Give each pending task, in order, its cheapest agent with room left"""
+    for task in pending:
+        open_cols = np.flatnonzero(remaining > 0)
+        if not len(open_cols):
+            return
+        row = cost[task, open_cols]
+        row = np.where(np.isfinite(row), row, np.inf)
+        best = int(np.argmin(row))
+        if np.isfinite(row[best]):
+            agent = open_cols[best]
+            assignment[task] = agent
+            remaining[agent] -= 1
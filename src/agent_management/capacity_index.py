@@ -0,0 +1,206 @@
+# orbital-agent/src/agent_management/capacity_index.py
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (live row count, total[:n], allocated[:n]) as returned by CapacityIndex.snapshot
+Snapshot = Tuple[int, np.ndarray, np.ndarray]
+
+class MaxSegmentTree:
+    """Array-backed max segment tree with O(log N) point updates and first-fit descent"""
+
+    def __init__(self, capacity: int = 1):
+        self.size = 1
+        while self.size < max(capacity, 1):
+            self.size *= 2
+        self.tree = np.full(2 * self.size, -np.inf)
+
+    def build(self, values: np.ndarray):
+        """Rebuild the whole tree from a leaf vector in O(N)"""
+        self.tree[:] = -np.inf
+        self.tree[self.size:self.size + len(values)] = values
+        level = self.size // 2
+        while level:
+            self.tree[level:2 * level] = np.maximum(
+                self.tree[2 * level:4 * level:2], self.tree[2 * level + 1:4 * level:2]
+            )
+            level //= 2
+
+    def update(self, pos: int, value: float):
+        """Set a leaf and propagate the new maximum towards the root"""
+        i = pos + self.size
+        self.tree[i] = value
+        i //= 2
+        while i:
+            best = max(self.tree[2 * i], self.tree[2 * i + 1])
+            if self.tree[i] == best:
+                break
+            self.tree[i] = best
+            i //= 2
+
+    def max(self) -> float:
+        return float(self.tree[1])
+
+    def find_first(self, threshold: float) -> int:
+        """Return the lowest leaf position holding a value >= threshold, or -1"""
+        if self.tree[1] < threshold:
+            return -1
+        i = 1
+        while i < self.size:
+            i = 2 * i if self.tree[2 * i] >= threshold else 2 * i + 1
+        return i - self.size
+
+class CapacityIndex:
+    """Struct-of-arrays view of cluster capacity, one column per resource type"""
+
+    def __init__(self, resource_types: Sequence, initial_capacity: int = 64):
+        self.columns: Dict = {rt: i for i, rt in enumerate(resource_types)}
+        self.rows: Dict[str, int] = {}
+        self.node_ids: List[str] = []
+        self.total = np.zeros((initial_capacity, len(self.columns)))
+        self.allocated = np.zeros_like(self.total)
+        self._trees = [MaxSegmentTree(initial_capacity) for _ in self.columns]
+        # Writers from different allocator lock stripes share tree ancestors
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def add_node(self, node_id: str, total: Dict) -> int:
+        """Register a node row, or reset the totals of an existing one"""
+        with self._write_lock:
+            row = self.rows.get(node_id)
+            if row is None:
+                row = len(self.node_ids)
+                if row == len(self.total):
+                    self._grow()
+                self.rows[node_id] = row
+                self.node_ids.append(node_id)
+            self.total[row] = 0.0
+            self.allocated[row] = 0.0
+            for rt, amount in total.items():
+                self.total[row, self.columns[rt]] = amount
+            self._refresh_row(row)
+        return row
+
+    def set_total(self, node_id: str, total: Dict):
+        with self._write_lock:
+            row = self.rows[node_id]
+            for rt, amount in total.items():
+                self.total[row, self.columns[rt]] = amount
+            self._refresh_row(row)
+
+    def set_allocated(self, node_id: str, allocated: Dict):
+        with self._write_lock:
+            row = self.rows[node_id]
+            for rt, amount in allocated.items():
+                self.allocated[row, self.columns[rt]] = amount
+            self._refresh_row(row)
+
+    def snapshot(self) -> Snapshot:
+        """Row count with matching ``total`` and ``allocated`` views for lock-free readers
+
+        Queries read this once and derive everything from it, so a node
+        registered mid-query cannot leave them with arrays of different
+        lengths; pass one snapshot to several queries to keep them aligned.
+        Rows are only appended and the arrays grow before a row is
+        published, so both views always cover ``n`` rows.
+        """
+        n = len(self.node_ids)
+        return n, self.total[:n], self.allocated[:n]
+
+    def free(self, view: Optional[Snapshot] = None) -> np.ndarray:
+        """Free capacity matrix (nodes x resource types) for live rows"""
+        _, total, allocated = view or self.snapshot()
+        return total - allocated
+
+    def max_free(self, rt) -> float:
+        """Largest free amount of a resource on any single node, O(1)"""
+        return self._trees[self.columns[rt]].max()
+
+    def can_fit_anywhere(self, requirements: Dict) -> bool:
+        """Cheap O(k) rejection test using per-column tree maxima"""
+        if not self.node_ids:
+            return False
+        return all(self.max_free(rt) >= req for rt, req in requirements.items())
+
+    def first_fit(self, rt, amount: float) -> Optional[str]:
+        """Lowest-row node with at least ``amount`` free of one resource, O(log N)"""
+        row = self._trees[self.columns[rt]].find_first(amount)
+        return self.node_ids[row] if row >= 0 else None
+
+    def requirement_vector(self, requirements: Dict) -> np.ndarray:
+        vec = np.zeros(len(self.columns))
+        for rt, req in requirements.items():
+            vec[self.columns[rt]] = req
+        return vec
+
+    def feasible_mask(self, requirements: Dict, view: Optional[Snapshot] = None) -> np.ndarray:
+        """Boolean mask of nodes that can host the full request"""
+        return self._feasible(self.free(view), requirements)
+
+    def fitness(self, requirements: Dict) -> np.ndarray:
+        """Vectorized node fitness: free share of the requested resources, -1 if it cannot fit"""
+        _, total, allocated = self.snapshot()
+        free = total - allocated
+        cols = [self.columns[rt] for rt in requirements]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = free[:, cols].sum(axis=1) / total.sum(axis=1)
+        scores = np.where(np.isfinite(scores), scores, 0.0)
+        return np.where(self._feasible(free, requirements), scores, -1.0)
+
+    def utilization(self, view: Optional[Snapshot] = None) -> np.ndarray:
+        """Per-node utilization matrix; columns with zero total report 0"""
+        _, total, allocated = view or self.snapshot()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            util = allocated / total
+        return np.where(np.isfinite(util), util, 0.0)
+
+    def cluster_utilization(self) -> float:
+        """Allocated share of cluster capacity, averaged over provisioned resource types"""
+        _, total, allocated = self.snapshot()
+        totals = total.sum(axis=0)
+        live = totals > 0
+        if not live.any():
+            return 0.0
+        return float(np.mean(allocated.sum(axis=0)[live] / totals[live]))
+
+    def fragmentation(self) -> float:
+        """Share of free capacity stranded outside the largest free node, averaged per resource"""
+        free = np.clip(self.free(), 0.0, None)
+        column_free = free.sum(axis=0)
+        live = column_free > 0
+        if not live.any():
+            return 0.0
+        largest = free.max(axis=0)
+        return float(np.mean(1.0 - largest[live] / column_free[live]))
+
+    def _feasible(self, free: np.ndarray, requirements: Dict) -> np.ndarray:
+        if not requirements:
+            return np.ones(len(free), dtype=bool)
+        cols = [self.columns[rt] for rt in requirements]
+        req = np.array([requirements[rt] for rt in requirements])
+        return np.all(free[:, cols] >= req, axis=1)
+
+    def _refresh_row(self, row: int):
+        free = self.total[row] - self.allocated[row]
+        for col, tree in enumerate(self._trees):
+            tree.update(row, free[col])
+
+    def _grow(self):
+        capacity = 2 * len(self.total)
+        total = np.zeros((capacity, len(self.columns)))
+        allocated = np.zeros_like(total)
+        total[:len(self.total)] = self.total
+        allocated[:len(self.allocated)] = self.allocated
+        self.total, self.allocated = total, allocated
+
+        free = self.free()
+        self._trees = [MaxSegmentTree(capacity) for _ in self.columns]
+        for col, tree in enumerate(self._trees):
+            tree.build(free[:, col])
+        logger.debug(f"Grew capacity index to {capacity} rows")
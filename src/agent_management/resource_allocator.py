@@ -4,8 +4,13 @@ import threading
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import random
 import time
 
+import numpy as np
+
+from .capacity_index import CapacityIndex
+
 logger = logging.getLogger(__name__)
 
 class ResourceType(Enum):
@@ -19,14 +24,41 @@ class NodeResources:
     total: Dict[ResourceType, float]
     allocated: Dict[ResourceType, float]
     last_updated: float
+    version: int = 0
+
+@dataclass
+class BatchPlacement:
+    placements: List[Optional[Tuple[str, Dict[ResourceType, float]]]]
+    rejected: List[int]
+    fragmentation: float
+
+# (node_id, allocation, node record version the allocation was planned against)
+PlannedAllocation = Tuple[str, Dict[ResourceType, float], int]
 
 class ResourceAllocator:
-    def __init__(self, allocation_strategy: str = "bin_packing"):
+    def __init__(self, allocation_strategy: str = "bin_packing",
+                 lock_stripes: int = 64, max_commit_retries: int = 16,
+                 rng: Optional[random.Random] = None):
+        # Node records are copy-on-write: a record is never mutated once it is
+        # published in self.nodes, so readers get consistent snapshots without
+        # locking. Writers serialize per node on a lock stripe and bump the
+        # record version; self.lock only guards registration and settings.
         self.nodes: Dict[str, NodeResources] = {}
+        self.index = CapacityIndex(list(ResourceType))
         self.lock = threading.RLock()
+        self._stripes = [threading.Lock() for _ in range(max(lock_stripes, 1))]
+        self.max_commit_retries = max_commit_retries
+        self.commit_conflicts = 0
+        self._conflicts_lock = threading.Lock()
         self.strategy = allocation_strategy
+        # Node picks for the "random" strategy; pass a seeded Random to replay them
+        self.rng = rng or random.Random()
         self._initialize_strategies()
 
+    def _record_conflict(self):
+        with self._conflicts_lock:
+            self.commit_conflicts += 1
+
     def _initialize_strategies(self):
         self._strategy_map = {
             "bin_packing": self._bin_packing_strategy,
@@ -35,38 +67,115 @@ class ResourceAllocator:
         }
 
     def register_node(self, node_id: str, resources: Dict[ResourceType, float]):
-        with self.lock:
+        with self.lock, self._stripe(node_id):
+            current = self.nodes.get(node_id)
             self.nodes[node_id] = NodeResources(
                 total=resources.copy(),
                 allocated={rt: 0.0 for rt in resources},
-                last_updated=time.time()
+                last_updated=time.time(),
+                version=current.version + 1 if current else 0
             )
+            self.index.add_node(node_id, resources)
         logger.info(f"Registered node {node_id} with resources: {resources}")
 
     def allocate_resources(self, requirements: Dict[ResourceType, float]) -> List[Tuple[str, Dict[ResourceType, float]]]:
-        with self.lock:
-            strategy_fn = self._strategy_map.get(self.strategy)
-            if not strategy_fn:
-                raise ValueError(f"Unknown allocation strategy: {self.strategy}")
+        strategy_fn = self._strategy_map.get(self.strategy)
+        if not strategy_fn:
+            raise ValueError(f"Unknown allocation strategy: {self.strategy}")
+
+        requirements = {ResourceType(rt): req for rt, req in requirements.items()}
+        for _ in range(self.max_commit_retries):
+            plan = strategy_fn(requirements)
+            if plan is not None and self._commit_plan(plan):
+                return [(node_id, alloc) for node_id, alloc, _ in plan]
+            self._record_conflict()
+
+        raise RuntimeError(f"Failed to allocate resources: {self.max_commit_retries} conflicting commits")
+
+    def allocate_batch(self, batch: List[Dict[ResourceType, float]],
+                       all_or_nothing: bool = False,
+                       heuristic: str = "dot_product") -> BatchPlacement:
+        """Place a wave of tasks with multi-dimensional first-fit-decreasing
 
-            return strategy_fn(requirements)
+        Tasks are ordered by decreasing normalized size and each is placed on
+        a single node. ``dot_product`` picks the feasible node whose free
+        capacity best aligns with the demand vector, ``first_fit`` the lowest
+        feasible row. With ``all_or_nothing`` nothing is committed unless
+        every task fits.
+        """
+        if heuristic not in ("dot_product", "first_fit"):
+            raise ValueError(f"Unknown batch heuristic: {heuristic}")
 
-    def _bin_packing_strategy(self, requirements: Dict[ResourceType, float]) -> List[Tuple[str, Dict[ResourceType, float]]]:
+        batch = [{ResourceType(rt): req for rt, req in reqs.items() if req > 0} for reqs in batch]
+        for _ in range(self.max_commit_retries):
+            chosen, plan = self._plan_batch(batch, heuristic)
+            rejected = [i for i, node_id in enumerate(chosen) if node_id is None]
+            if rejected and all_or_nothing:
+                raise RuntimeError(f"Failed to allocate batch: {len(rejected)} of {len(batch)} tasks do not fit")
+            if self._commit_plan(plan):
+                break
+            self._record_conflict()
+        else:
+            raise RuntimeError(f"Failed to allocate batch: {self.max_commit_retries} conflicting commits")
+
+        if rejected:
+            logger.warning(f"Batch placement rejected {len(rejected)} of {len(batch)} tasks")
+        return BatchPlacement(
+            placements=[
+                (node_id, batch[task]) if node_id is not None else None
+                for task, node_id in enumerate(chosen)
+            ],
+            rejected=rejected,
+            fragmentation=self.index.fragmentation()
+        )
+
+    def _plan_batch(self, batch: List[Dict[ResourceType, float]],
+                    heuristic: str) -> Tuple[List[Optional[str]], List[PlannedAllocation]]:
+        n, total, allocated = self.index.snapshot()
+        node_ids = self.index.node_ids[:n]
+        versions = {node_id: self.nodes[node_id].version for node_id in node_ids}
+        free = total - allocated
+        demands = np.array([self.index.requirement_vector(reqs) for reqs in batch])
+        demands = demands.reshape(len(batch), len(self.index.columns))
+        scale = total.max(axis=0) if n else np.ones(demands.shape[1])
+        scale = np.where(scale > 0, scale, 1.0)
+        weights = demands / scale
+
+        chosen: List[Optional[str]] = [None] * len(batch)
+        plan: List[PlannedAllocation] = []
+        for task in np.argsort(-weights.sum(axis=1), kind="stable"):
+            feasible = np.flatnonzero(np.all(free >= demands[task], axis=1))
+            if not len(feasible):
+                continue
+            if heuristic == "first_fit":
+                row = int(feasible[0])
+            else:
+                scores = (free[feasible] / scale) @ weights[task]
+                row = int(feasible[np.argmax(scores)])
+            free[row] -= demands[task]
+            chosen[task] = node_ids[row]
+            plan.append((node_ids[row], batch[task], versions[node_ids[row]]))
+        return chosen, plan
+
+    def _bin_packing_strategy(self, requirements: Dict[ResourceType, float]) -> Optional[List[PlannedAllocation]]:
+        # Fast path: the fittest node hosts the whole request, one vector op
+        if self.index.can_fit_anywhere(requirements):
+            fitness = self.index.fitness(requirements)
+            best = int(np.argmax(fitness))
+            if fitness[best] >= 0:
+                planned = self._plan_from_node(self.index.node_ids[best], requirements)
+                return [planned] if planned else None
+
+        # No single node fits: span the request across nodes in registration order
         allocations = []
         remaining = requirements.copy()
-        
-        sorted_nodes = sorted(
-            self.nodes.items(),
-            key=lambda item: self._calculate_node_fitness(item[1], remaining),
-            reverse=True
-        )
 
-        for node_id, node_res in sorted_nodes:
-            alloc = self._allocate_from_node(node_id, remaining)
-            if alloc:
-                allocations.append((node_id, alloc))
-                for rt in remaining:
-                    remaining[rt] -= alloc.get(rt, 0.0)
+        for node_id in list(self.index.node_ids):
+            planned = self._plan_from_node(node_id, remaining, partial=True)
+            if planned:
+                allocations.append(planned)
+                for rt in list(remaining):
+                    remaining[rt] -= planned[1].get(rt, 0.0)
                     if remaining[rt] <= 0.001:
                         del remaining[rt]
                 if not remaining:
@@ -77,48 +186,107 @@ class ResourceAllocator:
 
         return allocations
 
-    def _calculate_node_fitness(self, node: NodeResources, requirements: Dict[ResourceType, float]) -> float:
-        available = {
-            rt: node.total[rt] - node.allocated[rt]
-            for rt in requirements
-            if rt in node.total
-        }
-        
-        if not all(available.get(rt, 0) >= req for rt, req in requirements.items()):
-            return -1
+    def _spread_strategy(self, requirements: Dict[ResourceType, float]) -> Optional[List[PlannedAllocation]]:
+        if not self.index.can_fit_anywhere(requirements):
+            raise RuntimeError(f"Failed to allocate resources: {requirements} remaining")
 
-        return sum(available.values()) / sum(node.total.values())
+        view = self.index.snapshot()
+        mask = self.index.feasible_mask(requirements, view)
+        load = np.where(mask, self.index.utilization(view).mean(axis=1), np.inf)
+        best = int(np.argmin(load))
+        if not mask[best]:
+            raise RuntimeError(f"Failed to allocate resources: {requirements} remaining")
 
-    def _allocate_from_node(self, node_id: str, requirements: Dict[ResourceType, float]) -> Optional[Dict[ResourceType, float]]:
+        planned = self._plan_from_node(self.index.node_ids[best], requirements)
+        return [planned] if planned else None
+
+    def _random_strategy(self, requirements: Dict[ResourceType, float]) -> Optional[List[PlannedAllocation]]:
+        candidates = np.flatnonzero(self.index.feasible_mask(requirements))
+        if not len(candidates):
+            raise RuntimeError(f"Failed to allocate resources: {requirements} remaining")
+
+        planned = self._plan_from_node(self.index.node_ids[int(self.rng.choice(candidates))], requirements)
+        return [planned] if planned else None
+
+    def _plan_from_node(self, node_id: str, requirements: Dict[ResourceType, float],
+                        partial: bool = False) -> Optional[PlannedAllocation]:
+        """Size an allocation against a record snapshot without mutating it"""
         node_res = self.nodes[node_id]
         allocation = {}
         
         for rt, req in requirements.items():
-            available = node_res.total[rt] - node_res.allocated[rt]
-            if available <= 0:
+            available = node_res.total.get(rt, 0.0) - node_res.allocated.get(rt, 0.0)
+            if available <= 0 or (not partial and available < req):
                 return None
-            alloc_amount = min(req, available)
-            allocation[rt] = alloc_amount
-            node_res.allocated[rt] += alloc_amount
-        
-        node_res.last_updated = time.time()
-        return allocation
+            allocation[rt] = min(req, available)
+
+        return node_id, allocation, node_res.version
+
+    def _commit_plan(self, plan: List[PlannedAllocation]) -> bool:
+        """Apply a plan if every node record is still at its planned version"""
+        per_node: Dict[str, Tuple[int, Dict[ResourceType, float]]] = {}
+        for node_id, alloc, version in plan:
+            _, merged = per_node.setdefault(node_id, (version, {}))
+            for rt, amount in alloc.items():
+                merged[rt] = merged.get(rt, 0.0) + amount
+
+        stripes = [self._stripes[i] for i in sorted({self._stripe_index(nid) for nid in per_node})]
+        for stripe in stripes:
+            stripe.acquire()
+        try:
+            for node_id, (version, alloc) in per_node.items():
+                current = self.nodes.get(node_id)
+                if current is None or current.version != version:
+                    return False
+                if any(current.allocated.get(rt, 0.0) + amount > current.total.get(rt, 0.0) + 1e-9
+                       for rt, amount in alloc.items()):
+                    return False
+
+            for node_id, (_, alloc) in per_node.items():
+                current = self.nodes[node_id]
+                allocated = current.allocated.copy()
+                for rt, amount in alloc.items():
+                    allocated[rt] = allocated.get(rt, 0.0) + amount
+                self._publish(node_id, current.total, allocated, current.version)
+            return True
+        finally:
+            for stripe in reversed(stripes):
+                stripe.release()
+
+    def _publish(self, node_id: str, total: Dict[ResourceType, float],
+                 allocated: Dict[ResourceType, float], version: int):
+        """Swap in a new node record; caller holds the node's stripe"""
+        self.nodes[node_id] = NodeResources(
+            total=total,
+            allocated=allocated,
+            last_updated=time.time(),
+            version=version + 1
+        )
+        self.index.set_allocated(node_id, allocated)
+
+    def _stripe_index(self, node_id: str) -> int:
+        return hash(node_id) % len(self._stripes)
+
+    def _stripe(self, node_id: str) -> threading.Lock:
+        return self._stripes[self._stripe_index(node_id)]
 
     def release_resources(self, node_id: str, resources: Dict[ResourceType, float]):
-        with self.lock:
-            if node_id not in self.nodes:
+        with self._stripe(node_id):
+            node_res = self.nodes.get(node_id)
+            if node_res is None:
                 logger.warning(f"Attempted to release resources from unknown node: {node_id}")
                 return
 
-            node_res = self.nodes[node_id]
+            allocated = node_res.allocated.copy()
             for rt, amount in resources.items():
-                if rt not in node_res.allocated:
+                rt = ResourceType(rt)
+                if rt not in allocated:
                     continue
-                node_res.allocated[rt] = max(node_res.allocated[rt] - amount, 0.0)
-            node_res.last_updated = time.time()
+                allocated[rt] = max(allocated[rt] - amount, 0.0)
+            self._publish(node_id, node_res.total, allocated, node_res.version)
 
     def update_node_resources(self, node_id: str, new_total: Dict[ResourceType, float]):
-        with self.lock:
+        with self._stripe(node_id):
             if node_id not in self.nodes:
                 logger.error(f"Update failed: Node {node_id} not registered")
                 return
@@ -131,19 +299,21 @@ class ResourceAllocator:
             self.nodes[node_id] = NodeResources(
                 total=new_total.copy(),
                 allocated=current.allocated.copy(),
-                last_updated=time.time()
+                last_updated=time.time(),
+                version=current.version + 1
             )
+            self.index.set_total(node_id, new_total)
 
     def get_node_utilization(self, node_id: str) -> Dict[ResourceType, float]:
-        with self.lock:
-            node_res = self.nodes.get(node_id)
-            if not node_res:
-                raise ValueError(f"Unknown node: {node_id}")
-            
-            return {
-                rt: node_res.allocated[rt] / node_res.total[rt]
-                for rt in node_res.total
-            }
+        # Lock-free: published records are immutable snapshots
+        node_res = self.nodes.get(node_id)
+        if not node_res:
+            raise ValueError(f"Unknown node: {node_id}")
+
+        return {
+            rt: node_res.allocated.get(rt, 0.0) / node_res.total[rt]
+            for rt in node_res.total
+        }
 
     def set_allocation_strategy(self, strategy: str):
         with self.lock:
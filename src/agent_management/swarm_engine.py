@@ -1,63 +1,467 @@
 # orbital-agent/src/agent_management/swarm_engine.py
+import heapq
 import json
 import logging
-from typing import Dict, List
-from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 
+import numpy as np
+
+from .assignment import AssignmentResult, solve_assignment
+
 logger = logging.getLogger(__name__)
 
+def iter_topology_nodes(config_path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Stream node records from a topology file in bounded memory
+
+    Accepts ``{"nodes": [...]}`` JSON, decoded one array element at a time,
+    or JSON Lines with one node record per line (``.jsonl``).
+    """
+    with open(config_path) as f:
+        if config_path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        buf, pos = _seek_nodes_array(f, config_path, chunk_size, decoder)
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                if pos == len(buf):
+                    raise json.JSONDecodeError("Need more data", buf, pos)
+                node, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Truncated topology {config_path}")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield node
+
+def _seek_nodes_array(f, config_path: str, chunk_size: int, decoder: json.JSONDecoder) -> Tuple[str, int]:
+    """Walk the top-level object's members up to the ``"nodes"`` key
+
+    Other members are decoded and skipped whole, so a ``"nodes"`` key nested
+    inside them is never mistaken for the node list. Returns the buffer and
+    the position just past the array's ``[``.
+    """
+    buf, pos = '', 0
+    state, key = 'open', None
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n':
+            pos += 1
+        if pos == len(buf):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"No 'nodes' array in topology {config_path}")
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        char = buf[pos]
+        if state == 'open':
+            if char != '{':
+                raise ValueError(f"Topology {config_path} is not a JSON object")
+            pos, state = pos + 1, 'key'
+        elif state == 'key' and char == ',':
+            pos += 1
+        elif state == 'key' and char == '}':
+            raise ValueError(f"No 'nodes' array in topology {config_path}")
+        elif state == 'colon':
+            if char != ':':
+                raise ValueError(f"Malformed topology {config_path}")
+            pos, state = pos + 1, 'value'
+        elif state == 'value' and key == 'nodes':
+            if char != '[':
+                raise ValueError(f"'nodes' in topology {config_path} is not an array")
+            return buf, pos + 1
+        else:
+            # A key, or a value to skip; a token touching the end of the
+            # buffer may be cut short (e.g. a number), so read more first
+            try:
+                token, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                end = len(buf)
+            if end == len(buf):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"Truncated topology {config_path}")
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            if state == 'key':
+                if not isinstance(token, str):
+                    raise ValueError(f"Malformed topology {config_path}")
+                key, state = token, 'colon'
+            else:
+                state = 'key'
+            pos = end
+
 @dataclass
 class NodeState:
     capacity: int
     load: int = 0
     last_heartbeat: float = 0.0
 
+@dataclass
+class AgentState:
+    agent_id: str
+    cpu_usage: float = 0.0
+    memory: int = 0
+    task_capacity: int = 1
+
+class _NodeShard:
+    """Partition of the node space with its own lock and lazy max-heap of spare capacity
+
+    Heap entries are ``(-spare, node_id)``. Updates push a fresh entry and
+    leave the old one behind; stale entries are discarded when they surface.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.members: Dict[str, NodeState] = {}
+        self.heap: List[Tuple[int, str]] = []
+
+    def push(self, node_id: str):
+        state = self.members[node_id]
+        heapq.heappush(self.heap, (state.load - state.capacity, node_id))
+        if len(self.heap) > 2 * len(self.members) + 64:
+            self.heap = [(s.load - s.capacity, nid) for nid, s in self.members.items()]
+            heapq.heapify(self.heap)
+
+    def replace_top(self, node_id: str):
+        """Re-key the node returned by top() so the heap root stays fresh"""
+        state = self.members[node_id]
+        heapq.heapreplace(self.heap, (state.load - state.capacity, node_id))
+
+    def peek_spare(self) -> int:
+        """Unlocked, possibly stale view of the largest spare capacity"""
+        try:
+            return -self.heap[0][0]
+        except IndexError:
+            return 0
+
+    def top(self) -> Optional[Tuple[int, str]]:
+        """Valid (spare, node_id) with the most spare capacity; caller holds the lock"""
+        while self.heap:
+            neg_spare, node_id = self.heap[0]
+            state = self.members.get(node_id)
+            if state is not None and state.load - state.capacity == neg_spare:
+                return -neg_spare, node_id
+            heapq.heappop(self.heap)
+        return None
+
 class SwarmOrchestrator:
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: Optional[str] = None, shards: int = 16):
         self.nodes: Dict[str, NodeState] = {}
+        self.agent_registry: Dict[str, AgentState] = {}
         self.executor = ThreadPoolExecutor()
-        self.load_topology(config_file)
+        self._shards = [_NodeShard() for _ in range(max(shards, 1))]
+        self._topology_lock = threading.Lock()
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        # Task placement: agent -> task IDs it runs, agents excluded after a
+        # failure until they register again, and tasks no agent could take
+        self.agent_tasks: Dict[str, List[str]] = {}
+        self.unavailable_agents: set = set()
+        self.unassigned_tasks: List[str] = []
+        self._task_lock = threading.Lock()
+        if config_file:
+            self.load_topology(config_file)
         
     def load_topology(self, config_path: str):
-        """Load node network topology from config"""
+        """Load node network topology from config
+
+        Applied as a diff against the current topology: known nodes keep
+        their load, new nodes are added and missing ones removed. Records
+        are streamed and each takes only its own shard lock, so allocation
+        continues while a large file loads.
+        """
         try:
-            with open(config_path) as f:
-                topology = json.load(f)
-                self.nodes = {n['id']: NodeState(n['capacity']) for n in topology['nodes']}
-            logger.info(f"Loaded swarm topology with {len(self.nodes)} nodes")
+            with self._topology_lock:
+                seen = set()
+                for node in iter_topology_nodes(config_path):
+                    seen.add(node['id'])
+                    self.add_node(node['id'], node['capacity'])
+                stale = [nid for nid in list(self.nodes) if nid not in seen]
+                for nid in stale:
+                    self.remove_node(nid)
+            logger.info(f"Loaded swarm topology with {len(self.nodes)} nodes ({len(stale)} removed)")
         except Exception as e:
             logger.error(f"Topology loading failed: {str(e)}")
             raise
 
+    def add_node(self, node_id: str, capacity: int) -> NodeState:
+        """Add a node, or resize it in place if already known"""
+        shard = self._shard_of(node_id)
+        with shard.lock:
+            state = shard.members.get(node_id)
+            if state is None:
+                state = NodeState(capacity)
+                shard.members[node_id] = state
+                self.nodes[node_id] = state
+            elif state.capacity == capacity:
+                return state
+            state.capacity = capacity
+            shard.push(node_id)
+        return state
+
+    def resize_node(self, node_id: str, capacity: int):
+        if node_id not in self.nodes:
+            raise KeyError(f"Unknown node: {node_id}")
+        self.add_node(node_id, capacity)
+
+    def remove_node(self, node_id: str) -> Optional[NodeState]:
+        """Drop a node; its heap entries go stale and are skipped lazily"""
+        shard = self._shard_of(node_id)
+        with shard.lock:
+            state = shard.members.pop(node_id, None)
+            self.nodes.pop(node_id, None)
+        if state and state.load:
+            logger.warning(f"Removed node {node_id} with {state.load} units still allocated")
+        return state
+
+    def apply_topology_diff(self, diff: Dict) -> Dict[str, int]:
+        """Apply ``{"add": [{"id", "capacity"}], "resize": [...], "remove": [ids]}``"""
+        with self._topology_lock:
+            for node in diff.get('add', []):
+                self.add_node(node['id'], node['capacity'])
+            for node in diff.get('resize', []):
+                self.resize_node(node['id'], node['capacity'])
+            for node_id in diff.get('remove', []):
+                self.remove_node(node_id)
+        return {k: len(diff.get(k, [])) for k in ('add', 'resize', 'remove')}
+
+    def topology_diff(self, config_path: str) -> Dict[str, List]:
+        """Stream a topology file into a diff against the current nodes
+
+        Only changes are kept: unknown nodes under ``add``, capacity changes
+        under ``resize`` and nodes missing from the file under ``remove``.
+        """
+        diff: Dict[str, List] = {'add': [], 'resize': [], 'remove': []}
+        seen = set()
+        for node in iter_topology_nodes(config_path):
+            seen.add(node['id'])
+            state = self.nodes.get(node['id'])
+            if state is None:
+                diff['add'].append({'id': node['id'], 'capacity': node['capacity']})
+            elif state.capacity != node['capacity']:
+                diff['resize'].append({'id': node['id'], 'capacity': node['capacity']})
+        diff['remove'] = [nid for nid in list(self.nodes) if nid not in seen]
+        return diff
+
+    def watch_topology(self, config_path: str, interval: float = 5.0) -> threading.Thread:
+        """Poll the topology file and apply its changes as a diff when it changes
+
+        Returns the watcher thread; stop_watching (or shutdown) stops and joins it.
+        """
+        self.stop_watching()
+        stop = threading.Event()
+
+        def _watch():
+            last = None
+            while not stop.wait(interval if last is not None else 0):
+                try:
+                    stat = os.stat(config_path)
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    if last is not None and signature != last:
+                        counts = self.apply_topology_diff(self.topology_diff(config_path))
+                        logger.info(f"Applied topology change from {config_path}: {counts}")
+                    last = signature
+                except Exception as e:
+                    logger.error(f"Topology watch failed: {str(e)}")
+
+        self._watch_stop = stop
+        self._watch_thread = threading.Thread(target=_watch, name="topology-watch", daemon=True)
+        self._watch_thread.start()
+        logger.info(f"Watching topology file {config_path}")
+        return self._watch_thread
+
+    def stop_watching(self, timeout: float = 5.0):
+        if self._watch_stop:
+            self._watch_stop.set()
+            self._watch_stop = None
+        thread, self._watch_thread = self._watch_thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Topology watcher still running after {timeout}s")
+
+    def shutdown(self, wait: bool = True):
+        """Stop the topology watcher and the submission executor"""
+        self.stop_watching()
+        self.executor.shutdown(wait=wait)
+
+    def _shard_of(self, node_id: str) -> _NodeShard:
+        return self._shards[hash(node_id) % len(self._shards)]
+
+    def register_agent(self, agent: AgentState):
+        """Add or replace an agent available for task assignment"""
+        self.agent_registry[agent.agent_id] = agent
+        with self._task_lock:
+            self.unavailable_agents.discard(agent.agent_id)
+            self.agent_tasks.setdefault(agent.agent_id, [])
+        logger.info(f"Registered agent {agent.agent_id} with capacity {agent.task_capacity}")
+
+    def assign_task(self, task_id: str, agent_id: str):
+        """Record that ``agent_id`` runs ``task_id``"""
+        if agent_id not in self.agent_registry:
+            raise KeyError(f"Unknown agent: {agent_id}")
+        with self._task_lock:
+            self.agent_tasks.setdefault(agent_id, []).append(task_id)
+
+    def reinstate_agent(self, agent_id: str) -> Dict[str, Optional[str]]:
+        """Register a recovered agent again and hand it any tasks still waiting for a slot"""
+        agent = self.agent_registry.get(agent_id)
+        if agent is None:
+            raise KeyError(f"Unknown agent: {agent_id}")
+        self.register_agent(agent)
+        return self.redistribute_tasks_batch([])
+
+    def redistribute_tasks(self, agent_id: str) -> Dict[str, Optional[str]]:
+        return self.redistribute_tasks_batch([agent_id])
+
+    def redistribute_tasks_batch(self, agent_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Move every task of the failed ``agent_ids`` to surviving agents in one pass
+
+        The orphaned tasks and the survivors' spare capacity go through one
+        solve_assignment call. Each free slot is its own column costed at the
+        survivor's utilization once that slot is filled plus its CPU usage,
+        so every extra task on an agent costs more than the last and the
+        batch spreads instead of filling the least-loaded agent first.
+        Returns ``task_id -> new agent``, with None for tasks that did not
+        fit; those wait in ``unassigned_tasks``.
+        """
+        with self._task_lock:
+            self.unavailable_agents.update(agent_ids)
+            orphans = [task for agent_id in agent_ids for task in self.agent_tasks.pop(agent_id, [])]
+            orphans = self.unassigned_tasks + orphans
+            self.unassigned_tasks = []
+            if not orphans:
+                return {}
+
+            survivors = [a for a in self.agent_registry.values() if a.agent_id not in self.unavailable_agents]
+            load = np.array([len(self.agent_tasks.get(a.agent_id, ())) for a in survivors], dtype=float)
+            capacity = np.array([a.task_capacity for a in survivors], dtype=int)
+            spare = np.maximum(capacity - load.astype(int), 0)
+            placed: Dict[str, Optional[str]] = dict.fromkeys(orphans)
+            if spare.sum():
+                slots = np.minimum(spare, len(orphans))
+                slot_agent = np.repeat(np.arange(len(survivors)), slots)
+                # k-th free slot of an agent, counting from 1
+                slot_rank = np.arange(len(slot_agent)) - np.repeat(np.cumsum(slots) - slots, slots) + 1
+                cpu = np.array([a.cpu_usage for a in survivors])
+                slot_cost = (load[slot_agent] + slot_rank) / capacity[slot_agent] + cpu[slot_agent]
+                result = solve_assignment(np.tile(slot_cost, (len(orphans), 1)))
+                for task_id, column in zip(orphans, result.assignment.tolist()):
+                    if column >= 0:
+                        agent_id = survivors[slot_agent[column]].agent_id
+                        self.agent_tasks.setdefault(agent_id, []).append(task_id)
+                        placed[task_id] = agent_id
+            self.unassigned_tasks = [task_id for task_id, agent_id in placed.items() if agent_id is None]
+
+        logger.info(
+            f"Redistributed {len(orphans) - len(self.unassigned_tasks)}/{len(orphans)} tasks "
+            f"from {len(agent_ids)} failed agents"
+        )
+        return placed
+
+    def optimize(self, task_matrix, time_budget: Optional[float] = None,
+                 method: str = "auto") -> AssignmentResult:
+        """Solve a task-by-agent cost matrix against registered agent capacities
+
+        Columns follow agent registration order. Small problems are solved
+        exactly; large ones use the greedy-regret approximation.
+        """
+        task_matrix = np.asarray(task_matrix, dtype=float)
+        agents = list(self.agent_registry.values())
+        if task_matrix.ndim != 2 or task_matrix.shape[1] != len(agents):
+            raise ValueError(
+                f"Task matrix shape {task_matrix.shape} does not match {len(agents)} registered agents"
+            )
+
+        capacity = np.array([a.task_capacity for a in agents], dtype=int)
+        result = solve_assignment(task_matrix, capacity, time_budget, method)
+        logger.info(
+            f"Assigned {len(task_matrix) - result.unassigned}/{len(task_matrix)} tasks "
+            f"via {result.method}, total cost {result.total_cost:.4f}"
+        )
+        return result
+
+    def optimize_swarm(self, task_matrix, time_budget: Optional[float] = None) -> List[str]:
+        """Agent IDs chosen for each assigned task, in task order"""
+        agent_ids = list(self.agent_registry)
+        result = self.optimize(task_matrix, time_budget)
+        return [agent_ids[j] for j in result.assignment if j >= 0]
+
     def allocate_task(self, task_resources: Dict) -> List[str]:
-        """Distribute task using modified bin packing algorithm"""
-        sorted_nodes = sorted(self.nodes.items(), 
-                            key=lambda x: x[1].capacity - x[1].load,
-                            reverse=True)
-        
-        allocated = []
+        """Distribute task using modified bin packing algorithm
+
+        The node with the most spare capacity takes the whole task when it
+        fits; otherwise the task spans nodes in descending spare order.
+        """
         remaining = task_resources['requirements']
-        
-        for node_id, state in sorted_nodes:
-            if state.load + remaining <= state.capacity:
-                state.load += remaining
-                allocated.append(node_id)
-                remaining = 0
+
+        # Fast path: only the shard holding the roomiest node is locked
+        for shard in sorted(self._shards, key=_NodeShard.peek_spare, reverse=True):
+            if shard.peek_spare() < remaining:
                 break
-            elif state.capacity - state.load > 0:
-                allocated.append(node_id)
-                remaining -= (state.capacity - state.load)
-                state.load = state.capacity
-                
-        if remaining > 0:
-            raise RuntimeError("Insufficient swarm resources")
-            
-        return allocated
+            with shard.lock:
+                top = shard.top()
+                if top and top[0] >= remaining:
+                    state = shard.members[top[1]]
+                    state.load += remaining
+                    shard.replace_top(top[1])
+                    return [top[1]]
+
+        return self._allocate_spanning(remaining)
+
+    def _allocate_spanning(self, remaining: int) -> List[str]:
+        for shard in self._shards:
+            shard.lock.acquire()
+        try:
+            taken: List[Tuple[_NodeShard, str, int]] = []
+            while remaining > 0:
+                candidates = [(top, shard) for shard in self._shards if (top := shard.top())]
+                if not candidates:
+                    break
+                (spare, node_id), shard = max(candidates, key=lambda c: c[0][0])
+                if spare <= 0:
+                    break
+                amount = min(spare, remaining)
+                shard.members[node_id].load += amount
+                shard.replace_top(node_id)
+                taken.append((shard, node_id, amount))
+                remaining -= amount
+
+            if remaining > 0:
+                for shard, node_id, amount in taken:
+                    shard.members[node_id].load -= amount
+                    shard.push(node_id)
+                raise RuntimeError("Insufficient swarm resources")
+
+            return [node_id for _, node_id, _ in taken]
+        finally:
+            for shard in reversed(self._shards):
+                shard.lock.release()
+
+    def submit_task(self, task_resources: Dict) -> Future:
+        """Allocate on the executor; tasks landing on different shards proceed in parallel"""
+        return self.executor.submit(self.allocate_task, task_resources)
 
     def release_resources(self, node_ids: List[str]):
         """Release allocated resources from nodes"""
-        with self.executor.lock:
-            for nid in node_ids:
-                if nid in self.nodes:
-                    self.nodes[nid].load = 0
+        for nid in node_ids:
+            shard = self._shard_of(nid)
+            with shard.lock:
+                if nid in shard.members:
+                    shard.members[nid].load = 0
+                    shard.push(nid)
@@ -32,5 +32,31 @@ def metrics(format: str):
     sample_data = {'cpu': 45.2, 'memory': 78.1}
     click.echo(sample_data if format == 'json' else yaml.dump(sample_data))
 
+@cli.command()
+@click.argument('trace_file', type=click.Path(exists=True))
+@click.option('--nodes', default=1000, help='Synthetic cluster size')
+@click.option('--cpu', default=32.0, help='CPU per synthetic node')
+@click.option('--memory', default=128.0, help='Memory per synthetic node')
+@click.option('--strategy', 'strategies', multiple=True,
+              type=click.Choice(['bin_packing', 'spread', 'random']),
+              default=('bin_packing', 'spread', 'random'), help='Strategy to replay (repeatable)')
+@click.option('--format', type=click.Choice(['table', 'json']), default='table')
+def simulate(trace_file: str, nodes: int, cpu: float, memory: float, strategies: tuple, format: str):
+    """Replay an allocation trace against each allocation strategy"""
+    import json
+    from src.agent_management.allocation_simulator import compare_strategies
+
+    reports = compare_strategies(trace_file, strategies, nodes, {'cpu': cpu, 'memory': memory})
+    if format == 'json':
+        click.echo(json.dumps([r.to_dict() for r in reports], indent=2))
+        return
+
+    click.echo(f"{'strategy':<12} {'place/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+               f"{'reject':>8} {'frag':>6} {'peak util':>9}")
+    for r in reports:
+        click.echo(f"{r.strategy:<12} {r.placements_per_sec:>10.0f} {r.p50_latency_ms:>8.3f} "
+                   f"{r.p99_latency_ms:>8.3f} {r.rejection_rate:>8.2%} {r.fragmentation:>6.2f} "
+                   f"{r.peak_utilization:>9.2%}")
+
 if __name__ == '__main__':
     cli()
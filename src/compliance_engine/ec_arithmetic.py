@@ -0,0 +1,228 @@
+# orbital-agent/src/compliance_engine/ec_arithmetic.py
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# The cryptography package does not expose point arithmetic, so the ZKP
+# engine does its group operations here in Jacobian coordinates over Python
+# integers; point decoding and validation still go through cryptography.
+
+Affine = Tuple[int, int]
+Jacobian = Tuple[int, int, int]  # Z == 0 marks the point at infinity
+
+INFINITY: Jacobian = (1, 1, 0)
+
+@dataclass(frozen=True)
+class CurveParams:
+    name: str
+    p: int
+    a: int
+    b: int
+    n: int
+    gx: int
+    gy: int
+
+    @property
+    def generator(self) -> Affine:
+        return (self.gx, self.gy)
+
+    @property
+    def order(self) -> int:
+        return self.n
+
+CURVES: Dict[str, CurveParams] = {
+    "secp256r1": CurveParams(
+        name="secp256r1",
+        p=0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff,
+        a=0xffffffff00000001000000000000000000000000fffffffffffffffffffffffc,
+        b=0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+        n=0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551,
+        gx=0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+        gy=0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+    ),
+    "secp256k1": CurveParams(
+        name="secp256k1",
+        p=0xfffffffffffffffffffffffffffffffffffffffffffffffffffffffefffffc2f,
+        a=0,
+        b=7,
+        n=0xfffffffffffffffffffffffffffffffebaaedce6af48a03bbfd25e8cd0364141,
+        gx=0x79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798,
+        gy=0x483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8,
+    ),
+    "secp384r1": CurveParams(
+        name="secp384r1",
+        p=int("fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffe"
+              "ffffffff0000000000000000ffffffff", 16),
+        a=int("fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffe"
+              "ffffffff0000000000000000fffffffc", 16),
+        b=int("b3312fa7e23ee7e4988e056be3f82d19181d9c6efe8141120314088f5013875a"
+              "c656398d8a2ed19d2a85c8edd3ec2aef", 16),
+        n=int("ffffffffffffffffffffffffffffffffffffffffffffffffc7634d81f4372ddf"
+              "581a0db248b0a77aecec196accc52973", 16),
+        gx=int("aa87ca22be8b05378eb1c71ef320ad746e1d3b628ba79b9859f741e082542a38"
+               "5502f25dbf55296c3a545e3872760ab7", 16),
+        gy=int("3617de4a96262c6f5d9e98bf9292dc29f8f41dbd289a147ce9da3113b5f0b8c0"
+               "0a60b1ce1d7e819d7a431d7c90ea0e5f", 16),
+    ),
+}
+
+def curve_params(curve) -> CurveParams:
+    """Parameters for a cryptography curve instance or curve name"""
+    name = curve if isinstance(curve, str) else curve.name
+    try:
+        return CURVES[name]
+    except KeyError:
+        raise ValueError(f"Unsupported curve for ZKP arithmetic: {name}")
+
+def negate(point: Affine, params: CurveParams) -> Affine:
+    return (point[0], (-point[1]) % params.p)
+
+def to_affine(point: Jacobian, params: CurveParams) -> Optional[Affine]:
+    x, y, z = point
+    if z == 0:
+        return None
+    p = params.p
+    z_inv = pow(z, -1, p)
+    z_inv2 = z_inv * z_inv % p
+    return (x * z_inv2 % p, y * z_inv2 * z_inv % p)
+
+def double(point: Jacobian, params: CurveParams) -> Jacobian:
+    x, y, z = point
+    if z == 0 or y == 0:
+        return INFINITY
+    p = params.p
+    xx = x * x % p
+    yy = y * y % p
+    yyyy = yy * yy % p
+    zz = z * z % p
+    s = 2 * ((x + yy) ** 2 - xx - yyyy) % p
+    m = (3 * xx + params.a * zz * zz) % p
+    x3 = (m * m - 2 * s) % p
+    y3 = (m * (s - x3) - 8 * yyyy) % p
+    z3 = ((y + z) ** 2 - yy - zz) % p
+    return (x3, y3, z3)
+
+def add(p1: Jacobian, p2: Jacobian, params: CurveParams) -> Jacobian:
+    x1, y1, z1 = p1
+    x2, y2, z2 = p2
+    if z1 == 0:
+        return p2
+    if z2 == 0:
+        return p1
+    p = params.p
+    z1z1 = z1 * z1 % p
+    z2z2 = z2 * z2 % p
+    u1 = x1 * z2z2 % p
+    u2 = x2 * z1z1 % p
+    s1 = y1 * z2 * z2z2 % p
+    s2 = y2 * z1 * z1z1 % p
+    h = (u2 - u1) % p
+    r = (s2 - s1) % p
+    if h == 0:
+        return double(p1, params) if r == 0 else INFINITY
+    hh = h * h % p
+    hhh = h * hh % p
+    v = u1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    y3 = (r * (v - x3) - s1 * hhh) % p
+    return (x3, y3, z1 * z2 * h % p)
+
+def add_affine(p1: Jacobian, p2: Affine, params: CurveParams) -> Jacobian:
+    """Mixed addition with an affine (Z = 1) second operand"""
+    x1, y1, z1 = p1
+    x2, y2 = p2
+    if z1 == 0:
+        return (x2, y2, 1)
+    p = params.p
+    z1z1 = z1 * z1 % p
+    u2 = x2 * z1z1 % p
+    s2 = y2 * z1 * z1z1 % p
+    h = (u2 - x1) % p
+    r = (s2 - y1) % p
+    if h == 0:
+        return double(p1, params) if r == 0 else INFINITY
+    hh = h * h % p
+    hhh = h * hh % p
+    v = x1 * hh % p
+    x3 = (r * r - hhh - 2 * v) % p
+    y3 = (r * (v - x3) - y1 * hhh) % p
+    return (x3, y3, z1 * h % p)
+
+def window_table(point: Affine, params: CurveParams, width: int = 4) -> List[Jacobian]:
+    """``table[d] = d * point`` for every ``width``-bit digit ``d``"""
+    table = [INFINITY, (point[0], point[1], 1)]
+    for _ in range(2, 1 << width):
+        table.append(add_affine(table[-1], point, params))
+    return table
+
+def shamir_mult(scalars: Sequence[int], tables: Sequence[List[Jacobian]],
+                params: CurveParams, width: int = 4) -> Jacobian:
+    """Interleaved fixed-window ``sum(k_i * P_i)`` sharing one doubling chain"""
+    bits = max((k.bit_length() for k in scalars), default=0)
+    windows = (bits + width - 1) // width
+    mask = (1 << width) - 1
+    acc = INFINITY
+    for w in range(windows - 1, -1, -1):
+        if acc[2]:
+            for _ in range(width):
+                acc = double(acc, params)
+        shift = w * width
+        for k, table in zip(scalars, tables):
+            digit = (k >> shift) & mask
+            if digit:
+                acc = add(acc, table[digit], params)
+    return acc
+
+def scalar_mult(k: int, point: Affine, params: CurveParams) -> Jacobian:
+    return shamir_mult([k % params.n], [window_table(point, params)], params)
+
+def multi_scalar_mult(scalars: Sequence[int], points: Sequence[Affine], params: CurveParams) -> Jacobian:
+    """Pippenger bucket method for ``sum(k_i * P_i)`` over many affine points
+
+    Cost is about ``bits / c * (len(points) + 2**c)`` additions for window
+    width ``c``, versus ``bits`` doublings per point when multiplying
+    separately, so it pays off from a few dozen points up.
+    """
+    pairs = [(k, P) for k, P in zip(scalars, points) if k]
+    if not pairs:
+        return INFINITY
+    if len(pairs) < 16:
+        return shamir_mult([k for k, _ in pairs], [window_table(P, params) for _, P in pairs], params)
+
+    bits = max(k.bit_length() for k, _ in pairs)
+    width = max(4, int(math.log2(len(pairs))) - 2)
+    mask = (1 << width) - 1
+    acc = INFINITY
+    for w in range((bits + width - 1) // width - 1, -1, -1):
+        if acc[2]:
+            for _ in range(width):
+                acc = double(acc, params)
+        shift = w * width
+        buckets: List[Optional[Jacobian]] = [None] * (mask + 1)
+        for k, P in pairs:
+            digit = (k >> shift) & mask
+            if digit:
+                bucket = buckets[digit]
+                buckets[digit] = (P[0], P[1], 1) if bucket is None else add_affine(bucket, P, params)
+        # sum(d * bucket[d]) as a running suffix sum
+        running = total = INFINITY
+        for digit in range(mask, 0, -1):
+            bucket = buckets[digit]
+            if bucket is not None:
+                running = add(running, bucket, params)
+            if running[2]:
+                total = add(total, running, params)
+        acc = add(acc, total, params)
+    return acc
+
+def is_infinity(point: Jacobian) -> bool:
+    return point[2] == 0
+
+def equals(point: Jacobian, other: Affine, params: CurveParams) -> bool:
+    """Compare a Jacobian point with an affine one without an inversion"""
+    x, y, z = point
+    if z == 0:
+        return False
+    p = params.p
+    zz = z * z % p
+    return x == other[0] * zz % p and y == other[1] * zz * z % p
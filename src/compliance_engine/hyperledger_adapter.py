@@ -6,18 +6,33 @@ from hfc.fabric.user import User
 from hfc.fabric.peer import Peer
 from hfc.util import utils
 from pathlib import Path
+from functools import partial
+from typing import Callable, Dict, List, Optional, Union
 import asyncio
+import time
 
-logger = logging.getLogger(__name__)
+from .ledger_cache import PeerSelector, QueryCache, has_content, written_keys
+from .ledger_pipeline import CommitPipeline, LedgerError, SigningIdentityCache
+from .merkle_batch import BatchRecorder, OperationReceipt
 
-class LedgerError(Exception):
-    """Base exception for Hyperledger Fabric interactions"""
+logger = logging.getLogger(__name__)
 
 class HyperledgerConnector:
-    def __init__(self, network_profile: str, org_name: str, user_name: str):
+    def __init__(self, network_profile: str, org_name: str, user_name: str,
+                 max_in_flight: int = 64, commit_timeout: float = 30.0,
+                 query_cache_size: int = 10000):
         self.client = Client(net_profile=network_profile)
         self.org_name = org_name
         self.user_name = user_name
+        self.max_in_flight = max_in_flight
+        self.commit_timeout = commit_timeout
+        self.query_cache_size = query_cache_size
+        self._identity: Optional[SigningIdentityCache] = None
+        self._pipelines: Dict[str, CommitPipeline] = {}
+        self._listeners: Dict[str, asyncio.Task] = {}
+        # Per-channel read caches, each kept fresh by a block-event watcher
+        self._query_caches: Dict[str, QueryCache] = {}
+        self._block_watchers: Dict[str, asyncio.Task] = {}
         self._configure_peers()
         
     def _configure_peers(self):
@@ -29,6 +44,7 @@ class HyperledgerConnector:
                  opts={'grpc.ssl_target_name_override': peer['grpc_options']['ssl_target_name_override']})
             for peer in org_info['peers']
         ]
+        self.peer_selector = PeerSelector(self.peers)
 
     async def submit_transaction(self, channel: str, cc_name: str, fcn: str, args: list) -> dict:
         """Submit transaction to Hyperledger Fabric network"""
@@ -48,37 +64,166 @@ class HyperledgerConnector:
             logger.error(f"Transaction failed: {str(e)}")
             raise LedgerError("Chaincode invocation failed") from e
 
-    async def query_chaincode(self, channel: str, cc_name: str, fcn: str, args: list) -> dict:
-        """Query data from blockchain ledger"""
+    async def submit_transaction_pipelined(self, channel: str, cc_name: str, fcn: str,
+                                           args: list) -> asyncio.Future:
+        """Endorse and send without waiting for the commit
+
+        Returns once the transaction is handed to the orderer (or waits for
+        a slot when ``max_in_flight`` transactions are uncommitted); the
+        returned future resolves to the same result as submit_transaction
+        when the transaction's block commits.
+        """
+        pipeline = self._pipeline(channel)
+        return await pipeline.submit(cc_name, fcn, args)
+
+    async def drain(self) -> None:
+        """Wait for every pipelined transaction to commit or fail"""
+        for pipeline in list(self._pipelines.values()):
+            await pipeline.drain()
+
+    async def query_chaincode(self, channel: str, cc_name: str, fcn: str, args: list,
+                              read_keys: Optional[List[str]] = None, immutable: bool = False,
+                              found: Optional[Callable[[dict], bool]] = None) -> dict:
+        """Query data from blockchain ledger
+
+        Results are cached per channel until a block writes one of
+        ``read_keys`` (defaults to ``args``); ``immutable`` marks write-once
+        records that never go stale by age. Only results that ``found``
+        accepts (by default, any non-empty result) are cached, so a record
+        that has not committed yet is asked for again. Cached results are
+        shared, so callers must not mutate them. Each query goes to a single
+        peer, the fastest healthy one.
+        """
+        cache = self._query_cache(channel)
+        key = QueryCache.key(channel, cc_name, fcn, args)
+        if cache is not None:
+            hit, result = cache.get(key)
+            if hit:
+                return result
+            read_height = cache.begin_read()
+        try:
+            response = await self._query_one_peer(channel, cc_name, fcn, args)
+        except Exception:
+            if cache is not None:
+                cache.abort_read(read_height)
+            raise
+        result = self._parse_query_result(response)
+        if cache is not None:
+            cache.put(key, result, read_height, read_keys if read_keys is not None else args,
+                      immutable, found or has_content)
+        return result
+
+    async def _query_one_peer(self, channel: str, cc_name: str, fcn: str, args: list) -> bytes:
+        """Try peers in latency order until one answers"""
         user = self._get_user_context()
+        last_error: Optional[Exception] = None
+        for peer in self.peer_selector.ranked():
+            started = time.perf_counter()
+            try:
+                response = await self.client.chaincode_query(
+                    requestor=user,
+                    channel_name=channel,
+                    peers=[peer],
+                    args=args,
+                    cc_name=cc_name,
+                    fcn=fcn
+                )
+            except Exception as e:
+                self.peer_selector.record_failure(peer)
+                last_error = e
+                continue
+            self.peer_selector.record_success(peer, time.perf_counter() - started)
+            return response
+        logger.error(f"Query failed: {str(last_error)}")
+        raise LedgerError("Chaincode query failed") from last_error
+
+    def _query_cache(self, channel: str) -> Optional[QueryCache]:
+        if self.query_cache_size <= 0:
+            return None
+        cache = self._query_caches.get(channel)
+        if cache is None:
+            cache = QueryCache(self.query_cache_size)
+            self._query_caches[channel] = cache
+            self._block_watchers[channel] = asyncio.ensure_future(self._watch_block_writes(channel, cache))
+        return cache
+
+    async def _watch_block_writes(self, channel: str, cache: QueryCache):
+        """Invalidate cached reads from the write sets of full block events"""
         try:
-            response = await self.client.chaincode_query(
-                requestor=user,
-                channel_name=channel,
-                peers=self.peers,
-                args=args,
-                cc_name=cc_name,
-                fcn=fcn
+            event_hub = self.client.get_channel(channel).newChannelEventHub(
+                self.peer_selector.choose(), self._get_user_context()
+            )
+            stream = event_hub.connect(filtered=False, start='newest')
+            event_hub.registerBlockEvent(
+                onEvent=lambda block: cache.on_block(block['header']['number'], written_keys(block))
             )
-            return self._parse_query_result(response)
+            await stream
         except Exception as e:
-            logger.error(f"Query failed: {str(e)}")
-            raise LedgerError("Chaincode query failed") from e
+            logger.error(f"Block event stream for {channel} closed: {str(e)}")
+        finally:
+            # Without invalidations the cache cannot be trusted; the next
+            # query starts a fresh one
+            cache.clear()
+            self._query_caches.pop(channel, None)
+            self._block_watchers.pop(channel, None)
 
     def _get_user_context(self) -> User:
-        """Load user cryptographic materials"""
-        org = self.client.get_organization(self.org_name)
-        crypto_path = Path(org['crypto_path'])
-        
-        cert_path = crypto_path / 'users' / self.user_name / 'msp' / 'signcerts' / f'{self.user_name}cert.pem'
-        key_dir = crypto_path / 'users' / self.user_name / 'msp' / 'keystore'
-        key_path = next(key_dir.glob('*_sk'))
-        
+        """Load user cryptographic materials, reusing them until the files change"""
+        if self._identity is None:
+            org = self.client.get_organization(self.org_name)
+            self._identity = SigningIdentityCache(org['crypto_path'], self.user_name, self._load_user)
+        return self._identity.get()
+
+    def _load_user(self, cert_path: Path, key_path: Path) -> User:
         return User(
             name=self.user_name,
             crypto=utils.Crypto(cert_path, key_path)
         )
 
+    def _pipeline(self, channel: str) -> CommitPipeline:
+        pipeline = self._pipelines.get(channel)
+        if pipeline is None:
+            pipeline = CommitPipeline(
+                partial(self._send_transaction, channel), self.max_in_flight, self.commit_timeout
+            )
+            self._pipelines[channel] = pipeline
+            self._listeners[channel] = asyncio.ensure_future(self._listen_for_commits(channel, pipeline))
+        return pipeline
+
+    async def _send_transaction(self, channel: str, cc_name: str, fcn: str, args: list) -> str:
+        response = await self.client.chaincode_invoke(
+            requestor=self._get_user_context(),
+            channel_name=channel,
+            peers=self.peers,
+            args=args,
+            cc_name=cc_name,
+            fcn=fcn,
+            wait_for_event=False
+        )
+        if response['status'] != 'SUCCESS':
+            raise LedgerError(f"Transaction error: {response.get('message', 'Unknown error')}")
+        return response['tx_id']
+
+    async def _listen_for_commits(self, channel: str, pipeline: CommitPipeline):
+        """Feed filtered block events from one peer into the channel's pipeline"""
+        def on_block(block):
+            pipeline.on_block(block['number'], [
+                (tx['txid'], tx['tx_validation_code'])
+                for tx in block.get('filtered_transactions', [])
+            ])
+
+        try:
+            event_hub = self.client.get_channel(channel).newChannelEventHub(self.peers[0], self._get_user_context())
+            stream = event_hub.connect(filtered=True, start='newest')
+            event_hub.registerBlockEvent(onEvent=on_block)
+            await stream
+        except Exception as e:
+            logger.error(f"Commit event stream for {channel} closed: {str(e)}")
+        finally:
+            pipeline.fail_all(LedgerError(f"Lost commit events for channel {channel}"))
+            self._pipelines.pop(channel, None)
+            self._listeners.pop(channel, None)
+
     def _process_response(self, response: dict) -> dict:
         """Validate and parse transaction response"""
         if response['status'] != 'SUCCESS':
@@ -102,13 +247,28 @@ class HyperledgerConnector:
             return {'raw_response': response.decode('utf-8')}
 
 class ChaincodeManager:
-    def __init__(self, connector: HyperledgerConnector):
+    """Records operations on the ledger
+
+    With ``batch_size > 1`` operations are grouped into Merkle-rooted
+    bundles of up to ``batch_size`` (or whatever arrives within
+    ``batch_window`` seconds) and committed as one ``CreateOperationBundle``
+    transaction carrying the root and the compact operation list; each
+    caller gets a receipt with its inclusion proof.
+    """
+
+    def __init__(self, connector: HyperledgerConnector, batch_size: int = 1, batch_window: float = 0.05):
         self.connector = connector
         self.channel_name = "orbital-channel"
         self.cc_name = "orbital-chaincode"
-        
+        self.recorder = BatchRecorder(self._submit_bundle, batch_size, batch_window) if batch_size > 1 else None
+        # Bundle roots already confirmed on the ledger
+        self._anchored_roots: set = set()
+
     async def record_operation(self, operation_data: dict) -> dict:
         """Store operation metadata on blockchain"""
+        if self.recorder is not None:
+            receipt = await self.recorder.record(operation_data)
+            return receipt.to_dict()
         return await self.connector.submit_transaction(
             channel=self.channel_name,
             cc_name=self.cc_name,
@@ -116,11 +276,64 @@ class ChaincodeManager:
             args=[json.dumps(operation_data)]
         )
 
-    async def verify_audit_trail(self, operation_id: str) -> dict:
-        """Retrieve and validate audit trail"""
-        return await self.connector.query_chaincode(
+    async def flush(self) -> None:
+        """Commit any operations still waiting for their bundle"""
+        if self.recorder is not None:
+            await self.recorder.flush()
+
+    async def verify_audit_trail(self, operation_id: str,
+                                 receipt: Optional[Union[dict, OperationReceipt]] = None) -> dict:
+        """Retrieve and validate audit trail
+
+        Given a bundle receipt the operation is checked against its Merkle
+        proof locally; the ledger is asked only once per bundle root.
+        """
+        if receipt is None:
+            # Audit records are write-once: once present they stay cached until evicted
+            return await self.connector.query_chaincode(
+                channel=self.channel_name,
+                cc_name=self.cc_name,
+                fcn="QueryOperation",
+                args=[operation_id],
+                immutable=True,
+                found=has_content
+            )
+
+        if isinstance(receipt, dict):
+            receipt = OperationReceipt.from_dict(receipt)
+        included = receipt.operation_id == operation_id and receipt.verify()
+        anchored = included and await self._root_anchored(receipt.root)
+        return {
+            'operation_id': operation_id,
+            'verified': included and anchored,
+            'root': receipt.root,
+            'tx_id': receipt.tx_id,
+            'block_number': receipt.block_number
+        }
+
+    async def _submit_bundle(self, root: str, operations: List[dict]) -> dict:
+        result = await self.connector.submit_transaction(
+            channel=self.channel_name,
+            cc_name=self.cc_name,
+            fcn="CreateOperationBundle",
+            args=[root, json.dumps(operations, separators=(',', ':'), default=str)]
+        )
+        self._anchored_roots.add(root)
+        return result
+
+    async def _root_anchored(self, root: str) -> bool:
+        if root in self._anchored_roots:
+            return True
+        result = await self.connector.query_chaincode(
             channel=self.channel_name,
             cc_name=self.cc_name,
-            fcn="QueryOperation",
-            args=[operation_id]
+            fcn="QueryBundle",
+            args=[root],
+            immutable=True,
+            found=lambda bundle: bundle.get('root') == root
         )
+        # Misses are not cached: the bundle may simply not have committed yet
+        if result.get('root') != root:
+            return False
+        self._anchored_roots.add(root)
+        return True
@@ -0,0 +1,192 @@
+# orbital-agent/src/compliance_engine/ledger_cache.py
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str, Tuple]
+
+@dataclass
+class CachedQuery:
+    result: Any
+    block_height: int
+    read_keys: Tuple[str, ...]
+    immutable: bool = False
+
+class QueryCache:
+    """Chaincode query results tagged with the block height they were read at
+
+    Each entry lists the ledger keys its query reads. ``on_block`` drops
+    entries whose keys a new block wrote. Mutable entries also expire after
+    ``max_staleness`` blocks, as a safety net for writes the caller could
+    not attribute to keys. Immutable entries (write-once audit records) are
+    kept until a write to their key or LRU eviction. A result read while a
+    block wrote one of its keys is not stored, and neither is a miss: a
+    record that is not there yet may commit in any later block.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_staleness: int = 10):
+        self.max_entries = max_entries
+        self.max_staleness = max_staleness
+        self.block_height = 0
+        self._entries: "OrderedDict[CacheKey, CachedQuery]" = OrderedDict()
+        self._by_ledger_key: Dict[str, Set[CacheKey]] = {}
+        # Ledger key -> height of its last write, kept while reads are in flight
+        self._recent_writes: Dict[str, int] = {}
+        self._reads_in_flight: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(channel: str, cc_name: str, fcn: str, args: Sequence) -> CacheKey:
+        return (channel, cc_name, fcn, tuple(args))
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is not None and not entry.immutable and \
+                self.block_height - entry.block_height > self.max_staleness:
+            self._drop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry.result
+
+    def begin_read(self) -> int:
+        """Mark a ledger read as started; returns the height to pass to ``put``"""
+        self._reads_in_flight[self.block_height] += 1
+        return self.block_height
+
+    def put(self, key: CacheKey, result: Any, read_height: int, read_keys: Iterable[str],
+            immutable: bool = False, found: Callable[[Any], bool] = None) -> bool:
+        """Store a result read at ``read_height``
+
+        Returns False without storing when a block raced the read or when
+        ``found`` (default: has_content) says the result is a miss.
+        """
+        read_keys = tuple(read_keys)
+        raced = any(self._recent_writes.get(k, -1) > read_height for k in read_keys)
+        self._end_read(read_height)
+        if raced or not (found or has_content)(result):
+            return False
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = CachedQuery(result, read_height, read_keys, immutable)
+        for ledger_key in read_keys:
+            self._by_ledger_key.setdefault(ledger_key, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+        return True
+
+    def abort_read(self, read_height: int) -> None:
+        self._end_read(read_height)
+
+    def on_block(self, block_number: int, written_keys: Iterable[str]) -> int:
+        """Advance the height and invalidate entries reading any written key"""
+        self.block_height = max(self.block_height, block_number)
+        dropped = 0
+        for ledger_key in written_keys:
+            if self._reads_in_flight:
+                self._recent_writes[ledger_key] = self.block_height
+            for key in list(self._by_ledger_key.get(ledger_key, ())):
+                self._drop(key)
+                dropped += 1
+        if dropped:
+            logger.debug(f"Block {block_number} invalidated {dropped} cached queries")
+        return dropped
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_ledger_key.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _end_read(self, read_height: int) -> None:
+        self._reads_in_flight[read_height] -= 1
+        if self._reads_in_flight[read_height] <= 0:
+            del self._reads_in_flight[read_height]
+        # Writes at or below the oldest in-flight read can no longer race one
+        oldest = min(self._reads_in_flight, default=None)
+        if oldest is None:
+            self._recent_writes.clear()
+        elif len(self._recent_writes) > self.max_entries:
+            self._recent_writes = {k: h for k, h in self._recent_writes.items() if h > oldest}
+
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for ledger_key in entry.read_keys:
+            keys = self._by_ledger_key.get(ledger_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_ledger_key[ledger_key]
+
+def has_content(result: Any) -> bool:
+    """False for empty query results, e.g. a record that has not committed yet"""
+    if not result:
+        return False
+    if isinstance(result, dict) and set(result) <= {'result', 'raw_response'}:
+        return any(value not in (None, '', [], {}) for value in result.values())
+    return True
+
+class PeerSelector:
+    """Route each query to the healthy peer with the lowest smoothed latency
+
+    Latency is an exponentially weighted moving average. Unmeasured peers
+    rank first, so each gets probed once. A failed peer sits out for
+    ``cooldown`` seconds; if every peer is cooling down, the one that
+    failed longest ago is used.
+    """
+
+    def __init__(self, peers: Sequence[Hashable], alpha: float = 0.2, cooldown: float = 30.0):
+        self.peers = list(peers)
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.latency: Dict[Hashable, float] = {}
+        self._down_until: Dict[Hashable, float] = {}
+
+    def ranked(self) -> List[Hashable]:
+        """Peers in the order a query should try them"""
+        now = time.monotonic()
+        healthy = [p for p in self.peers if self._down_until.get(p, 0.0) <= now]
+        healthy.sort(key=lambda p: self.latency.get(p, 0.0))
+        cooling = sorted((p for p in self.peers if p not in healthy), key=lambda p: self._down_until[p])
+        return healthy + cooling
+
+    def choose(self) -> Hashable:
+        if not self.peers:
+            raise ValueError("No peers configured")
+        return self.ranked()[0]
+
+    def record_success(self, peer: Hashable, latency: float) -> None:
+        previous = self.latency.get(peer)
+        self.latency[peer] = latency if previous is None else previous + self.alpha * (latency - previous)
+        self._down_until.pop(peer, None)
+
+    def record_failure(self, peer: Hashable) -> None:
+        self._down_until[peer] = time.monotonic() + self.cooldown
+        logger.warning(f"Peer {getattr(peer, 'endpoint', peer)} marked unhealthy for {self.cooldown}s")
+
+def written_keys(block: Dict) -> List[str]:
+    """Keys written by the valid transactions of a decoded (unfiltered) Fabric block"""
+    keys: List[str] = []
+    flags = block.get('metadata', {}).get('metadata', [None, None, None])
+    validation = flags[2] if len(flags) > 2 and flags[2] is not None else None
+    for i, envelope in enumerate(block.get('data', {}).get('data', [])):
+        if validation is not None and i < len(validation) and validation[i] != 0:
+            continue
+        actions = envelope.get('payload', {}).get('data', {}).get('actions', [])
+        for action in actions:
+            results = (action.get('payload', {}).get('action', {})
+                       .get('proposal_response_payload', {}).get('extension', {}).get('results', {}))
+            for ns in results.get('ns_rwset', []):
+                keys.extend(write['key'] for write in ns.get('rwset', {}).get('writes', []))
+    return keys
@@ -0,0 +1,167 @@
+# orbital-agent/src/compliance_engine/ledger_pipeline.py
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LedgerError(Exception):
+    """Base exception for Hyperledger Fabric interactions"""
+
+class SigningIdentityCache:
+    """User signing material loaded once and reloaded when the files change
+
+    Each lookup costs a few ``stat`` calls: the certificate, the keystore
+    directory (whose mtime moves when keys are added or removed) and the
+    current key file. The keystore is globbed again only when the
+    directory changed.
+    """
+
+    def __init__(self, crypto_path: str, user_name: str, loader: Callable[[Path, Path], Any]):
+        msp = Path(crypto_path) / 'users' / user_name / 'msp'
+        self.cert_path = msp / 'signcerts' / f'{user_name}cert.pem'
+        self.key_dir = msp / 'keystore'
+        self.loader = loader
+        self._key_path: Optional[Path] = None
+        self._key_dir_stamp: Optional[Tuple[int, int]] = None
+        self._stamp: Optional[Tuple] = None
+        self._identity: Any = None
+        self.loads = 0
+
+    def get(self) -> Any:
+        key_dir_stamp = _stamp(self.key_dir)
+        if key_dir_stamp != self._key_dir_stamp or self._key_path is None:
+            self._key_path = next(iter(sorted(self.key_dir.glob('*_sk'))), None)
+            if self._key_path is None:
+                raise LedgerError(f"No private key in {self.key_dir}")
+            self._key_dir_stamp = key_dir_stamp
+
+        stamp = (_stamp(self.cert_path), self._key_path, _stamp(self._key_path))
+        if stamp != self._stamp or self._identity is None:
+            self._identity = self.loader(self.cert_path, self._key_path)
+            self._stamp = stamp
+            self.loads += 1
+            logger.info(f"Loaded signing identity from {self.cert_path.parent.parent}")
+        return self._identity
+
+    def invalidate(self) -> None:
+        self._stamp = None
+        self._key_dir_stamp = None
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        raise LedgerError(f"Missing crypto material: {path}")
+    return info.st_mtime_ns, info.st_size
+
+# Send a transaction for endorsement and ordering without waiting for the
+# commit; returns its transaction ID
+TransactionSender = Callable[..., Awaitable[str]]
+
+class CommitPipeline:
+    """Pipelined submission: send now, resolve when the commit event arrives
+
+    At most ``max_in_flight`` transactions are sent but not yet committed;
+    ``submit`` waits for a slot when the window is full. Commit events are
+    fed in through ``on_block`` by whatever listens to the peer's block
+    stream. A transaction that is not seen committed within
+    ``commit_timeout`` seconds fails with LedgerError.
+    """
+
+    def __init__(self, send: TransactionSender, max_in_flight: int = 64, commit_timeout: float = 30.0,
+                 early_commit_blocks: int = 3):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.send = send
+        self.max_in_flight = max_in_flight
+        self.commit_timeout = commit_timeout
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._waiting: Dict[str, Tuple[asyncio.Future, asyncio.TimerHandle]] = {}
+        # Commits that arrived before the sender returned the transaction ID,
+        # oldest first. On a shared channel most are other clients'
+        # transactions, so entries older than ``early_commit_blocks`` blocks
+        # are dropped and the buffer is capped, evicting the oldest.
+        self.early_commit_blocks = early_commit_blocks
+        self._early: "OrderedDict[str, Dict]" = OrderedDict()
+        self._early_limit = 4 * max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._waiting)
+
+    async def submit(self, *args, **kwargs) -> asyncio.Future:
+        """Send a transaction once a slot is free; the returned future resolves on commit"""
+        await self._slots.acquire()
+        try:
+            tx_id = await self.send(*args, **kwargs)
+        except Exception as e:
+            self._slots.release()
+            logger.error(f"Transaction failed: {str(e)}")
+            raise LedgerError("Chaincode invocation failed") from e
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        timer = loop.call_later(self.commit_timeout, self._expire, tx_id)
+        self._waiting[tx_id] = (future, timer)
+        early = self._early.pop(tx_id, None)
+        if early is not None:
+            self._resolve(tx_id, early)
+        return future
+
+    def on_block(self, block_number: int, transactions: Iterable[Tuple[str, str]]) -> None:
+        """Resolve futures for ``(tx_id, validation_code)`` pairs committed in a block"""
+        for tx_id, validation_code in transactions:
+            result = {'tx_id': tx_id, 'block_number': block_number, 'validation_code': validation_code}
+            if tx_id in self._waiting:
+                self._resolve(tx_id, result)
+            else:
+                self._early[tx_id] = result
+                if len(self._early) > self._early_limit:
+                    self._early.popitem(last=False)
+        self._expire_early(block_number)
+
+    async def drain(self) -> None:
+        """Wait until every submitted transaction has committed or failed"""
+        pending = [future for future, _ in self._waiting.values()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def fail_all(self, error: Exception) -> None:
+        """Fail every waiting transaction, e.g. when the event stream is lost"""
+        for tx_id in list(self._waiting):
+            self._settle(tx_id, error=error)
+
+    def _expire_early(self, block_number: int) -> None:
+        oldest = block_number - self.early_commit_blocks
+        while self._early:
+            result = next(iter(self._early.values()))
+            if result['block_number'] >= oldest:
+                break
+            self._early.popitem(last=False)
+
+    def _resolve(self, tx_id: str, result: Dict) -> None:
+        if result['validation_code'] != 'VALID':
+            self._settle(tx_id, error=LedgerError(f"Transaction error: {result['validation_code']}"))
+        else:
+            self._settle(tx_id, result=result)
+
+    def _expire(self, tx_id: str) -> None:
+        self._settle(tx_id, error=LedgerError(f"Transaction {tx_id} not committed within {self.commit_timeout}s"))
+
+    def _settle(self, tx_id: str, result: Optional[Dict] = None, error: Optional[Exception] = None) -> None:
+        entry = self._waiting.pop(tx_id, None)
+        if entry is None:
+            return
+        future, timer = entry
+        timer.cancel()
+        self._slots.release()
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
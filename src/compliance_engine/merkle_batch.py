@@ -0,0 +1,168 @@
+# orbital-agent/src/compliance_engine/merkle_batch.py
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Domain-separated hashing (RFC 6962) so an inner node can never be passed
+# off as a leaf
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+def canonical_operation(operation: Dict) -> bytes:
+    """Stable compact JSON encoding of an operation; the Merkle leaf preimage"""
+    return json.dumps(operation, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+class MerkleTree:
+    """Binary SHA-256 Merkle tree; a node without a sibling is promoted unchanged"""
+
+    def __init__(self, leaves: List[bytes]):
+        if not leaves:
+            raise ValueError("A Merkle tree needs at least one leaf")
+        self.levels: List[List[bytes]] = [[leaf_hash(leaf) for leaf in leaves]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def proof(self, index: int) -> List[Tuple[str, str]]:
+        """Sibling hashes from leaf to root as ``(side, hex)``; side is where the sibling sits"""
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(('left' if sibling < index else 'right', level[sibling].hex()))
+            index //= 2
+        return path
+
+def verify_inclusion(data: bytes, proof: List[Tuple[str, str]], root: str) -> bool:
+    """Check that ``data`` is a leaf of the tree whose hex root is ``root``"""
+    digest = leaf_hash(data)
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        digest = node_hash(sibling, digest) if side == 'left' else node_hash(digest, sibling)
+    return digest.hex() == root
+
+@dataclass
+class OperationReceipt:
+    """Proof that one operation was committed inside a Merkle-rooted bundle"""
+    operation: Dict
+    root: str
+    index: int
+    bundle_size: int
+    proof: List[Tuple[str, str]] = field(default_factory=list)
+    tx_id: Optional[str] = None
+    block_number: Optional[int] = None
+    validation_code: Any = None
+
+    @property
+    def operation_id(self) -> Optional[str]:
+        return self.operation.get('operation_id')
+
+    def verify(self) -> bool:
+        """Recompute the root from the operation and its inclusion proof"""
+        return verify_inclusion(canonical_operation(self.operation), self.proof, self.root)
+
+    def to_dict(self) -> Dict:
+        receipt = asdict(self)
+        receipt['proof'] = [list(step) for step in self.proof]
+        return receipt
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "OperationReceipt":
+        data = dict(data)
+        data['proof'] = [tuple(step) for step in data.get('proof', [])]
+        return cls(**data)
+
+BundleSubmitter = Callable[[str, List[Dict]], Awaitable[Dict]]
+
+class BatchRecorder:
+    """Collect operations into Merkle-rooted bundles submitted as one transaction
+
+    A bundle is flushed once ``max_batch`` operations are waiting or
+    ``max_delay`` seconds after its first operation, whichever comes first.
+    ``submit(root_hex, operations)`` must commit the bundle and return the
+    transaction result; every caller then gets its own receipt. If the
+    submission fails, every caller in the bundle sees the error.
+    """
+
+    def __init__(self, submit: BundleSubmitter, max_batch: int = 256, max_delay: float = 0.05):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.submit = submit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+
+    async def record(self, operation: Dict) -> OperationReceipt:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((operation, future))
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+        return await future
+
+    async def flush(self) -> None:
+        """Submit whatever is waiting and wait for every in-flight bundle"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        bundle, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._submit_bundle(bundle))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _submit_bundle(self, bundle: List[Tuple[Dict, asyncio.Future]]) -> None:
+        operations = [operation for operation, _ in bundle]
+        tree = MerkleTree([canonical_operation(operation) for operation in operations])
+        root = tree.root.hex()
+        try:
+            result = await self.submit(root, operations)
+        except Exception as e:
+            logger.error(f"Bundle {root[:16]} of {len(bundle)} operations failed: {str(e)}")
+            for _, future in bundle:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Committed bundle {root[:16]} with {len(bundle)} operations")
+        for index, (operation, future) in enumerate(bundle):
+            if future.done():
+                continue
+            future.set_result(OperationReceipt(
+                operation=operation,
+                root=root,
+                index=index,
+                bundle_size=len(bundle),
+                proof=tree.proof(index),
+                tx_id=result.get('tx_id'),
+                block_number=result.get('block_number'),
+                validation_code=result.get('validation_code')
+            ))
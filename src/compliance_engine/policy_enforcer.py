@@ -1,10 +1,22 @@
 # orbital-agent/src/compliance_engine/policy_enforcer.py
+import hashlib
+import itertools
 import logging
 import json
-from typing import Dict, List, Any, Optional
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, FrozenSet, Iterable, List, Any, Optional, Tuple
 from jsonpath_ng import parse
+from jsonpath_ng.jsonpath import Child, Fields, Root, This
 import re
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 class PolicyViolationError(Exception):
@@ -13,43 +25,497 @@ class PolicyViolationError(Exception):
 class PolicySyntaxError(Exception):
     """Exception raised for invalid policy syntax"""
 
+_MISSING = object()
+# Dotted paths over plain identifiers ("$.a.b" or "a.b") are resolved with
+# dict lookups; anything else goes through jsonpath_ng
+_SIMPLE_PATH = re.compile(r"^(?:\$\.)?([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)$", re.ASCII)
+_RESERVED_PATH_WORDS = {"where", "wherenot"}
+
+Check = Callable[[Dict], bool]
+
+@dataclass
+class CompiledCondition:
+    kind: str
+    check: Check
+    path: Optional[str] = None
+    keys: Optional[Tuple[str, ...]] = None
+    operator: Optional[str] = None
+    expected: Any = None
+    # Top-level request key the condition reads, and its fixed outcome when
+    # that key is missing; together they let the policy index skip it
+    root: Optional[str] = None
+    passes_when_absent: bool = True
+
+@dataclass
+class CompiledPolicy:
+    policy_id: str
+    conditions: List[CompiledCondition]
+    checks: Tuple[Check, ...]
+    violation: Dict
+
+def _path_root(expr) -> Optional[str]:
+    """Top-level key a parsed JSONPath starts from, if any; absent key means no matches"""
+    steps = []
+    while isinstance(expr, Child):
+        steps.append(expr.right)
+        expr = expr.left
+    steps.append(expr)
+    steps.reverse()
+    if isinstance(steps[0], (Root, This)):
+        steps = steps[1:]
+    if steps and isinstance(steps[0], Fields) and len(steps[0].fields) == 1 and steps[0].fields[0] != "*":
+        return steps[0].fields[0]
+    return None
+
+def _simple_path_keys(path: str) -> Optional[Tuple[str, ...]]:
+    match = _SIMPLE_PATH.match(path)
+    if match is None:
+        return None
+    keys = tuple(match.group(1).split("."))
+    return None if _RESERVED_PATH_WORDS.intersection(keys) else keys
+
+def _lookup_keys(keys: Tuple[str, ...], request: Dict) -> Tuple:
+    """Same matches as the JSONPath ``$.k1.k2...`` without building datum objects"""
+    value = request
+    for key in keys:
+        try:
+            value = value.get(key, _MISSING)
+        except (TypeError, AttributeError):
+            return ()
+        if value is _MISSING:
+            return ()
+    return (value,)
+
+def _find_values(expr, request: Dict) -> List:
+    return [match.value for match in expr.find(request)]
+
+def _any_equals(find: Callable, expected_str: str, expected_int: Any, request: Dict) -> bool:
+    for match in find(request):
+        kind = type(match)
+        if kind is str:
+            if match == expected_str:
+                return True
+        elif kind is int and expected_int is not _MISSING:
+            if match == expected_int:
+                return True
+        elif str(match) == expected_str:
+            return True
+    return False
+
+def _any_contains(find: Callable, expected_str: str, request: Dict) -> bool:
+    for match in find(request):
+        if expected_str in (match if type(match) is str else str(match)):
+            return True
+    return False
+
+def _compile_regex(condition: Dict) -> CompiledCondition:
+    field = condition["field"]
+    try:
+        regex = re.compile(condition["pattern"])
+    except re.error as e:
+        raise PolicySyntaxError(f"Invalid regex {condition['pattern']!r}: {str(e)}")
+    match = regex.match
+
+    def check(request: Dict) -> bool:
+        value = request.get(field, "")
+        return match(value if type(value) is str else str(value)) is not None
+
+    return CompiledCondition("regex", check, keys=(field,), operator="regex", expected=regex,
+                             root=field, passes_when_absent=match("") is not None)
+
+def _never(request: Dict) -> bool:
+    return False
+
+def _all_pass(checks: Tuple[Check, ...], request: Dict) -> bool:
+    for check in checks:
+        try:
+            if not check(request):
+                return False
+        except Exception as e:
+            logger.error(f"Condition evaluation failed: {str(e)}")
+            return False
+    return True
+
+BATCH_CHUNK_SIZE = 4096
+
+@dataclass
+class BatchEvaluation:
+    violations: List[List[str]]  # violated policy IDs per request, in policy order
+    counts: Dict[str, int]       # violations per policy ID across the batch
+    approved: int
+
+    @property
+    def total(self) -> int:
+        return len(self.violations)
+
+def _safe_str(value: Any) -> Optional[str]:
+    try:
+        return value if type(value) is str else str(value)
+    except Exception:
+        return None
+
+class _Column:
+    """One request field across a batch, dictionary-encoded over its string forms
+
+    ``codes[i]`` indexes ``uniques`` and is -1 where the field is missing or
+    could not be read, so any per-value predicate becomes one table lookup.
+    """
+
+    def __init__(self, n: int):
+        self._lookup: Dict[str, int] = {}
+        self.uniques: List[str] = []
+        self.present = np.zeros(n, dtype=bool)
+        self.codes = np.full(n, -1, dtype=np.int32)
+
+    def encode(self, text: str) -> int:
+        code = self._lookup.get(text)
+        if code is None:
+            code = self._lookup[text] = len(self.uniques)
+            self.uniques.append(text)
+        return code
+
+    def set(self, row: int, found: Tuple):
+        if not found:
+            self.present[row] = False
+            self.codes[row] = -1
+            return
+        self.present[row] = True
+        text = _safe_str(found[0])
+        self.codes[row] = -1 if text is None else self.encode(text)
+
+    def where(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        table = np.zeros(len(self.uniques) + 1, dtype=bool)
+        table[:-1] = np.fromiter(map(predicate, self.uniques), dtype=bool, count=len(self.uniques))
+        return table[self.codes]
+
+def _read_field(field: str, request: Dict) -> Tuple:
+    try:
+        return (request.get(field, ""),)
+    except Exception:
+        return ()
+
+class _ColumnarBatch:
+    """Columns for the fields a plan references, extracted once per batch
+
+    One pass over the requests records which rows carry each top-level key,
+    so building a column only touches the rows that can hold the field.
+    """
+
+    def __init__(self, requests: List[Dict]):
+        self.requests = requests
+        self.n = len(requests)
+        self._columns: Dict[Tuple, _Column] = {}
+        self._masks: Dict[Tuple, np.ndarray] = {}
+        self._rows_by_key: Dict[str, List[int]] = {}
+        self._dict_rows = np.zeros(self.n, dtype=bool)
+        # Rows that are not plain dicts are always read the slow way
+        self._other_rows: List[int] = []
+        for i, request in enumerate(requests):
+            if type(request) is dict:
+                self._dict_rows[i] = True
+                for key in request:
+                    self._rows_by_key.setdefault(key, []).append(i)
+            else:
+                self._other_rows.append(i)
+
+    def rows_with(self, key: str) -> List[int]:
+        return self._rows_by_key.get(key, []) + self._other_rows
+
+    def column(self, source: str, keys: Tuple[str, ...]) -> _Column:
+        column = self._columns.get((source, keys))
+        if column is not None:
+            return column
+        column = self._columns[(source, keys)] = _Column(self.n)
+        requests = self.requests
+        if source == "path":
+            for i in self.rows_with(keys[0]):
+                column.set(i, _lookup_keys(keys, requests[i]))
+        else:
+            # A dict lacking the field reads as the empty string
+            column.present[self._dict_rows] = True
+            column.codes[self._dict_rows] = column.encode("")
+            for i in self.rows_with(keys[0]):
+                column.set(i, _read_field(keys[0], requests[i]))
+        return column
+
+    def passes(self, condition: CompiledCondition, rows: np.ndarray) -> np.ndarray:
+        """Condition outcome per request; only ``rows`` are guaranteed to be evaluated"""
+        if condition.kind == "jsonpath" and condition.keys is not None:
+            signature = ("path", condition.keys, condition.operator, str(condition.expected))
+        elif condition.kind == "regex":
+            signature = ("field", condition.keys, "regex", condition.expected.pattern)
+        elif condition.kind == "jsonpath":
+            signature = ("jsonpath", condition.path, condition.operator, str(condition.expected))
+        else:
+            # Custom logic runs per request, and only on rows still passing
+            return self._per_request(condition, rows)
+
+        mask = self._masks.get(signature)
+        if mask is None and signature[0] == "jsonpath":
+            # Complex JSONPaths run per request, skipping rows without the root key
+            if condition.root is not None:
+                rows = np.zeros(self.n, dtype=bool)
+                rows[self.rows_with(condition.root)] = True
+            else:
+                rows = np.ones(self.n, dtype=bool)
+            mask = self._masks[signature] = self._per_request(condition, rows)
+        elif mask is None:
+            source, keys, operator, expected = signature
+            column = self.column(source, keys)
+            if operator == "exists":
+                mask = column.present
+            elif operator == "equals":
+                mask = column.where(expected.__eq__)
+            elif operator == "contains":
+                mask = column.where(lambda text: expected in text)
+            else:
+                match = condition.expected.match
+                mask = column.where(lambda text: match(text) is not None)
+            self._masks[signature] = mask
+        return mask
+
+    def _per_request(self, condition: CompiledCondition, rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.n, dtype=bool)
+        for i in np.flatnonzero(rows).tolist():
+            mask[i] = _all_pass((condition.check,), self.requests[i])
+        return mask
+
+def _evaluate_columnar(plan: List[CompiledPolicy], requests: List[Dict]) -> np.ndarray:
+    """``violated[p, i]`` for every policy ``p`` and request ``i`` in the batch"""
+    batch = _ColumnarBatch(requests)
+    violated = np.zeros((len(plan), len(requests)), dtype=bool)
+    for p, compiled in enumerate(plan):
+        passing = np.ones(len(requests), dtype=bool)
+        for condition in compiled.conditions:
+            passing &= batch.passes(condition, passing)
+            if not passing.any():
+                break
+        violated[p] = ~passing
+    return violated
+
+def _violation_lists(plan: List[CompiledPolicy], violated: np.ndarray) -> List[List[str]]:
+    ids = [compiled.policy_id for compiled in plan]
+    return [[ids[p] for p in np.flatnonzero(column).tolist()] for column in violated.T]
+
+class PolicyIndex:
+    """Inverted index from top-level request keys to the policies guarded by them
+
+    A policy is guarded by key ``k`` when one of its conditions reads ``k``
+    and cannot pass without it, so a request lacking ``k`` violates the
+    policy without evaluating anything. Only policies whose guard key is
+    present, plus unguarded and explicitly pinned ones, are evaluated.
+    """
+
+    def __init__(self, plan: List[CompiledPolicy], always_evaluate: Iterable[str] = ()):
+        pinned = set(always_evaluate)
+        self.by_root: Dict[str, List[int]] = {}
+        self.always: List[int] = []
+        self.guarded = np.zeros(len(plan), dtype=bool)
+        for i, compiled in enumerate(plan):
+            guard = None
+            if compiled.policy_id not in pinned:
+                guard = next((c.root for c in compiled.conditions
+                              if c.root is not None and not c.passes_when_absent), None)
+            if guard is None:
+                self.always.append(i)
+            else:
+                self.by_root.setdefault(guard, []).append(i)
+                self.guarded[i] = True
+
+    def candidates(self, request: Dict) -> List[int]:
+        """Policies that need evaluating: guarded by a present key, or always evaluated"""
+        by_root = self.by_root
+        selected = list(self.always)
+        if len(request) < len(by_root):
+            for key in request:
+                hits = by_root.get(key)
+                if hits:
+                    selected.extend(hits)
+        else:
+            for key, hits in by_root.items():
+                if key in request:
+                    selected.extend(hits)
+        return selected
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """Immutable compiled policy set; reloads build a new one and swap it in"""
+    version: int
+    policies: Tuple[Dict, ...]
+    plan: Tuple[CompiledPolicy, ...]
+    index: PolicyIndex
+    compiled_rules: Dict[str, Any]
+    positions: Dict[str, int]
+    # Top-level request keys any condition reads; None when a condition may
+    # read anything (custom logic, root-less JSONPath), which disables caching
+    relevant_keys: Optional[FrozenSet[str]]
+
+class DecisionCache:
+    """Bounded LRU of violated-policy positions keyed by (policy version, request fingerprint)"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Tuple[int, ...]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: Tuple[int, ...]):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def _canonical(value: Any) -> Tuple:
+    """Order-independent, type-tagged form of a JSON-like value"""
+    kind = type(value)
+    if kind is dict:
+        return ("dict", tuple(sorted((repr(k), _canonical(v)) for k, v in value.items())))
+    if kind is list or kind is tuple:
+        return (kind.__name__, tuple(_canonical(v) for v in value))
+    return (kind.__name__, repr(value))
+
 class PolicyEnforcer:
-    def __init__(self, policy_path: str = None):
-        self.policies: List[Dict] = []
-        self.compiled_rules = {}
+    def __init__(self, policy_path: str = None, always_evaluate: Iterable[str] = (),
+                 decision_cache_size: int = 0):
+        self._always_evaluate = frozenset(always_evaluate)
+        self.decision_cache = DecisionCache(decision_cache_size) if decision_cache_size > 0 else None
+        self._versions = itertools.count(1)
+        # Readers take self._snapshot once per call and never lock; writers
+        # serialize on the reload lock and publish with a single assignment
+        self._reload_lock = threading.Lock()
+        self._snapshot = self._build_snapshot([])
+        self._watch_stop: Optional[threading.Event] = None
         if policy_path:
             self.load_policies(policy_path)
 
+    @property
+    def policies(self) -> Tuple[Dict, ...]:
+        """The loaded policies, read-only; change them with the setter, add_policy or load_policies"""
+        return self._snapshot.policies
+
+    @policies.setter
+    def policies(self, policies: Iterable[Dict]):
+        with self._reload_lock:
+            self._snapshot = self._build_snapshot(policies)
+
+    @property
+    def always_evaluate(self) -> FrozenSet[str]:
+        """Policy IDs checked on every request; assigning recompiles the policy set"""
+        return self._always_evaluate
+
+    @always_evaluate.setter
+    def always_evaluate(self, policy_ids: Iterable[str]):
+        with self._reload_lock:
+            self._always_evaluate = frozenset(policy_ids)
+            self._snapshot = self._build_snapshot(self._snapshot.policies)
+
+    def add_policy(self, policy: Dict):
+        """Validate ``policy`` and publish a snapshot that includes it"""
+        self._validate_policy_structure({"policies": [policy]})
+        with self._reload_lock:
+            self._snapshot = self._build_snapshot(self._snapshot.policies + (policy,))
+
+    def reload(self) -> Tuple[CompiledPolicy, ...]:
+        """Recompile the current policies into a new snapshot"""
+        with self._reload_lock:
+            self._snapshot = self._build_snapshot(self._snapshot.policies)
+        return self._snapshot.plan
+
+    @property
+    def compiled_rules(self) -> Dict[str, Any]:
+        return self._snapshot.compiled_rules
+
+    @property
+    def evaluation_plan(self) -> Tuple[CompiledPolicy, ...]:
+        return self._snapshot.plan
+
+    @property
+    def policy_index(self) -> PolicyIndex:
+        return self._snapshot.index
+
+    @property
+    def policy_version(self) -> int:
+        return self._snapshot.version
+
     def load_policies(self, policy_path: str):
         """Load policies from JSON file"""
         try:
             with open(policy_path, 'r') as f:
                 policy_data = json.load(f)
                 self._validate_policy_structure(policy_data)
-                self.policies = policy_data.get("policies", [])
-                self._compile_rules()
-                logger.info(f"Loaded {len(self.policies)} policies from {policy_path}")
+                with self._reload_lock:
+                    self._snapshot = self._build_snapshot(policy_data.get("policies", []))
+                logger.info(f"Loaded {len(self._snapshot.policies)} policies from {policy_path} "
+                            f"(version {self._snapshot.version})")
         except (json.JSONDecodeError, KeyError) as e:
             raise PolicySyntaxError(f"Invalid policy format: {str(e)}")
 
+    def watch_policies(self, policy_path: str, interval: float = 5.0):
+        """Poll the policy file and swap in a new snapshot when it changes
+
+        A file that fails to parse or validate is logged and the current
+        snapshot keeps serving.
+        """
+        self.stop_watching()
+        stop = threading.Event()
+
+        def _watch():
+            last = None
+            while not stop.wait(interval if last is not None else 0):
+                try:
+                    stat = os.stat(policy_path)
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    if last is not None and signature != last:
+                        self.load_policies(policy_path)
+                    last = signature
+                except Exception as e:
+                    logger.error(f"Policy watch failed: {str(e)}")
+
+        self._watch_stop = stop
+        threading.Thread(target=_watch, daemon=True).start()
+        logger.info(f"Watching policy file {policy_path}")
+
+    def stop_watching(self):
+        if self._watch_stop:
+            self._watch_stop.set()
+            self._watch_stop = None
+
     def evaluate_request(self, request: Dict) -> Dict:
         """Evaluate request against all loaded policies"""
         violations = []
         results = {"approved": True, "violations": []}
 
-        for policy in self.policies:
-            try:
-                if not self._check_policy_conditions(policy, request):
-                    violation = {
-                        "policy_id": policy["id"],
-                        "rule": policy["description"],
-                        "severity": policy["severity"]
-                    }
-                    violations.append(violation)
-                    logger.warning(f"Policy violation detected: {policy['id']}")
-            except Exception as e:
-                logger.error(f"Policy evaluation error: {str(e)}")
-                raise
+        snapshot = self._snapshot
+        key = self._decision_key(snapshot, request) if self.decision_cache is not None else None
+        violated = self.decision_cache.get(key) if key is not None else None
+        if violated is None:
+            violated = tuple(self._violated_policies(snapshot, request))
+            if key is not None:
+                self.decision_cache.put(key, violated)
+
+        for i in violated:
+            compiled = snapshot.plan[i]
+            violations.append(dict(compiled.violation))
+            logger.warning(f"Policy violation detected: {compiled.policy_id}")
 
         if violations:
             results["approved"] = False
@@ -58,65 +524,166 @@ class PolicyEnforcer:
 
         return results
 
-    def _compile_rules(self):
-        """Precompile JSONPath expressions for performance"""
-        self.compiled_rules.clear()
-        for policy in self.policies:
-            for condition in policy.get("conditions", []):
-                if "jsonpath" in condition:
-                    try:
-                        self.compiled_rules[condition["jsonpath"]] = parse(condition["jsonpath"])
-                    except Exception:
-                        raise PolicySyntaxError(f"Invalid JSONPath: {condition['jsonpath']}")
+    def evaluate_batch(self, requests: Iterable[Dict], workers: Optional[int] = None,
+                       chunk_size: int = BATCH_CHUNK_SIZE, remediate: bool = False) -> BatchEvaluation:
+        """Evaluate a stream of requests column-wise, ``chunk_size`` at a time
+
+        Fields referenced by simple conditions are extracted once per chunk
+        and every equality, containment and regex condition is resolved per
+        distinct value. With ``workers`` chunks are sharded across a process
+        pool. Remediation hooks only run when ``remediate`` is set. The whole
+        batch is evaluated against the snapshot current when it starts.
+        """
+        snapshot = self._snapshot
+        plan = snapshot.plan
+        totals = np.zeros(len(plan), dtype=np.int64)
+        violations: List[List[str]] = []
+
+        def collect(chunk, lists, counts):
+            nonlocal totals
+            totals += counts
+            violations.extend(lists)
+            if remediate:
+                for request, ids in zip(chunk, lists):
+                    if ids:
+                        self._execute_remediation_actions(
+                            [plan[snapshot.positions[i]].violation for i in ids], request)
+
+        chunks = _chunked(requests, chunk_size)
+        if not workers or workers <= 1:
+            for chunk in chunks:
+                violated = _evaluate_columnar(plan, chunk)
+                collect(chunk, _violation_lists(plan, violated), violated.sum(axis=1))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                     initargs=(type(self), list(snapshot.policies), self.always_evaluate)) as pool:
+                in_flight: deque = deque()
+                for chunk in chunks:
+                    in_flight.append((chunk, pool.submit(_evaluate_shard, chunk)))
+                    # Bound memory on long streams: keep a couple of chunks per worker queued
+                    if len(in_flight) >= 2 * workers:
+                        done_chunk, future = in_flight.popleft()
+                        collect(done_chunk, *future.result())
+                while in_flight:
+                    done_chunk, future = in_flight.popleft()
+                    collect(done_chunk, *future.result())
+
+        counts = {compiled.policy_id: int(n) for compiled, n in zip(plan, totals.tolist())}
+        approved = sum(1 for ids in violations if not ids)
+        logger.info(f"Evaluated {len(violations)} requests in batch: {len(violations) - approved} with violations")
+        return BatchEvaluation(violations=violations, counts=counts, approved=approved)
+
+    def _build_snapshot(self, policies: Iterable[Dict]) -> PolicySnapshot:
+        """Compile every policy into a flat list of pre-bound condition checks"""
+        policies = tuple(policies)
+        compiled_rules: Dict[str, Any] = {}
+        plan = []
+        relevant: Optional[set] = set()
+        for policy in policies:
+            conditions = [self._compile_condition(c, compiled_rules) for c in policy.get("conditions", [])]
+            for condition in conditions:
+                if condition.check is _never or relevant is None:
+                    continue
+                if condition.root is None:
+                    relevant = None
+                else:
+                    relevant.add(condition.root)
+            plan.append(CompiledPolicy(
+                policy_id=policy["id"],
+                conditions=conditions,
+                checks=tuple(c.check for c in conditions),
+                violation={
+                    "policy_id": policy["id"],
+                    "rule": policy["description"],
+                    "severity": policy["severity"]
+                }
+            ))
+        return PolicySnapshot(
+            version=next(self._versions),
+            policies=policies,
+            plan=tuple(plan),
+            index=PolicyIndex(plan, self._always_evaluate),
+            compiled_rules=compiled_rules,
+            positions={compiled.policy_id: i for i, compiled in enumerate(plan)},
+            relevant_keys=frozenset(relevant) if relevant is not None else None
+        )
+
+    def _decision_key(self, snapshot: PolicySnapshot, request: Dict) -> Optional[Tuple]:
+        """(policy version, digest of the policy-relevant request fields), or None if uncacheable"""
+        relevant = snapshot.relevant_keys
+        if relevant is None or type(request) is not dict:
+            return None
+        fields = sorted(k for k in request if k in relevant)
+        canonical = repr(tuple((k, _canonical(request[k])) for k in fields))
+        return snapshot.version, hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+    def _violated_policies(self, snapshot: PolicySnapshot, request: Dict) -> Iterable[int]:
+        """Indices of violated policies in policy order, evaluating only index candidates"""
+        plan = snapshot.plan
+        if not isinstance(request, dict):
+            return [i for i, compiled in enumerate(plan) if not _all_pass(compiled.checks, request)]
+        index = snapshot.index
+        candidates = index.candidates(request)
+        # Guarded policies whose key is missing are violated outright
+        violated = index.guarded.copy()
+        violated[candidates] = False
+        for i in candidates:
+            if not _all_pass(plan[i].checks, request):
+                violated[i] = True
+        return np.flatnonzero(violated).tolist()
 
     def _check_policy_conditions(self, policy: Dict, request: Dict) -> bool:
         """Evaluate all conditions for a single policy"""
-        for condition in policy.get("conditions", []):
-            if not self._evaluate_condition(condition, request):
-                return False
-        return True
+        conditions = [self._compile_condition(c, {}) for c in policy.get("conditions", [])]
+        return _all_pass(tuple(c.check for c in conditions), request)
 
-    def _evaluate_condition(self, condition: Dict, request: Dict) -> bool:
-        """Evaluate individual policy condition"""
+    def _compile_condition(self, condition: Dict, compiled_rules: Dict[str, Any]) -> CompiledCondition:
+        """Resolve type, operator, pattern and path once, at load time"""
         condition_type = condition.get("type")
-        
         try:
             if condition_type == "jsonpath":
-                return self._evaluate_jsonpath(condition, request)
+                return self._compile_jsonpath(condition, compiled_rules)
             elif condition_type == "regex":
-                return self._evaluate_regex(condition, request)
+                return _compile_regex(condition)
             elif condition_type == "custom_logic":
-                return self._evaluate_custom_logic(condition, request)
+                return CompiledCondition(
+                    "custom_logic", partial(self._evaluate_custom_logic, condition))
             else:
-                raise PolicySyntaxError(f"Unknown condition type: {condition_type}")
-        except Exception as e:
-            logger.error(f"Condition evaluation failed: {str(e)}")
-            return False
+                raise ValueError(f"Unknown condition type: {condition_type}")
+        except PolicySyntaxError:
+            raise
+        except (KeyError, ValueError) as e:
+            # Such conditions always failed at evaluation time; keep that, but
+            # report the problem once instead of on every request
+            logger.error(f"Condition can never pass: {str(e)}")
+            return CompiledCondition(str(condition_type), _never)
 
-    def _evaluate_jsonpath(self, condition: Dict, request: Dict) -> bool:
-        """Evaluate JSONPath existence or value comparison"""
-        jsonpath_expr = self.compiled_rules.get(condition["jsonpath"])
-        if not jsonpath_expr:
-            return False
+    def _compile_jsonpath(self, condition: Dict, compiled_rules: Dict[str, Any]) -> CompiledCondition:
+        path = condition["jsonpath"]
+        if path not in compiled_rules:
+            try:
+                compiled_rules[path] = parse(path)
+            except Exception:
+                raise PolicySyntaxError(f"Invalid JSONPath: {path}")
+        keys = _simple_path_keys(path)
+        if keys is not None:
+            find = partial(_lookup_keys, keys)
+        else:
+            find = partial(_find_values, compiled_rules[path])
 
-        matches = [match.value for match in jsonpath_expr.find(request)]
         operator = condition.get("operator", "exists")
-        expected_value = condition.get("value")
-
+        expected = condition.get("value")
         if operator == "exists":
-            return len(matches) > 0
+            check = lambda request: len(find(request)) > 0
         elif operator == "equals":
-            return any(str(match) == str(expected_value) for match in matches)
+            check = partial(_any_equals, find, str(expected), expected if type(expected) is int else _MISSING)
         elif operator == "contains":
-            return any(str(expected_value) in str(match) for match in matches)
+            check = partial(_any_contains, find, str(expected))
         else:
-            raise PolicySyntaxError(f"Unsupported JSONPath operator: {operator}")
-
-    def _evaluate_regex(self, condition: Dict, request: Dict) -> bool:
-        """Evaluate regular expression pattern matching"""
-        field_value = request.get(condition["field"], "")
-        pattern = condition["pattern"]
-        return re.match(pattern, str(field_value)) is not None
+            raise ValueError(f"Unsupported JSONPath operator: {operator}")
+        root = keys[0] if keys is not None else _path_root(compiled_rules[path])
+        return CompiledCondition("jsonpath", check, path=path, keys=keys, operator=operator,
+                                 expected=expected, root=root, passes_when_absent=root is None)
 
     def _evaluate_custom_logic(self, condition: Dict, request: Dict) -> bool:
         """Hook for custom business logic evaluation"""
@@ -144,3 +711,24 @@ class PolicyEnforcer:
             missing = required_fields - policy.keys()
             if missing:
                 raise PolicySyntaxError(f"Policy missing required fields: {missing}")
+
+def _chunked(requests: Iterable[Dict], size: int) -> Iterable[List[Dict]]:
+    iterator = iter(requests)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+_worker_enforcer: Optional[PolicyEnforcer] = None
+
+def _init_batch_worker(enforcer_cls, policies: List[Dict], always_evaluate):
+    """Compile the policy set once per pool process; compiled closures do not pickle"""
+    global _worker_enforcer
+    _worker_enforcer = enforcer_cls(always_evaluate=always_evaluate)
+    _worker_enforcer.policies = policies
+
+def _evaluate_shard(chunk: List[Dict]) -> Tuple[List[List[str]], np.ndarray]:
+    plan = _worker_enforcer.evaluation_plan
+    violated = _evaluate_columnar(plan, chunk)
+    return _violation_lists(plan, violated), violated.sum(axis=1)
@@ -1,23 +1,53 @@
 # orbital-agent/src/compliance_engine/zkp_prover.py
+import hashlib
 import logging
-from cryptography.hazmat.primitives import hashes
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice, repeat
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidSignature
 import os
 
+from .ec_arithmetic import (
+    Affine, CurveParams, curve_params, equals, is_infinity, multi_scalar_mult,
+    negate, scalar_mult, shamir_mult, to_affine, window_table
+)
+
 logger = logging.getLogger(__name__)
 
+# Random weights for batch verification; a batch containing a bad proof
+# passes with probability at most 2**-BATCH_WEIGHT_BITS
+BATCH_WEIGHT_BITS = 128
+# Groups at most this large are checked proof by proof while bisecting
+BISECT_LEAF_SIZE = 4
+# Witnesses per unit of work in generate_proofs
+PROOF_CHUNK_SIZE = 512
+# Commitments drawn per refill step of the background precompute thread
+REFILL_BATCH = 32
+
 class ZKPProtocolError(Exception):
     """Base exception for ZKP protocol failures"""
 
 class ZKPProver:
     def __init__(self, curve=ec.SECP256R1()):
         self.curve = curve
+        self._params = curve_params(curve)
         self.private_key = ec.generate_private_key(curve, default_backend())
         self.public_key = self.private_key.public_key()
-        self._nonce = None
+        self._secret = self.private_key.private_numbers().private_value
+        # One-time (nonce, encoded R) pairs stocked by precompute_commitments
+        # or the background refill thread
+        self._commitments: deque = deque()
+        self._low_water = 0
+        self._refill_target = 0
+        self._refill_needed = threading.Event()
+        self._refill_stop: Optional[threading.Event] = None
+        self._refill_thread: Optional[threading.Thread] = None
 
     def generate_proof(self, witness: bytes, context: bytes = b'') -> bytes:
         """
@@ -26,58 +56,77 @@ class ZKPProver:
         """
         if not witness:
             raise ValueError("Invalid witness input")
-
-        # Commitment phase
-        k = self._generate_secure_nonce()
-        R = k.public_key().public_numbers().public_key(default_backend())
-        
-        # Challenge construction
-        challenge = self._compute_challenge(
-            public_point=R.public_bytes(
-                encoding=serialization.Encoding.X962,
-                format=serialization.PublicFormat.CompressedPoint
-            ),
-            witness=witness,
-            context=context
-        )
-        
-        # Response generation
-        s = self._compute_response(k, challenge)
-        
-        proof = R.public_bytes(
-            encoding=serialization.Encoding.X962,
-            format=serialization.PublicFormat.CompressedPoint
-        ) + s.to_bytes((s.bit_length() + 7) // 8, 'big')
-        
+        commitment = self._take_commitments(1)[0]
+        proof = _respond(self._secret, self._params.n, [commitment], [witness], [context])[0]
         logger.debug("Generated ZKP for witness length: %d", len(witness))
         return proof
 
+    def precompute_commitments(self, count: int) -> None:
+        """Stock ``count`` nonce commitments ahead of time; each is used for exactly one proof"""
+        self._commitments.extend(_new_commitments(self.curve, count))
+
+    def start_precompute(self, low_water: int = 64, target: int = 256) -> None:
+        """Keep the commitment stock topped up from a background thread
+
+        Whenever a proof leaves fewer than ``low_water`` commitments stocked,
+        the thread refills to ``target`` in batches of REFILL_BATCH, so nonce
+        generation happens off the caller's thread between bursts.
+        """
+        if not 0 <= low_water <= target:
+            raise ValueError("low_water must be between 0 and target")
+        self.stop_precompute()
+        self._low_water, self._refill_target = low_water, target
+        self._refill_stop = threading.Event()
+        self._refill_thread = threading.Thread(target=self._refill_loop, args=(self._refill_stop,),
+                                               name="zkp-precompute", daemon=True)
+        self._refill_thread.start()
+        self._refill_needed.set()
+
+    def stop_precompute(self, timeout: float = 5.0) -> None:
+        if self._refill_thread is None:
+            return
+        self._refill_stop.set()
+        self._refill_needed.set()
+        self._refill_thread.join(timeout)
+        self._refill_thread = None
+        self._low_water = self._refill_target = 0
+
+    def generate_proofs(self, witnesses: Iterable[bytes], contexts: Optional[Iterable[bytes]] = None,
+                        workers: Optional[int] = None, chunk_size: int = PROOF_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream proofs for ``witnesses`` in input order
+
+        Work is cut into ``chunk_size`` chunks. Each chunk draws its nonce
+        commitments in one pass (stocked ones first) and encodes every ``R``
+        once. With ``workers > 1`` chunks are proven by a process pool that
+        receives the private scalar once at start-up, and a bounded window
+        of chunks is kept in flight so long streams do not pile up in memory.
+        ``witnesses`` and ``contexts`` must be the same length; a mismatch
+        raises ValueError when the shorter one runs out.
+        """
+        pairs = zip(witnesses, repeat(b'')) if contexts is None else zip(witnesses, contexts, strict=True)
+        chunks = _chunked(pairs, chunk_size)
+        n = self._params.n
+        if not workers or workers <= 1:
+            for chunk in chunks:
+                batch_witnesses, batch_contexts = zip(*chunk)
+                yield from _respond(self._secret, n, self._take_commitments(len(chunk)),
+                                    batch_witnesses, batch_contexts)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_proof_worker,
+                                 initargs=(type(self.curve), self._secret)) as pool:
+            in_flight: deque = deque()
+            for chunk in chunks:
+                batch_witnesses, batch_contexts = zip(*chunk)
+                in_flight.append(pool.submit(_prove_shard, batch_witnesses, batch_contexts))
+                if len(in_flight) >= 2 * workers:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
     def verify_proof(self, proof: bytes, witness: bytes, context: bytes = b'') -> bool:
         """Verify ZKP against public parameters and witness"""
-        if len(proof) < 33:
-            raise ZKPProtocolError("Invalid proof length")
-        
-        try:
-            R_bytes = proof[:33]
-            s_bytes = proof[33:]
-            
-            R = ec.EllipticCurvePublicKey.from_encoded_point(
-                curve=self.curve,
-                data=R_bytes
-            )
-            s = int.from_bytes(s_bytes, 'big')
-            
-            challenge = self._compute_challenge(R_bytes, witness, context)
-            generator = self.curve.generator
-            
-            lhs = generator * s
-            rhs = R.public_numbers().public_key(default_backend()) + \
-                self.public_key.public_numbers().public_key(default_backend()) * challenge
-            
-            return lhs.public_numbers() == rhs.public_numbers()
-        except (ValueError, InvalidSignature) as e:
-            logger.warning("Proof verification failed: %s", str(e))
-            return False
+        return ZKPVerifier(self.public_key, self.curve).verify(proof, witness, context)
 
     def serialize_public_key(self) -> bytes:
         """Export public key in PEM format"""
@@ -97,31 +146,192 @@ class ZKPProver:
         instance.public_key = public_key
         return instance
 
-    def _generate_secure_nonce(self):
-        """Cryptographically secure nonce generation"""
-        return ec.generate_private_key(self.curve, default_backend())
+    def _take_commitments(self, count: int) -> List[Tuple[int, bytes]]:
+        taken = []
+        try:
+            while len(taken) < count:
+                taken.append(self._commitments.popleft())
+        except IndexError:
+            pass
+        if len(self._commitments) < self._low_water:
+            self._refill_needed.set()
+        return taken + _new_commitments(self.curve, count - len(taken))
+
+    def _refill_loop(self, stop: threading.Event) -> None:
+        while True:
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            if stop.is_set():
+                return
+            while not stop.is_set() and len(self._commitments) < self._refill_target:
+                batch = min(REFILL_BATCH, self._refill_target - len(self._commitments))
+                self._commitments.extend(_new_commitments(self.curve, batch))
 
     def _compute_challenge(self, public_point: bytes, witness: bytes, context: bytes) -> int:
         """Compute Fiat-Shamir challenge"""
-        hasher = hashes.Hash(hashes.SHA256(), default_backend())
-        hasher.update(public_point)
-        hasher.update(witness)
-        hasher.update(context)
-        return int.from_bytes(hasher.finalize(), 'big') % self.curve.order
-
-    def _compute_response(self, k: ec.EllipticCurvePrivateKey, challenge: int) -> int:
-        """Calculate response value s = k + c * x mod n"""
-        x = self.private_key.private_numbers().private_value
-        k_val = k.private_numbers().private_value
-        return (k_val + challenge * x) % self.curve.order
+        return _challenge(public_point, witness, context, self._params.n)
 
 class ZKPVerifier:
+    """Checks Schnorr proofs ``R | s`` against a public key: ``s*G == R + c*P``
+
+    Holds only the public point; no keys are generated.
+    """
+
     def __init__(self, public_key: ec.EllipticCurvePublicKey, curve=ec.SECP256R1()):
         self.public_key = public_key
         self.curve = curve
+        self._params = curve_params(curve)
+        numbers = public_key.public_numbers()
+        self._neg_point = negate((numbers.x, numbers.y), self._params)
+        self._neg_table = window_table(self._neg_point, self._params)
+        self._point_len = 1 + (self._params.p.bit_length() + 7) // 8
+        self._shifted_neg_point: Optional[Affine] = None
 
     def verify(self, proof: bytes, witness: bytes, context: bytes = b'') -> bool:
         """Verify proof using stored public key"""
-        prover = ZKPProver(self.curve)
-        prover.public_key = self.public_key
-        return prover.verify_proof(proof, witness, context)
+        if len(proof) < self._point_len:
+            raise ZKPProtocolError("Invalid proof length")
+        parsed = self._parse(proof, witness, context)
+        return parsed is not None and self._check(*parsed)
+
+    def verify_batch(self, proofs: Sequence[bytes], witnesses: Sequence[bytes],
+                     contexts: Optional[Sequence[bytes]] = None) -> List[bool]:
+        """Verify many proofs with one multi-scalar multiplication per batch
+
+        Checks ``sum(z_i * (s_i*G - c_i*P - R_i)) == O`` for random 128-bit
+        weights ``z_i``. When a batch fails it is bisected with fresh weights
+        until the bad proofs are isolated, so a few forgeries cost
+        ``O(bad * log(n))`` extra MSMs. Malformed proofs are False.
+        """
+        if contexts is None:
+            contexts = [b''] * len(proofs)
+        if not len(proofs) == len(witnesses) == len(contexts):
+            raise ValueError("proofs, witnesses and contexts must have the same length")
+
+        results = [False] * len(proofs)
+        parsed = []
+        for i, (proof, witness, context) in enumerate(zip(proofs, witnesses, contexts)):
+            item = self._parse(proof, witness, context)
+            if item is not None:
+                parsed.append((i,) + item)
+
+        pending = [parsed] if parsed else []
+        while pending:
+            group = pending.pop()
+            if len(group) <= BISECT_LEAF_SIZE:
+                for i, R, s, c in group:
+                    results[i] = self._check(R, s, c)
+            elif self._batch_holds(group):
+                for item in group:
+                    results[item[0]] = True
+            else:
+                mid = len(group) // 2
+                pending.append(group[mid:])
+                pending.append(group[:mid])
+
+        failed = len(proofs) - sum(results)
+        if failed:
+            logger.warning(f"Batch verification rejected {failed} of {len(proofs)} proofs")
+        return results
+
+    def _parse(self, proof: bytes, witness: bytes, context: bytes) -> Optional[Tuple[Affine, int, int]]:
+        """Decode ``R`` (validated on-curve by cryptography), ``s`` and the challenge"""
+        if len(proof) < self._point_len:
+            return None
+        R_bytes = proof[:self._point_len]
+        s = int.from_bytes(proof[self._point_len:], 'big')
+        if s >= self._params.n:
+            return None
+        try:
+            R = ec.EllipticCurvePublicKey.from_encoded_point(self.curve, R_bytes).public_numbers()
+        except ValueError as e:
+            logger.warning("Proof verification failed: %s", str(e))
+            return None
+        return (R.x, R.y), s, _challenge(R_bytes, witness, context, self._params.n)
+
+    def _check(self, R: Affine, s: int, c: int) -> bool:
+        """Single proof: ``s*G - c*P`` with one shared doubling chain"""
+        params = self._params
+        lhs = shamir_mult([s, c], [_generator_table(params), self._neg_table], params)
+        return equals(lhs, R, params)
+
+    def _batch_holds(self, group) -> bool:
+        params = self._params
+        n = params.n
+        half = _split_bits(params)
+        if self._shifted_neg_point is None:
+            self._shifted_neg_point = to_affine(scalar_mult(1 << half, self._neg_point, params), params)
+
+        weights = [secrets.randbits(BATCH_WEIGHT_BITS) | 1 for _ in group]
+        g_scalar = sum(z * s for z, (_, _, s, _) in zip(weights, group)) % n
+        p_scalar = sum(z * c for z, (_, _, _, c) in zip(weights, group)) % n
+        # Split the two full-width scalars so every MSM scalar is about half
+        # width, halving the number of Pippenger windows
+        low = (1 << half) - 1
+        scalars = weights + [g_scalar & low, g_scalar >> half, p_scalar & low, p_scalar >> half]
+        points = [negate(R, params) for _, R, _, _ in group]
+        points += [params.generator, _shifted_generator(params), self._neg_point, self._shifted_neg_point]
+        return is_infinity(multi_scalar_mult(scalars, points, params))
+
+def _new_commitments(curve, count: int) -> List[Tuple[int, bytes]]:
+    """Fresh nonces ``k`` with their compressed commitments ``k*G``
+
+    OpenSSL's fixed-base tables for the standard generators make this much
+    cheaper than any scalar multiplication done in Python.
+    """
+    commitments = []
+    for _ in range(count):
+        nonce = ec.generate_private_key(curve, default_backend())
+        commitments.append((
+            nonce.private_numbers().private_value,
+            nonce.public_key().public_bytes(
+                encoding=serialization.Encoding.X962,
+                format=serialization.PublicFormat.CompressedPoint
+            )
+        ))
+    return commitments
+
+def _respond(secret: int, order: int, commitments: Sequence[Tuple[int, bytes]],
+             witnesses: Sequence[bytes], contexts: Sequence[bytes]) -> List[bytes]:
+    """Proofs ``R | s`` with ``s = k + c * x mod n``"""
+    proofs = []
+    for (k, R_bytes), witness, context in zip(commitments, witnesses, contexts):
+        if not witness:
+            raise ValueError("Invalid witness input")
+        s = (k + _challenge(R_bytes, witness, context, order) * secret) % order
+        proofs.append(R_bytes + s.to_bytes((s.bit_length() + 7) // 8, 'big'))
+    return proofs
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+_worker_prover: Optional[Tuple[object, int, int]] = None
+
+def _init_proof_worker(curve_cls, secret: int):
+    global _worker_prover
+    curve = curve_cls()
+    _worker_prover = (curve, secret, curve_params(curve).n)
+
+def _prove_shard(witnesses: Sequence[bytes], contexts: Sequence[bytes]) -> List[bytes]:
+    curve, secret, order = _worker_prover
+    return _respond(secret, order, _new_commitments(curve, len(witnesses)), witnesses, contexts)
+
+def _challenge(public_point: bytes, witness: bytes, context: bytes, order: int) -> int:
+    """Fiat-Shamir challenge ``SHA256(R | witness | context) mod n``"""
+    return int.from_bytes(hashlib.sha256(public_point + witness + context).digest(), 'big') % order
+
+def _split_bits(params: CurveParams) -> int:
+    return max(BATCH_WEIGHT_BITS, (params.n.bit_length() + 1) // 2)
+
+@lru_cache(maxsize=None)
+def _generator_table(params: CurveParams):
+    return window_table(params.generator, params)
+
+@lru_cache(maxsize=None)
+def _shifted_generator(params: CurveParams) -> Affine:
+    return to_affine(scalar_mult(1 << _split_bits(params), params.generator, params), params)
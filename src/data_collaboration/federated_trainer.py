@@ -4,9 +4,14 @@ import numpy as np
 import torch
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import padding
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import hashlib
+import io
+import threading
+
+from .flat_tensors import is_flat, pack_state_dict, unpack_state_dict
 
 logger = logging.getLogger(__name__)
 
@@ -37,34 +42,144 @@ class ModelValidator:
         return True
 
 class SecureAggregator:
-    def __init__(self, num_participants: int):
-        self.weights_buffer = []
+    """Sample-weighted federated averaging over a running sum
+
+    Each update is folded into a preallocated accumulator as soon as it is
+    decrypted and then dropped, so memory stays at one model's worth of
+    ``accumulate_dtype`` tensors however many participants submit.
+
+    ``submit_encrypted_weights`` decrypts and deserializes on a pool of
+    ``workers`` threads as uploads arrive; only the in-place fold is
+    serialized. Updates in the flat tensor format are viewed in place
+    rather than unpickled.
+    """
+
+    def __init__(self, num_participants: int, accumulate_dtype: torch.dtype = torch.float32,
+                 workers: int = 8):
         self.num_participants = num_participants
+        self.accumulate_dtype = accumulate_dtype
+        self.workers = workers
         self.encryption_keys = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[str, Future]] = []
+        self.round = 0
+        self.reset()
 
-    def add_encrypted_weights(self, encrypted_data: bytes, participant_id: str):
-        """Store encrypted model updates"""
+    def reset(self):
+        """Discard the running sum and start a new round
+
+        Queued submissions are cancelled. Ones already decrypting belong to
+        the old round: they are rejected when they try to fold.
+        """
+        with self._lock:
+            for _, future in self._pending:
+                future.cancel()
+            self.round += 1
+            self._accumulator: Optional[OrderedDict] = None
+            self.total_weight = 0.0
+            self.contributors: List[str] = []
+            # Participants with an accepted or in-progress submission
+            self._claimed = set()
+            self._pending: List[Tuple[str, Future]] = []
+
+    @property
+    def num_updates(self) -> int:
+        return len(self.contributors)
+
+    def add_encrypted_weights(self, encrypted_data: bytes, participant_id: str, num_samples: float = 1.0):
+        """Decrypt a model update and fold it into the running sum, weighted by ``num_samples``"""
+        if num_samples <= 0:
+            raise FederatedTrainingError(f"Non-positive sample count from {participant_id}")
+        with self._lock:
+            if participant_id in self._claimed:
+                raise FederatedTrainingError(f"Duplicate submission from {participant_id}")
+            self._claimed.add(participant_id)
+            submission_round = self.round
         try:
-            decrypted = self._decrypt_data(encrypted_data, participant_id)
-            self.weights_buffer.append(self._deserialize_weights(decrypted))
-            logger.info(f"Received update from {participant_id}")
-        except Exception as e:
-            logger.error(f"Decryption failed: {str(e)}")
-            raise FederatedTrainingError("Invalid model submission")
+            try:
+                decrypted = self._decrypt_data(encrypted_data, participant_id)
+                weights = self._deserialize_weights(decrypted)
+                del decrypted
+            except Exception as e:
+                logger.error(f"Decryption failed: {str(e)}")
+                raise FederatedTrainingError("Invalid model submission")
+            with self._lock:
+                if self.round != submission_round:
+                    raise FederatedTrainingError(f"Update from {participant_id} arrived after its round ended")
+                self._fold(weights, num_samples)
+                self.contributors.append(participant_id)
+        except FederatedTrainingError:
+            with self._lock:
+                if self.round == submission_round:
+                    self._claimed.discard(participant_id)
+            raise
+        logger.info(f"Received update from {participant_id}")
+
+    def submit_encrypted_weights(self, encrypted_data: bytes, participant_id: str,
+                                 num_samples: float = 1.0) -> Future:
+        """Ingest an update on the worker pool; the future raises if it is rejected"""
+        # Uploads arrive on many handler threads: create the pool and record
+        # the future under the lock so there is one pool and reset sees it
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fl-ingest")
+            future = self._pool.submit(self.add_encrypted_weights, encrypted_data, participant_id, num_samples)
+            self._pending.append((participant_id, future))
+        return future
+
+    def ingest(self, submissions: Iterable[Tuple[bytes, str, float]]) -> Dict[str, Exception]:
+        """Submit ``(encrypted_data, participant_id, num_samples)`` triples and wait for all"""
+        for encrypted_data, participant_id, num_samples in submissions:
+            self.submit_encrypted_weights(encrypted_data, participant_id, num_samples)
+        return self.wait_for_updates()
+
+    def wait_for_updates(self, timeout: Optional[float] = None) -> Dict[str, Exception]:
+        """Wait for pooled submissions; returns the rejected ones by participant"""
+        with self._lock:
+            pending = list(self._pending)
+        wait([future for _, future in pending], timeout=timeout)
+        failures = {}
+        with self._lock:
+            for participant_id, future in pending:
+                if future.cancelled():
+                    failures[participant_id] = FederatedTrainingError("Submission cancelled by a round reset")
+                elif future.done() and future.exception() is not None:
+                    failures[participant_id] = future.exception()
+            self._pending = [entry for entry in self._pending if not entry[1].done()]
+        return failures
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            # Outside the lock: running submissions need it to fold
+            pool.shutdown(wait=True)
 
     def aggregate(self) -> Dict:
         """Perform secure model aggregation"""
-        if len(self.weights_buffer) < self.num_participants // 2:
+        self.wait_for_updates()
+        if self._accumulator is None or self.num_updates < self.num_participants // 2:
             raise FederatedTrainingError("Insufficient participants")
+        return OrderedDict(
+            (key, layer_sum / self.total_weight) for key, layer_sum in self._accumulator.items()
+        )
 
-        averaged_weights = OrderedDict()
-        for key in self.weights_buffer[0].keys():
-            layer_sum = torch.stack(
-                [w[key].float() for w in self.weights_buffer]
-            ).sum(dim=0)
-            averaged_weights[key] = layer_sum / len(self.weights_buffer)
-        
-        return averaged_weights
+    def _fold(self, weights: Dict, num_samples: float):
+        """Add ``num_samples * weights`` to the accumulator in place"""
+        if self._accumulator is None:
+            self._accumulator = OrderedDict(
+                (key, torch.zeros(tensor.shape, dtype=self.accumulate_dtype)) for key, tensor in weights.items()
+            )
+        if weights.keys() != self._accumulator.keys():
+            raise FederatedTrainingError("Model update does not match the round's architecture")
+        for key, tensor in weights.items():
+            layer_sum = self._accumulator[key]
+            if tensor.shape != layer_sum.shape:
+                raise FederatedTrainingError(f"Shape mismatch for {key}: {tuple(tensor.shape)}")
+        for key, tensor in weights.items():
+            self._accumulator[key].add_(tensor.to(self.accumulate_dtype), alpha=num_samples)
+        self.total_weight += num_samples
 
     def register_participant(self, participant_id: str, public_key: bytes):
         """Store participant's public key for encryption"""
@@ -86,8 +201,14 @@ class SecureAggregator:
 
     @staticmethod
     def _deserialize_weights(data: bytes) -> Dict:
-        """Convert bytes to model weights dictionary"""
-        return torch.load(data)
+        """Convert bytes to model weights dictionary
+
+        Flat tensor payloads become zero-copy views over ``data``; anything
+        else is treated as a ``torch.save`` pickle.
+        """
+        if is_flat(data):
+            return unpack_state_dict(data, as_tensors=True)
+        return torch.load(io.BytesIO(data))
 
 class FederatedTrainer:
     def __init__(self, model: torch.nn.Module, aggregator: SecureAggregator):
@@ -97,12 +218,12 @@ class FederatedTrainer:
 
     def initialize_round(self):
         """Prepare new training round"""
-        self.aggregator.weights_buffer.clear()
+        self.aggregator.reset()
         logger.info("Initialized new federated round")
 
-    def submit_update(self, encrypted_weights: bytes, participant_id: str):
+    def submit_update(self, encrypted_weights: bytes, participant_id: str, num_samples: float = 1.0):
         """Handle participant model submission"""
-        self.aggregator.add_encrypted_weights(encrypted_weights, participant_id)
+        self.aggregator.add_encrypted_weights(encrypted_weights, participant_id, num_samples)
 
     def finalize_round(self) -> Dict:
         """Complete current training round and update global model"""
@@ -155,7 +276,7 @@ class ParticipantClient:
     def encrypt_update(self) -> bytes:
         """Prepare encrypted model update"""
         model_weights = self.local_model.state_dict()
-        serialized = torch.save(model_weights)
+        serialized = pack_state_dict(model_weights)
         return self._encrypt_data(serialized)
 
     def _encrypt_data(self, data: bytes) -> bytes:
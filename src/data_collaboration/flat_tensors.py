@@ -0,0 +1,105 @@
+# orbital-agent/src/data_collaboration/flat_tensors.py
+import json
+import logging
+import mmap
+import struct
+import warnings
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Layout: MAGIC | version (u16) | header length (u32) | JSON header | padding |
+# tensor data. Every tensor starts on an ALIGNMENT boundary, so readers can
+# view the buffer (or a memory-mapped file) in place instead of unpickling.
+MAGIC = b"OAFT"
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<4sHI")
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+class FlatTensorError(ValueError):
+    """Raised for buffers that are not valid flat tensor payloads"""
+
+def is_flat(data: Buffer) -> bool:
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+def pack_state_dict(state_dict: Mapping[str, Any]) -> bytes:
+    """Serialize a name -> tensor/array mapping into one contiguous buffer"""
+    arrays = OrderedDict((name, _as_numpy(value)) for name, value in state_dict.items())
+    entries = []
+    offset = 0
+    for name, array in arrays.items():
+        entries.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape),
+                        "offset": offset, "nbytes": array.nbytes})
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({"tensors": entries}, separators=(",", ":")).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    out = bytearray(data_start + offset)
+    _PREAMBLE.pack_into(out, 0, MAGIC, VERSION, len(header))
+    out[_PREAMBLE.size:_PREAMBLE.size + len(header)] = header
+    for entry, array in zip(entries, arrays.values()):
+        start = data_start + entry["offset"]
+        out[start:start + entry["nbytes"]] = np.ascontiguousarray(array).tobytes()
+    return bytes(out)
+
+def unpack_state_dict(data: Buffer, as_tensors: bool = False) -> "OrderedDict[str, Any]":
+    """Zero-copy views of every tensor in ``data``
+
+    The views share memory with ``data`` and are read-only when it is; with
+    ``as_tensors`` they are wrapped as torch tensors, still without copying.
+    """
+    if len(data) < _PREAMBLE.size or not is_flat(data):
+        raise FlatTensorError("Not a flat tensor payload")
+    _, version, header_len = _PREAMBLE.unpack_from(data, 0)
+    if version != VERSION:
+        raise FlatTensorError(f"Unsupported flat tensor version {version}")
+    try:
+        header = json.loads(bytes(data[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    except ValueError as e:
+        raise FlatTensorError(f"Corrupt flat tensor header: {str(e)}")
+    data_start = _align(_PREAMBLE.size + header_len)
+
+    arrays = OrderedDict()
+    for entry in header["tensors"]:
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        start = data_start + entry["offset"]
+        if count * dtype.itemsize != entry["nbytes"] or start + entry["nbytes"] > len(data):
+            raise FlatTensorError(f"Tensor {entry['name']} runs past the payload")
+        arrays[entry["name"]] = np.frombuffer(data, dtype=dtype, count=count, offset=start).reshape(entry["shape"])
+    if as_tensors:
+        return _to_tensors(arrays)
+    return arrays
+
+def save_flat(state_dict: Mapping[str, Any], path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(pack_state_dict(state_dict))
+
+def load_flat(path: str, as_tensors: bool = False) -> "OrderedDict[str, Any]":
+    """Memory-map a flat tensor file; pages are read only when a tensor is touched"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The views keep the mapping alive
+    return unpack_state_dict(mapped, as_tensors)
+
+def _as_numpy(value: Any) -> np.ndarray:
+    if isinstance(value, np.ndarray):
+        return value
+    if hasattr(value, "detach"):
+        return value.detach().cpu().numpy()
+    return np.asarray(value)
+
+def _to_tensors(arrays: Dict[str, np.ndarray]) -> "OrderedDict[str, Any]":
+    import torch
+    with warnings.catch_warnings():
+        # Views over immutable buffers are read-only; callers copy before writing
+        warnings.filterwarnings("ignore", message=".*not writable.*")
+        return OrderedDict((name, torch.from_numpy(array)) for name, array in arrays.items())
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
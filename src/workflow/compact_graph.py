@@ -0,0 +1,228 @@
+# src/workflow/compact_graph.py
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Edges appended after the last CSR build are served from a side table until
+# they exceed this many, or a quarter of the compacted edges
+MIN_TAIL_EDGES = 4096
+
+class CycleError(ValueError):
+    """Raised when a graph that must be acyclic contains a cycle"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Cycle detected: {' -> '.join(cycle + cycle[:1])}")
+
+class CompactGraph:
+    """Directed graph over interned integer node IDs with CSR adjacency
+
+    Node names map to dense ``int32`` IDs. Edges are appended to flat
+    source/target arrays and compacted into CSR (``indptr``/``indices``)
+    on demand; edges added since the last compaction are answered from a
+    small side table so interleaved inserts and lookups stay cheap. Parallel
+    edges are kept as given.
+    """
+
+    def __init__(self, edge_capacity: int = 1024):
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._src = np.empty(edge_capacity, dtype=np.int32)
+        self._dst = np.empty(edge_capacity, dtype=np.int32)
+        self._edges = 0
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._compacted = 0
+        self._tail: Dict[int, List[int]] = {}
+        self._tail_valid = True
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    @property
+    def edge_count(self) -> int:
+        return self._edges
+
+    def intern(self, name: str) -> int:
+        node = self.index.get(name)
+        if node is None:
+            node = len(self.names)
+            self.index[name] = node
+            self.names.append(name)
+        return node
+
+    def add_edge(self, u: int, v: int):
+        if self._edges == len(self._src):
+            self._reserve(self._edges + 1)
+        self._src[self._edges] = u
+        self._dst[self._edges] = v
+        self._edges += 1
+        if self._tail_valid:
+            self._tail.setdefault(u, []).append(v)
+            if self._edges - self._compacted > max(MIN_TAIL_EDGES, self._compacted // 4):
+                self._invalidate_tail()
+
+    def add_edges(self, src: np.ndarray, dst: np.ndarray):
+        """Append many edges at once; the next lookup recompacts"""
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        if src.shape != dst.shape:
+            raise ValueError("Edge source and target arrays must have the same shape")
+        end = self._edges + len(src)
+        self._reserve(end)
+        self._src[self._edges:end] = src
+        self._dst[self._edges:end] = dst
+        self._edges = end
+        self._invalidate_tail()
+
+    def successors(self, u: int) -> np.ndarray:
+        if not self._tail_valid:
+            self.compact()
+        if u + 1 < len(self._indptr):
+            out = self._indices[self._indptr[u]:self._indptr[u + 1]]
+        else:
+            out = self._indices[:0]
+        extra = self._tail.get(u)
+        if extra:
+            out = np.concatenate([out, np.asarray(extra, dtype=np.int32)])
+        return out
+
+    def has_edge(self, u: int, v: int) -> bool:
+        return bool((self.successors(u) == v).any())
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self._dst[:self._edges], minlength=len(self.names))
+
+    def compact(self):
+        """Rebuild CSR adjacency from every edge added so far"""
+        n = len(self.names)
+        src = self._src[:self._edges]
+        order = np.argsort(src, kind="stable")
+        self._indices = self._dst[:self._edges][order]
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self._indptr[1:])
+        self._compacted = self._edges
+        self._tail = {}
+        self._tail_valid = True
+
+    def topological_levels(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Kahn's algorithm, one vectorized step per level
+
+        Returns the order and the offsets where each level starts (plus the
+        end), so ``order[offsets[i]:offsets[i + 1]]`` is level ``i``. Raises
+        CycleError naming one offending cycle.
+        """
+        if self._compacted != self._edges or len(self._indptr) != len(self.names) + 1:
+            self.compact()
+        n = len(self.names)
+        indegree = np.bincount(self._indices, minlength=n)
+        order = np.empty(n, dtype=np.int32)
+        offsets = [0]
+        frontier = np.flatnonzero(indegree == 0).astype(np.int32)
+        pos = 0
+        while len(frontier):
+            order[pos:pos + len(frontier)] = frontier
+            pos += len(frontier)
+            offsets.append(pos)
+            succ = self._gather(frontier)
+            if not len(succ):
+                break
+            if len(succ) * 8 > n:
+                # Wide level: a dense count beats sorting the successor list
+                counts = np.bincount(succ, minlength=n)
+                targets = np.flatnonzero(counts)
+                indegree[targets] -= counts[targets]
+            else:
+                targets, counts = np.unique(succ, return_counts=True)
+                indegree[targets] -= counts
+            frontier = targets[indegree[targets] == 0].astype(np.int32)
+
+        if pos < n:
+            raise CycleError([self.names[v] for v in self._find_cycle(indegree > 0)])
+        return order, np.asarray(offsets, dtype=np.int64)
+
+    def topological_order(self) -> np.ndarray:
+        return self.topological_levels()[0]
+
+    def find_cycle(self) -> Optional[List[str]]:
+        try:
+            self.topological_levels()
+        except CycleError as e:
+            return e.cycle
+        return None
+
+    def longest_path_ranks(self, costs: np.ndarray) -> np.ndarray:
+        """Cost of the heaviest path from each node to a sink, the node included"""
+        order, offsets = self.topological_levels()
+        ranks = np.asarray(costs, dtype=np.float64).copy()
+        for i in range(len(offsets) - 2, -1, -1):
+            level = order[offsets[i]:offsets[i + 1]]
+            counts = self._indptr[level + 1] - self._indptr[level]
+            has_succ = counts > 0
+            if not has_succ.any():
+                continue
+            succ = self._gather(level[has_succ])
+            starts = np.concatenate([[0], np.cumsum(counts[has_succ])[:-1]])
+            ranks[level[has_succ]] += np.maximum.reduceat(ranks[succ], starts)
+        return ranks
+
+    def to_networkx(self):
+        """Export as ``networkx.DiGraph``; networkx is imported only here"""
+        import networkx as nx
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.names)
+        names = self.names
+        graph.add_edges_from(
+            (names[u], names[v])
+            for u, v in zip(self._src[:self._edges].tolist(), self._dst[:self._edges].tolist())
+        )
+        return graph
+
+    def _gather(self, nodes: np.ndarray) -> np.ndarray:
+        """Concatenated CSR successor lists of ``nodes``"""
+        starts = self._indptr[nodes]
+        counts = self._indptr[nodes + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            return self._indices[:0]
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return self._indices[shift + np.arange(total)]
+
+    def _find_cycle(self, remaining: np.ndarray) -> List[int]:
+        """Walk predecessors inside the unsorted remainder until a node repeats
+
+        Every node Kahn's algorithm could not order still has an unordered
+        predecessor, so the walk always closes a cycle.
+        """
+        src, dst = self._src[:self._edges], self._dst[:self._edges]
+        inside = remaining[src] & remaining[dst]
+        pred = np.full(len(self.names), -1, dtype=np.int64)
+        pred[dst[inside]] = src[inside]
+
+        seen: Dict[int, int] = {}
+        walk: List[int] = []
+        node = int(np.flatnonzero(remaining)[0])
+        while node not in seen:
+            seen[node] = len(walk)
+            walk.append(node)
+            node = int(pred[node])
+        return walk[seen[node]:][::-1]
+
+    def _invalidate_tail(self):
+        self._tail = {}
+        self._tail_valid = False
+
+    def _reserve(self, size: int):
+        if size <= len(self._src):
+            return
+        capacity = max(size, 2 * len(self._src))
+        for attr in ("_src", "_dst"):
+            grown = np.empty(capacity, dtype=np.int32)
+            grown[:self._edges] = getattr(self, attr)[:self._edges]
+            setattr(self, attr, grown)
@@ -0,0 +1,289 @@
+# src/workflow/dag_executor.py
+import asyncio
+import heapq
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compact_graph import CycleError
+from .dag_scheduler import DAGScheduler, TaskState
+from .memoization import RerunPlan, ResultStore, plan_rerun
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("thread", "process", "asyncio")
+
+@dataclass
+class TaskTiming:
+    task_id: str
+    start: float  # seconds since the run started
+    end: float
+    state: TaskState
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+@dataclass
+class ExecutionReport:
+    timings: Dict[str, TaskTiming]
+    results: Dict[str, Any]
+    makespan: float
+    max_concurrency: int
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_time: float = 0.0
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    cached: List[str] = field(default_factory=list)
+
+    @property
+    def critical_path_utilization(self) -> float:
+        """Share of the makespan spent on the measured critical path; 1.0 means no scheduling slack"""
+        return self.critical_path_time / self.makespan if self.makespan > 0 else 0.0
+
+    @property
+    def parallel_efficiency(self) -> float:
+        """Busy worker time over the makespan times the concurrency limit"""
+        busy = sum(t.duration for t in self.timings.values())
+        capacity = self.makespan * self.max_concurrency
+        return busy / capacity if capacity > 0 else 0.0
+
+class DAGExecutor:
+    """Run a DAGScheduler's task callables as their dependencies complete
+
+    At most ``max_concurrency`` tasks run at once. Ready tasks are started in
+    order of longest remaining cost-weighted path (``TaskNode.cost`` or the
+    ``costs`` override), which keeps the critical path moving. ``mode`` is
+    ``thread``, ``process`` (callables and results must pickle) or
+    ``asyncio``, where coroutine functions are awaited and plain callables
+    run on the loop's default executor. A scheduler is consumed by one run.
+
+    With a ``store``, tasks whose fingerprint already has a stored result
+    are not run; their results are loaded only when a recomputed dependent
+    or the caller (sink tasks) needs them.
+    """
+
+    def __init__(self, scheduler: DAGScheduler, max_concurrency: int = 4,
+                 mode: str = "thread", costs: Optional[Dict[str, float]] = None,
+                 store: Optional[ResultStore] = None):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {mode}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.scheduler = scheduler
+        self.max_concurrency = max_concurrency
+        self.mode = mode
+        self.costs = costs
+        self.store = store
+        self.plan: Optional[RerunPlan] = None
+        self._cached: set = set()
+        self._load: set = set()
+        # Reused tasks whose stored result vanished mid-run are queued again;
+        # dependents wait in _missing until every such input has finished
+        self._recomputing: set = set()
+        self._waiting: Dict[str, set] = {}
+        self._missing: Dict[str, set] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, TaskTiming] = {}
+        self._ranks: Dict[str, float] = {}
+        self._queue: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._t0 = 0.0
+
+    def run(self) -> ExecutionReport:
+        if self.mode == "asyncio":
+            return asyncio.run(self.run_async())
+        self._prepare()
+        pool_cls = ProcessPoolExecutor if self.mode == "process" else ThreadPoolExecutor
+        running: Dict[Any, Tuple[str, float]] = {}
+        with pool_cls(max_workers=self.max_concurrency) as pool:
+            while True:
+                while len(running) < self.max_concurrency:
+                    launch = self._next_launch()
+                    if launch is None:
+                        break
+                    task_id, func, args = launch
+                    running[pool.submit(func, *args)] = (task_id, self._now())
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_id, started = running.pop(future)
+                    self._finish(task_id, started, future)
+        return self._report()
+
+    async def run_async(self) -> ExecutionReport:
+        self._prepare()
+        loop = asyncio.get_running_loop()
+        running: Dict[asyncio.Future, Tuple[str, float]] = {}
+        while True:
+            while len(running) < self.max_concurrency:
+                launch = self._next_launch()
+                if launch is None:
+                    break
+                task_id, func, args = launch
+                if asyncio.iscoroutinefunction(func):
+                    future = asyncio.ensure_future(func(*args))
+                else:
+                    future = loop.run_in_executor(None, partial(func, *args))
+                running[future] = (task_id, self._now())
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                task_id, started = running.pop(future)
+                self._finish(task_id, started, future)
+        return self._report()
+
+    def _prepare(self):
+        if not self.scheduler.validate_dag():
+            raise CycleError(self.scheduler.cycle)
+        self._ranks = self.scheduler.critical_path_ranks(self.costs)
+        if self.store is not None:
+            self.plan = self.dry_run()
+            self._cached = set(self.plan.cached)
+            tasks, graph = self.scheduler.tasks, self.scheduler.graph
+            needed = {dep for tid in self.plan.recompute for dep in tasks[tid].dependencies}
+            self._load = {
+                tid for tid in self.plan.cached
+                if tid in needed or not len(graph.successors(graph.index[tid]))
+            }
+        self._t0 = time.perf_counter()
+
+    def dry_run(self) -> RerunPlan:
+        """Report which tasks a run against ``store`` would recompute"""
+        if self.store is None:
+            raise ValueError("dry_run needs a result store")
+        return plan_rerun(self.scheduler, self.store)
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def _next_launch(self) -> Optional[Tuple[str, Any, list]]:
+        """Pop the highest-priority ready task that needs a worker
+
+        Tasks without a callable complete inline and may release more work.
+        """
+        while True:
+            for task_id in self.scheduler.next_tasks():
+                self._push(task_id)
+            if not self._queue:
+                return None
+            _, _, task_id = heapq.heappop(self._queue)
+            task = self.scheduler.tasks.get(task_id)
+            if task is None or task.func is None:
+                now = self._now()
+                self.results[task_id] = None
+                self.timings[task_id] = TaskTiming(task_id, now, now, TaskState.COMPLETED)
+                self.scheduler.mark_complete(task_id)
+                continue
+            if self.plan is not None and self._reuse(task_id):
+                continue
+            if self.plan is not None and not self._restore_inputs(task_id):
+                continue
+            args = [self.results[dep] for dep in task.dependencies]
+            return task_id, task.func, args
+
+    def _finish(self, task_id: str, started: float, future):
+        ended = self._now()
+        error = None if future.cancelled() else future.exception()
+        if future.cancelled() or error is not None:
+            reason = "cancelled" if error is None else str(error)
+            self.timings[task_id] = TaskTiming(task_id, started, ended, TaskState.FAILED, reason)
+            skipped = self.scheduler.mark_failed(task_id)
+            for dependent in self._waiting.pop(task_id, ()):
+                self._missing.pop(dependent, None)
+            logger.error(f"Task {task_id} failed: {reason}; skipping {len(skipped)} downstream tasks")
+            return
+        self.results[task_id] = future.result()
+        self.timings[task_id] = TaskTiming(task_id, started, ended, TaskState.COMPLETED)
+        if self.plan is not None:
+            try:
+                self.store.put(self.plan.fingerprints[task_id], self.results[task_id])
+            except Exception as e:
+                logger.warning(f"Could not store result of task {task_id}: {str(e)}")
+        self.scheduler.mark_complete(task_id)
+        self._recomputing.discard(task_id)
+        for dependent in self._waiting.pop(task_id, ()):
+            missing = self._missing.get(dependent)
+            if missing is None:
+                continue
+            missing.discard(task_id)
+            if not missing:
+                del self._missing[dependent]
+                self._push(dependent)
+
+    def _push(self, task_id: str):
+        self._seq += 1
+        heapq.heappush(self._queue, (-self._ranks.get(task_id, 0.0), self._seq, task_id))
+
+    def _reuse(self, task_id: str) -> bool:
+        """Complete a task from the store when its fingerprint is cached"""
+        if task_id not in self._cached:
+            return False
+        if task_id in self._load:
+            found, value = self.store.get(self.plan.fingerprints[task_id])
+            if not found:
+                logger.warning(f"Cached result of task {task_id} vanished, recomputing")
+                return False
+            self.results[task_id] = value
+        now = self._now()
+        self.timings[task_id] = TaskTiming(task_id, now, now, TaskState.COMPLETED, cached=True)
+        self.scheduler.mark_complete(task_id)
+        return True
+
+    def _restore_inputs(self, task_id: str) -> bool:
+        """Make every dependency result available before ``task_id`` runs
+
+        Reused dependencies are normally loaded only when the dry run saw a
+        recomputed dependent. If a cached entry vanished after the dry run,
+        that dependency goes back on the ready queue and runs like any other
+        task; returns False while ``task_id`` has to wait for it.
+        """
+        missing = set()
+        for dep in self.scheduler.tasks[task_id].dependencies:
+            if dep in self.results:
+                continue
+            found, value = self.store.get(self.plan.fingerprints[dep])
+            if found:
+                self.results[dep] = value
+                continue
+            missing.add(dep)
+            self._waiting.setdefault(dep, set()).add(task_id)
+            if dep not in self._recomputing:
+                logger.warning(f"Cached result of task {dep} vanished, recomputing it")
+                self._recomputing.add(dep)
+                self._cached.discard(dep)
+                self._push(dep)
+        if missing:
+            self._missing[task_id] = missing
+        return not missing
+
+    def _report(self) -> ExecutionReport:
+        makespan = self._now()
+        measured = {tid: t.duration for tid, t in self.timings.items()}
+        measured.update((tid, 0.0) for tid in self.scheduler.tasks_in_state(TaskState.SKIPPED))
+        path, path_time = self.scheduler.critical_path(measured)
+
+        report = ExecutionReport(
+            timings=self.timings,
+            results=self.results,
+            makespan=makespan,
+            max_concurrency=self.max_concurrency,
+            critical_path=path,
+            critical_path_time=path_time,
+            failed=self.scheduler.tasks_in_state(TaskState.FAILED),
+            skipped=self.scheduler.tasks_in_state(TaskState.SKIPPED),
+            cached=[tid for tid, t in self.timings.items() if t.cached]
+        )
+        logger.info(
+            f"Workflow finished in {makespan:.3f}s: {len(self.results)} completed, "
+            f"{len(report.failed)} failed, {len(report.skipped)} skipped, "
+            f"critical-path utilization {report.critical_path_utilization:.0%}"
+        )
+        return report
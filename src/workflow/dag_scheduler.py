@@ -1,30 +1,271 @@
 # src/workflow/dag_scheduler.py
-import networkx as nx
-from typing import List, Dict
-from datetime import datetime
+import logging
+from collections import deque
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph, CycleError
+
+logger = logging.getLogger(__name__)
+
+class TaskState(Enum):
+    PENDING = "pending"
+    READY = "ready"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+# Task states are stored as int8 codes indexing this tuple
+_STATES = tuple(TaskState)
+PENDING, READY, RUNNING, COMPLETED, FAILED, SKIPPED = range(len(_STATES))
+_TERMINAL = (COMPLETED, FAILED, SKIPPED)
 
 class TaskNode:
-    def __init__(self, task_id: str, dependencies: List[str]):
+    def __init__(self, task_id: str, dependencies: List[str],
+                 func: Optional[Callable[..., Any]] = None, cost: float = 1.0,
+                 version: Optional[str] = None, inputs: Any = None):
         self.task_id = task_id
         self.dependencies = dependencies
-        
+        # Called with the results of ``dependencies`` in order; ``cost`` is the
+        # estimated runtime used for critical-path prioritization
+        self.func = func
+        self.cost = cost
+        # Fingerprint parts for memoized reruns: a code version (defaults to
+        # the callable's bytecode digest) and any external inputs the
+        # callable reads, e.g. a file digest or query parameters
+        self.version = version
+        self.inputs = inputs
+
+class TaskStateView(Mapping):
+    """Read-only ``task_id -> TaskState`` mapping over the scheduler's state codes"""
+
+    def __init__(self, scheduler: "DAGScheduler"):
+        self._scheduler = scheduler
+
+    def __getitem__(self, task_id: str) -> TaskState:
+        node = self._scheduler.graph.index[task_id]
+        return _STATES[self._scheduler._state[node]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._scheduler.graph.names)
+
+    def __len__(self) -> int:
+        return len(self._scheduler.graph)
+
 class DAGScheduler:
     def __init__(self):
-        self.graph = nx.DiGraph()
+        self.graph = CompactGraph()
         self.execution_order = []
-        
+        self.cycle: Optional[List[str]] = None
+        self.tasks: Dict[str, TaskNode] = {}
+        # Incremental ready-set bookkeeping over interned node IDs: unfinished
+        # dependency counts per task and a FIFO of tasks whose count reached
+        # zero. Entries whose state moved on are dropped lazily at the front.
+        self._state = np.zeros(1024, dtype=np.int8)
+        self._pending_deps = np.zeros(1024, dtype=np.int32)
+        self._ready: deque = deque()
+        self._ready_count = 0
+        self._finished = 0
+
+    @property
+    def state(self) -> Mapping:
+        return TaskStateView(self)
+
     def add_task(self, task: TaskNode) -> None:
-        self.graph.add_node(task.task_id)
+        previous = self.tasks.get(task.task_id)
+        self.tasks[task.task_id] = task
+        v = self._track(task.task_id)
+        # Edges into a task only come from its own dependency lists
+        seen = set(previous.dependencies) if previous is not None else set()
         for dep in task.dependencies:
-            self.graph.add_edge(dep, task.task_id)
-            
+            if dep in seen:
+                continue
+            seen.add(dep)
+            u = self._track(dep)
+            self.graph.add_edge(u, v)
+            dep_state = self._state[u]
+            if dep_state == FAILED or dep_state == SKIPPED:
+                self._skip_downstream(u)
+            elif dep_state != COMPLETED:
+                self._pending_deps[v] += 1
+                if self._state[v] == READY:
+                    self._set_state(v, PENDING)
+
+    def add_dependencies(self, edges: Iterable[Tuple[str, str]]) -> None:
+        """Bulk-add ``(dependency, task)`` pairs; repeated pairs become parallel edges"""
+        src: List[int] = []
+        dst: List[int] = []
+        for dep, task_id in edges:
+            src.append(self._track(dep))
+            dst.append(self._track(task_id))
+        if not src:
+            return
+        src_ids = np.asarray(src, dtype=np.int32)
+        dst_ids = np.asarray(dst, dtype=np.int32)
+        self.graph.add_edges(src_ids, dst_ids)
+
+        dep_state = self._state[src_ids]
+        blocked = (dep_state == FAILED) | (dep_state == SKIPPED)
+        waiting = dst_ids[(dep_state != COMPLETED) & ~blocked]
+        np.add.at(self._pending_deps, waiting, 1)
+        demoted = np.unique(waiting)
+        demoted = demoted[self._state[demoted] == READY]
+        self._state[demoted] = PENDING
+        self._ready_count -= len(demoted)
+        for u in np.unique(src_ids[blocked]).tolist():
+            self._skip_downstream(u)
+
     def validate_dag(self) -> bool:
         try:
-            self.execution_order = list(nx.topological_sort(self.graph))
-            return True
-        except nx.NetworkXUnfeasible:
+            order = self.graph.topological_order()
+        except CycleError as e:
+            self.cycle = e.cycle
+            logger.warning(f"Workflow graph is not a DAG: {str(e)}")
             return False
-            
-    def next_tasks(self) -> List[str]:
-        return [node for node in self.graph.nodes() 
-                if not list(self.graph.predecessors(node))]
+        self.cycle = None
+        names = self.graph.names
+        self.execution_order = [names[v] for v in order.tolist()]
+        return True
+
+    def critical_path_ranks(self, costs: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Longest cost-weighted path from each task to a sink, itself included"""
+        ranks = self.graph.longest_path_ranks(self._cost_vector(costs))
+        return dict(zip(self.graph.names, ranks.tolist()))
+
+    def critical_path(self, costs: Optional[Dict[str, float]] = None) -> Tuple[List[str], float]:
+        """Heaviest source-to-sink chain and its total cost"""
+        if not len(self.graph):
+            return [], 0.0
+        ranks = self.graph.longest_path_ranks(self._cost_vector(costs))
+        sources = np.flatnonzero(self.graph.in_degree() == 0)
+        node = int(sources[np.argmax(ranks[sources])])
+        total = float(ranks[node])
+        path = [node]
+        succ = self.graph.successors(node)
+        while len(succ):
+            node = int(succ[np.argmax(ranks[succ])])
+            path.append(node)
+            succ = self.graph.successors(node)
+        return [self.graph.names[v] for v in path], total
+
+    def to_networkx(self):
+        return self.graph.to_networkx()
+
+    def next_tasks(self, limit: Optional[int] = None) -> List[str]:
+        """Dispatch up to ``limit`` ready tasks, marking them running; O(returned)"""
+        names = self.graph.names
+        dispatched = []
+        while self._ready and (limit is None or len(dispatched) < limit):
+            node = self._ready.popleft()
+            if self._state[node] != READY:
+                continue
+            self._set_state(node, RUNNING)
+            dispatched.append(names[node])
+        return dispatched
+
+    def ready_tasks(self) -> List[str]:
+        """Runnable tasks not yet dispatched, without changing their state"""
+        names = self.graph.names
+        return [names[v] for v in self._ready if self._state[v] == READY]
+
+    @property
+    def ready_count(self) -> int:
+        return self._ready_count
+
+    def tasks_in_state(self, state: TaskState) -> List[str]:
+        names = self.graph.names
+        code = _STATES.index(state)
+        return [names[v] for v in np.flatnonzero(self._state[:len(names)] == code).tolist()]
+
+    def mark_complete(self, task_id: str) -> List[str]:
+        """Record success and release dependents; returns tasks that became ready"""
+        v = self._require(task_id)
+        if self._state[v] == COMPLETED:
+            return []
+        self._set_state(v, COMPLETED)
+
+        names = self.graph.names
+        released = []
+        for succ in self.graph.successors(v).tolist():
+            if self._state[succ] != PENDING:
+                continue
+            self._pending_deps[succ] -= 1
+            if self._pending_deps[succ] == 0:
+                self._set_state(succ, READY)
+                released.append(names[succ])
+        return released
+
+    def mark_failed(self, task_id: str) -> List[str]:
+        """Record failure and skip every downstream task; returns the skipped tasks"""
+        v = self._require(task_id)
+        self._set_state(v, FAILED)
+        names = self.graph.names
+        return [names[s] for s in self._skip_downstream(v)]
+
+    def is_finished(self) -> bool:
+        return self._finished == len(self.graph)
+
+    def _track(self, task_id: str) -> int:
+        known = len(self.graph)
+        node = self.graph.intern(task_id)
+        if node == known:
+            if node == len(self._state):
+                self._grow()
+            self._state[node] = PENDING
+            self._pending_deps[node] = 0
+            self._set_state(node, READY)
+        return node
+
+    def _grow(self):
+        capacity = 2 * len(self._state)
+        for attr in ("_state", "_pending_deps"):
+            old = getattr(self, attr)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, attr, grown)
+
+    def _cost_vector(self, costs: Optional[Dict[str, float]]) -> np.ndarray:
+        vector = np.ones(len(self.graph))
+        index = self.graph.index
+        for task_id, task in self.tasks.items():
+            if task.cost != 1.0:
+                vector[index[task_id]] = task.cost
+        for task_id, cost in (costs or {}).items():
+            if task_id in index:
+                vector[index[task_id]] = cost
+        return vector
+
+    def _set_state(self, node: int, new_state: int) -> None:
+        old_state = self._state[node]
+        if old_state == new_state:
+            return
+        self._state[node] = new_state
+        if new_state == READY:
+            self._ready.append(node)
+            self._ready_count += 1
+        elif old_state == READY:
+            self._ready_count -= 1
+        if new_state in _TERMINAL and old_state not in _TERMINAL:
+            self._finished += 1
+
+    def _require(self, task_id: str) -> int:
+        node = self.graph.index.get(task_id)
+        if node is None:
+            raise KeyError(f"Unknown task: {task_id}")
+        return node
+
+    def _skip_downstream(self, node: int) -> List[int]:
+        skipped = []
+        frontier = deque(self.graph.successors(node).tolist())
+        while frontier:
+            succ = frontier.popleft()
+            if self._state[succ] in _TERMINAL:
+                continue
+            self._set_state(succ, SKIPPED)
+            skipped.append(succ)
+            frontier.extend(self.graph.successors(succ).tolist())
+        return skipped
@@ -0,0 +1,142 @@
+# src/workflow/memoization.py
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from .dag_scheduler import DAGScheduler, TaskNode
+
+logger = logging.getLogger(__name__)
+
+class ResultStore(ABC):
+    """Content-addressed task result store keyed by task fingerprints"""
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """``(found, value)`` for a fingerprint"""
+
+    @abstractmethod
+    def put(self, key: str, value: Any) -> None:
+        """Store the result for a fingerprint"""
+
+    def contains(self, key: str) -> bool:
+        return self.get(key)[0]
+
+class LocalDiskStore(ResultStore):
+    """Pickled results under ``root/<2 hex>/<fingerprint>.pkl``, written atomically"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return True, pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except (pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Discarding unreadable cached result {key}: {str(e)}")
+            return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+class CacheManagerStore(ResultStore):
+    """Adapter storing results through the Redis-backed storage CacheManager
+
+    Values are wrapped so a task that returned ``None`` still counts as a hit.
+    """
+
+    def __init__(self, cache_manager, ttl: int = 7 * 24 * 3600, prefix: str = "dag-result:"):
+        self.cache = cache_manager
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self.cache.get(self.prefix + key)
+        if entry is None:
+            return False, None
+        return True, entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        self.cache.set(self.prefix + key, (value,), ttl=self.ttl)
+
+@dataclass
+class RerunPlan:
+    fingerprints: Dict[str, str]
+    recompute: List[str] = field(default_factory=list)
+    cached: List[str] = field(default_factory=list)
+    # Why each recomputed task reruns: "fingerprint" (own code/inputs are new)
+    # or "upstream" (a dependency reruns)
+    reasons: Dict[str, str] = field(default_factory=dict)
+
+def code_version(task: TaskNode) -> str:
+    """Declared ``TaskNode.version``, else a digest of the callable's bytecode"""
+    if task.version is not None:
+        return str(task.version)
+    code = getattr(task.func, "__code__", None)
+    if code is None:
+        return getattr(task.func, "__qualname__", "") if task.func is not None else ""
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_consts).encode())
+    return f"{task.func.__module__}.{task.func.__qualname__}:{digest.hexdigest()[:16]}"
+
+def input_digest(inputs: Any) -> str:
+    if isinstance(inputs, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(inputs).hexdigest()
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=repr).encode()).hexdigest()
+
+def compute_fingerprints(scheduler: DAGScheduler) -> Dict[str, str]:
+    """Fingerprint every task from its ID, code version, inputs and upstream fingerprints"""
+    if not scheduler.validate_dag():
+        raise ValueError(f"Cannot fingerprint a cyclic workflow: {scheduler.cycle}")
+    fingerprints: Dict[str, str] = {}
+    for task_id in scheduler.execution_order:
+        task = scheduler.tasks.get(task_id)
+        digest = hashlib.sha256(task_id.encode())
+        if task is not None:
+            digest.update(b"\0" + code_version(task).encode())
+            digest.update(b"\0" + input_digest(task.inputs).encode())
+            for dep in task.dependencies:
+                digest.update(b"\0" + fingerprints[dep].encode())
+        fingerprints[task_id] = digest.hexdigest()
+    return fingerprints
+
+def plan_rerun(scheduler: DAGScheduler, store: ResultStore) -> RerunPlan:
+    """Dry run: which tasks a memoized execution would recompute, without running any"""
+    plan = RerunPlan(fingerprints=compute_fingerprints(scheduler))
+    recompute = set()
+    for task_id in scheduler.execution_order:
+        task = scheduler.tasks.get(task_id)
+        if task is None or task.func is None:
+            continue
+        if not store.contains(plan.fingerprints[task_id]):
+            recompute.add(task_id)
+            plan.recompute.append(task_id)
+            upstream = any(dep in recompute for dep in task.dependencies)
+            plan.reasons[task_id] = "upstream" if upstream else "fingerprint"
+        else:
+            plan.cached.append(task_id)
+    logger.info(f"Rerun plan: {len(plan.recompute)} to recompute, {len(plan.cached)} cached")
+    return plan
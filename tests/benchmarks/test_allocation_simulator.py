@@ -0,0 +1,36 @@
+# tests/benchmarks/test_allocation_simulator.py
+import random
+
+import pytest
+from click.testing import CliRunner
+from src.agent_management.allocation_simulator import compare_strategies, generate_trace, load_trace, replay
+from src.cli.main import cli
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    generate_trace(str(path), tasks=5000, seed=7)
+    return str(path)
+
+def test_strategy_comparison(trace_file):
+    allocates = sum(1 for e in load_trace(trace_file) if e["op"] == "allocate")
+    reports = compare_strategies(trace_file, ["bin_packing", "spread", "random"], nodes=50)
+
+    for r in reports:
+        print(f"\n{r.strategy}: {r.placements_per_sec:,.0f} placements/s, "
+              f"p50 {r.p50_latency_ms:.3f} ms, p99 {r.p99_latency_ms:.3f} ms, "
+              f"rejected {r.rejection_rate:.2%}, fragmentation {r.fragmentation:.2f}")
+        assert r.placements + r.rejections == allocates
+        assert 0.0 <= r.rejection_rate <= 1.0
+        assert r.utilization_timeline
+
+def test_simulate_cli(trace_file):
+    result = CliRunner().invoke(cli, ["simulate", trace_file, "--nodes", "20", "--strategy", "spread"])
+    assert result.exit_code == 0, result.output
+    assert "spread" in result.output
+
+def test_random_replay_is_reproducible_without_touching_global_rng(trace_file):
+    state = random.getstate()
+    first, second = (replay(load_trace(trace_file), "random", nodes=20, seed=3) for _ in range(2))
+    assert random.getstate() == state
+    assert (first.placements, first.fragmentation) == (second.placements, second.fragmentation)
@@ -0,0 +1,41 @@
+# tests/benchmarks/test_zkp_throughput.py
+import os
+import time
+
+import pytest
+from src.compliance_engine.zkp_prover import ZKPProver, ZKPVerifier
+
+COUNT = 4000
+
+@pytest.fixture(scope="module")
+def prover():
+    return ZKPProver()
+
+def test_pipeline_throughput_per_core(prover):
+    witnesses = [b"audit-record-%d" % i for i in range(COUNT)]
+
+    started = time.perf_counter()
+    single = [prover.generate_proof(w) for w in witnesses]
+    single_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    streamed = list(prover.generate_proofs(witnesses))
+    streamed_time = time.perf_counter() - started
+
+    print(f"\ngenerate_proof {COUNT / single_time:,.0f} proofs/s, "
+          f"generate_proofs {COUNT / streamed_time:,.0f} proofs/s/core")
+    verifier = ZKPVerifier(prover.public_key)
+    assert all(verifier.verify_batch(single, witnesses))
+    assert all(verifier.verify_batch(streamed, witnesses))
+
+def test_process_pool_keeps_order(prover):
+    workers = min(4, os.cpu_count() or 1)
+    if workers < 2:
+        pytest.skip("needs more than one core")
+    witnesses = [b"audit-record-%d" % i for i in range(COUNT)]
+    started = time.perf_counter()
+    pooled = list(prover.generate_proofs(witnesses, workers=workers, chunk_size=256))
+    pooled_time = time.perf_counter() - started
+    print(f"\n{workers} workers {COUNT / pooled_time:,.0f} proofs/s "
+          f"({COUNT / pooled_time / workers:,.0f} per core)")
+    assert all(ZKPVerifier(prover.public_key).verify_batch(pooled, witnesses))
@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import MagicMock
+from src.agent_management.agent_lifecycle import AgentLifecycleManager, HeartbeatWheel
+from src.agent_management.swarm_engine import AgentState, SwarmOrchestrator
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def manager(clock):
+    return AgentLifecycleManager(MagicMock(), check_interval=10, clock=clock)
+
+def test_wheel_only_returns_expired(clock):
+    wheel = HeartbeatWheel(1.0, clock.now)
+    wheel.schedule("a", clock.now + 5)
+    wheel.schedule("b", clock.now + 50)
+    wheel.schedule("a", clock.now + 60)
+    assert wheel.advance(clock.now + 10) == []
+    assert wheel.advance(clock.now + 55) == ["b"]
+    assert wheel.advance(clock.now + 1e6) == ["a"]
+
+def test_silent_agent_fails_after_three_missed_checks(manager, clock):
+    manager.register_agent("quiet", {})
+    manager.register_agent("chatty", {})
+    for _ in range(6):
+        clock.now += 10
+        manager.update_heartbeat("chatty", {"cpu": 0.1})
+        manager._check_agent_health()
+
+    assert not manager.agents["quiet"].active
+    assert manager.agents["chatty"].active
+    assert manager.drain_recovery(timeout=5)
+    manager.swarm.redistribute_tasks_batch.assert_called_once_with(["quiet"])
+
+def test_heartbeat_resets_missed_checks(manager, clock):
+    manager.register_agent("flaky", {})
+    clock.now += 40
+    manager._check_agent_health()
+    assert manager.agents["flaky"].retry_count == 1
+    manager.update_heartbeat("flaky", {})
+    clock.now += 20
+    manager._check_agent_health()
+    assert manager.agents["flaky"].retry_count == 0
+
+def test_bulk_heartbeats_and_fleet_metrics(manager, clock):
+    for i in range(100):
+        manager.register_agent(f"agent{i}", {"cpu": 0.0})
+    applied = manager.update_heartbeats({f"agent{i}": {"cpu": i / 100, "gpu_temp": 60} for i in range(100)})
+
+    assert applied == 100
+    assert manager.fleet_metric("cpu") == pytest.approx(0.495)
+    assert manager.agents["agent7"].resource_usage == {"cpu": pytest.approx(0.07), "gpu_temp": 60}
+
+def test_bulk_heartbeats_keep_agents_alive(manager, clock):
+    manager.register_agent("a", {})
+    manager.register_agent("b", {})
+    for _ in range(6):
+        clock.now += 10
+        manager.update_heartbeats([("a", {}), ("ghost", {})])
+        manager._check_agent_health()
+    assert manager.agents["a"].active
+    assert not manager.agents["b"].active
+
+def _fail_agents(manager, clock, agent_ids):
+    for agent_id in agent_ids:
+        manager.register_agent(agent_id, {})
+    for _ in range(6):
+        clock.now += 10
+        manager._check_agent_health()
+
+def test_mass_failure_redistributed_in_one_batch_off_lock(manager, clock):
+    lock_held = []
+    manager.swarm.redistribute_tasks_batch.side_effect = lambda ids: lock_held.append(manager.lock.locked())
+    _fail_agents(manager, clock, [f"rack{i}" for i in range(50)])
+    assert manager.drain_recovery(timeout=5)
+
+    assert lock_held == [False]
+    manager.swarm.redistribute_tasks_batch.assert_called_once()
+    assert sorted(manager.swarm.redistribute_tasks_batch.call_args[0][0]) == sorted(f"rack{i}" for i in range(50))
+
+def test_recovery_backs_off_then_gives_up(manager, clock):
+    attempts = []
+    manager._restart_agent = lambda agent_id: attempts.append(clock.now) or False
+    _fail_agents(manager, clock, ["doomed"])
+
+    for _ in range(10):
+        manager._recover_failed_agents()
+        assert manager.drain_recovery(timeout=5)
+        clock.now += 1.0
+    assert [t - attempts[0] for t in attempts] == [0.0, 1.0, 3.0]
+
+    manager._cleanup_inactive_agents()
+    assert "doomed" not in manager.agents
+
+def test_successful_recovery_reactivates_agent(manager, clock):
+    _fail_agents(manager, clock, ["phoenix"])
+    manager._recover_failed_agents()
+    assert manager.drain_recovery(timeout=5)
+    assert manager.agents["phoenix"].active
+    assert manager.agents["phoenix"].retry_count == 0
+
+def test_failed_agents_tasks_move_on_real_orchestrator(clock):
+    swarm = SwarmOrchestrator()
+    for i in range(4):
+        swarm.register_agent(AgentState(f"a{i}", cpu_usage=0.1, memory=1024, task_capacity=3))
+        swarm.assign_task(f"t{i}", f"a{i}")
+    manager = AgentLifecycleManager(swarm, check_interval=10, clock=clock)
+    _fail_agents(manager, clock, ["a0", "a1"])
+    assert manager.drain_recovery(timeout=5)
+
+    assert "a0" not in swarm.agent_tasks and "a1" not in swarm.agent_tasks
+    assert sorted(t for tasks in swarm.agent_tasks.values() for t in tasks) == ["t0", "t1", "t2", "t3"]
+    assert swarm.unassigned_tasks == []
+
+    # Restarted agents become eligible for tasks again
+    manager._recover_failed_agents()
+    assert manager.drain_recovery(timeout=5)
+    assert swarm.unavailable_agents == set()
+    assert manager.agents["a0"].active
+
+def test_stop_monitoring_joins_monitor_thread():
+    manager = AgentLifecycleManager(MagicMock(), check_interval=60)
+    manager.start_monitoring()
+    thread = manager.monitor_thread
+    manager.stop_monitoring(timeout=5)
+    assert not thread.is_alive()
+    assert manager.monitor_thread is None
+
+def test_monitoring_restarts_after_stop(manager, clock):
+    manager.start_monitoring()
+    manager.stop_monitoring(timeout=5)
+    manager.start_monitoring()
+    try:
+        _fail_agents(manager, clock, ["late"])
+        assert manager.drain_recovery(timeout=5)
+        manager.swarm.redistribute_tasks_batch.assert_called_once_with(["late"])
+    finally:
+        manager.stop_monitoring(timeout=5)
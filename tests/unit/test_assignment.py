@@ -0,0 +1,56 @@
+import itertools
+
+import numpy as np
+import pytest
+from src.agent_management import assignment
+from src.agent_management.assignment import AssignmentTimeout, solve_assignment
+
+def _brute_force(cost):
+    n, m = cost.shape
+    return min(
+        sum(cost[i, cols[i]] for i in range(n))
+        for cols in itertools.permutations(range(m), n)
+    )
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 6), (5, 7)])
+def test_hungarian_matches_brute_force(shape):
+    cost = np.random.default_rng(1).random(shape)
+    result = solve_assignment(cost, method="hungarian")
+    assert result.optimal
+    assert result.total_cost == pytest.approx(_brute_force(cost))
+    assert len(set(result.assignment)) == shape[0]
+
+def test_hungarian_respects_capacity_with_more_tasks_than_agents():
+    cost = np.random.default_rng(2).random((9, 3))
+    capacity = np.array([2, 3, 2])
+    result = solve_assignment(cost, capacity, method="hungarian")
+    assert result.unassigned == 2
+    assert (np.bincount(result.assignment[result.assignment >= 0], minlength=3) <= capacity).all()
+
+def test_forbidden_pairs_left_unassigned():
+    cost = np.array([[np.inf, np.inf], [1.0, 2.0]])
+    result = solve_assignment(cost)
+    assert result.assignment.tolist() == [-1, 0]
+
+def test_regret_is_feasible_and_close_to_optimal():
+    rng = np.random.default_rng(3)
+    cost = rng.random((300, 60))
+    capacity = rng.integers(5, 12, size=60)
+    exact = solve_assignment(cost, capacity, method="hungarian")
+    approx = solve_assignment(cost, capacity, method="regret")
+    assert approx.unassigned == exact.unassigned == 0
+    assert (np.bincount(approx.assignment, minlength=60) <= capacity).all()
+    assert approx.total_cost <= exact.total_cost * 1.5
+
+def test_hungarian_timeout_still_assigns_every_task(monkeypatch):
+    def expired(cost, capacity, deadline):
+        raise AssignmentTimeout()
+
+    monkeypatch.setattr(assignment, "_solve_hungarian", expired)
+    rng = np.random.default_rng(4)
+    cost = rng.random((490, 70))
+    capacity = np.full(70, 7)
+    result = solve_assignment(cost, capacity, time_budget=1e-9)
+    assert result.method == "regret"
+    assert result.unassigned == 0
+    assert (np.bincount(result.assignment, minlength=70) <= capacity).all()
@@ -0,0 +1,19 @@
+from src.agent_management.capacity_index import CapacityIndex, MaxSegmentTree
+from src.agent_management.resource_allocator import ResourceType
+
+def test_segment_tree_first_fit():
+    tree = MaxSegmentTree(5)
+    tree.build([1.0, 4.0, 2.0, 8.0, 3.0])
+    assert tree.max() == 8.0
+    assert tree.find_first(3.0) == 1
+    tree.update(1, 0.5)
+    assert tree.find_first(3.0) == 3
+    assert tree.find_first(9.0) == -1
+
+def test_index_grows_and_tracks_free_capacity():
+    index = CapacityIndex(list(ResourceType), initial_capacity=2)
+    for i in range(5):
+        index.add_node(f"n{i}", {ResourceType.CPU: float(i + 1)})
+    index.set_allocated("n4", {ResourceType.CPU: 4.0})
+    assert index.max_free(ResourceType.CPU) == 4.0
+    assert index.first_fit(ResourceType.CPU, 3.5) == "n3"
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.workflow.dag_executor import DAGExecutor
+from src.workflow.dag_scheduler import DAGScheduler, TaskNode, TaskState
+
+def _add(a, b):
+    return a + b
+
+def _build(tasks):
+    dag = DAGScheduler()
+    for task in tasks:
+        dag.add_task(task)
+    return dag
+
+def test_results_flow_to_dependents():
+    dag = _build([
+        TaskNode("a", [], func=lambda: 2),
+        TaskNode("b", [], func=lambda: 3),
+        TaskNode("sum", ["a", "b"], func=_add),
+    ])
+    report = DAGExecutor(dag, max_concurrency=2).run()
+    assert report.results["sum"] == 5
+    assert set(report.timings) == {"a", "b", "sum"}
+    assert report.timings["sum"].start >= report.timings["a"].end
+
+def test_critical_path_tasks_start_first():
+    started = []
+    record = lambda name: (lambda *_: started.append(name))
+    dag = _build([
+        TaskNode("short", [], func=record("short"), cost=1),
+        TaskNode("long", [], func=record("long"), cost=1),
+        TaskNode("long-2", ["long"], func=record("long-2"), cost=5),
+    ])
+    report = DAGExecutor(dag, max_concurrency=1).run()
+    assert started == ["long", "long-2", "short"]
+    assert report.critical_path[0] == "long"
+
+def test_concurrency_limit_is_respected():
+    active, peak, lock = [0], [0], threading.Lock()
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+    dag = _build([TaskNode(f"t{i}", [], func=work) for i in range(12)])
+    DAGExecutor(dag, max_concurrency=3).run()
+    assert peak[0] <= 3
+
+def test_failure_skips_downstream_and_reports():
+    def boom():
+        raise RuntimeError("boom")
+    dag = _build([
+        TaskNode("bad", [], func=boom),
+        TaskNode("after", ["bad"], func=lambda _: 1),
+        TaskNode("other", [], func=lambda: 1),
+    ])
+    report = DAGExecutor(dag).run()
+    assert report.failed == ["bad"]
+    assert report.skipped == ["after"]
+    assert report.timings["bad"].error == "boom"
+    assert dag.state["other"] == TaskState.COMPLETED
+
+def test_asyncio_mode_awaits_coroutines():
+    async def fetch():
+        await asyncio.sleep(0.001)
+        return 4
+    dag = _build([
+        TaskNode("fetch", [], func=fetch),
+        TaskNode("double", ["fetch"], func=lambda x: 2 * x),
+    ])
+    report = DAGExecutor(dag, mode="asyncio").run()
+    assert report.results["double"] == 8
+    assert 0 < report.critical_path_utilization <= 1.0 + 1e-9
+
+def test_cycle_is_rejected():
+    dag = _build([TaskNode("a", ["b"], func=lambda _: 1), TaskNode("b", ["a"], func=lambda _: 1)])
+    with pytest.raises(ValueError):
+        DAGExecutor(dag).run()
@@ -0,0 +1,142 @@
+import pytest
+
+from src.workflow.dag_executor import DAGExecutor
+from src.workflow.dag_scheduler import DAGScheduler, TaskNode
+from src.workflow.memoization import CacheManagerStore, LocalDiskStore, ResultStore, plan_rerun
+
+def _workflow(calls, rules_version="v1"):
+    def step(name, value=None):
+        def run(*upstream):
+            calls.append(name)
+            return (value or 0) + sum(upstream)
+        return run
+    dag = DAGScheduler()
+    dag.add_task(TaskNode("load", [], func=step("load", 1), version="1"))
+    dag.add_task(TaskNode("rules", [], func=step("rules", 10), version="1", inputs={"rules": rules_version}))
+    dag.add_task(TaskNode("scan", ["load"], func=step("scan"), version="1"))
+    dag.add_task(TaskNode("check", ["scan", "rules"], func=step("check"), version="1"))
+    return dag
+
+def test_rerun_only_recomputes_changed_subgraph(tmp_path):
+    store = LocalDiskStore(str(tmp_path))
+    calls = []
+    first = DAGExecutor(_workflow(calls), store=store).run()
+    assert sorted(calls) == ["check", "load", "rules", "scan"]
+
+    calls.clear()
+    unchanged = DAGExecutor(_workflow(calls), store=store).run()
+    assert calls == []
+    assert unchanged.results["check"] == first.results["check"] == 11
+    assert set(unchanged.cached) == {"load", "rules", "scan", "check"}
+
+    calls.clear()
+    changed = _workflow(calls, rules_version="v2")
+    plan = plan_rerun(changed, store)
+    assert plan.recompute == ["rules", "check"]
+    assert plan.reasons == {"rules": "fingerprint", "check": "upstream"}
+    DAGExecutor(changed, store=store).run()
+    assert calls == ["rules", "check"]
+
+def test_cache_manager_store_keeps_none_results():
+    class DictCache:
+        def __init__(self):
+            self.data = {}
+        def get(self, key):
+            return self.data.get(key)
+        def set(self, key, value, ttl=3600):
+            self.data[key] = value
+
+    store = CacheManagerStore(DictCache())
+    assert store.get("abc") == (False, None)
+    store.put("abc", None)
+    assert store.get("abc") == (True, None)
+
+class VanishingStore(LocalDiskStore):
+    """Entries for ``vanished`` keys pass the dry run but are gone on read"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.vanished = set()
+
+    def get(self, key):
+        if key in self.vanished:
+            return False, None
+        return super().get(key)
+
+def _total(*upstream):
+    return 1 + sum(upstream)
+
+def _picklable_workflow():
+    dag = DAGScheduler()
+    dag.add_task(TaskNode("load", [], func=_total, version="1"))
+    dag.add_task(TaskNode("scan", ["load"], func=_total, version="1"))
+    dag.add_task(TaskNode("check", ["scan"], func=_total, version="1"))
+    return dag
+
+def _evict(store, dag, *task_ids):
+    fingerprints = plan_rerun(dag, store).fingerprints
+    store.vanished = {fingerprints[tid] for tid in task_ids}
+
+@pytest.mark.parametrize("mode", ["thread", "asyncio"])
+def test_vanished_cache_entries_are_recomputed(tmp_path, mode):
+    store = VanishingStore(str(tmp_path))
+    calls = []
+    DAGExecutor(_workflow(calls), store=store).run()
+
+    calls.clear()
+    dag = _workflow(calls)
+    _evict(store, dag, "check", "scan")
+    report = DAGExecutor(dag, store=store, mode=mode).run()
+    assert report.results["check"] == 11
+    assert sorted(calls) == ["check", "scan"]
+    assert not report.timings["scan"].cached and report.timings["load"].cached
+
+def test_vanished_cache_entries_are_recomputed_in_processes(tmp_path):
+    store = VanishingStore(str(tmp_path))
+    DAGExecutor(_picklable_workflow(), store=store, mode="process").run()
+
+    dag = _picklable_workflow()
+    _evict(store, dag, "check", "scan", "load")
+    report = DAGExecutor(dag, store=store, mode="process").run()
+    assert report.results["check"] == 3
+    assert report.cached == []
+
+def test_vanished_coroutine_task_is_awaited(tmp_path):
+    def workflow():
+        async def scan():
+            return 5
+        async def check(value):
+            return value * 2
+        dag = DAGScheduler()
+        dag.add_task(TaskNode("scan", [], func=scan, version="1"))
+        dag.add_task(TaskNode("check", ["scan"], func=check, version="1"))
+        return dag
+
+    store = VanishingStore(str(tmp_path))
+    DAGExecutor(workflow(), store=store, mode="asyncio").run()
+    dag = workflow()
+    _evict(store, dag, "scan", "check")
+    report = DAGExecutor(dag, store=store, mode="asyncio").run()
+    assert report.results == {"scan": 5, "check": 10}
+
+def test_failed_recompute_of_vanished_input_fails_the_run_cleanly(tmp_path):
+    store = VanishingStore(str(tmp_path))
+    DAGExecutor(_workflow([]), store=store).run()
+
+    dag = _workflow([])
+    _evict(store, dag, "check", "scan")
+    def broken(*upstream):
+        raise RuntimeError("scanner offline")
+    dag.tasks["scan"].func = broken
+    report = DAGExecutor(dag, store=store).run()
+    assert report.failed == ["scan"]
+    assert report.skipped == ["check"]
+    assert "check" not in report.results
+
+def test_incomplete_store_fails_at_construction():
+    class NoPut(ResultStore):
+        def get(self, key):
+            return False, None
+
+    with pytest.raises(TypeError):
+        NoPut()
@@ -0,0 +1,71 @@
+import pytest
+from src.workflow.dag_scheduler import DAGScheduler, TaskNode, TaskState
+
+@pytest.fixture
+def scheduler():
+    dag = DAGScheduler()
+    dag.add_task(TaskNode("extract", []))
+    dag.add_task(TaskNode("validate", ["extract"]))
+    dag.add_task(TaskNode("transform", ["extract"]))
+    dag.add_task(TaskNode("load", ["validate", "transform"]))
+    dag.add_task(TaskNode("report", ["load"]))
+    return dag
+
+def test_ready_set_follows_completions(scheduler):
+    assert scheduler.next_tasks() == ["extract"]
+    assert scheduler.next_tasks() == []
+    assert scheduler.mark_complete("extract") == ["validate", "transform"]
+    assert scheduler.next_tasks(limit=1) == ["validate"]
+    assert scheduler.mark_complete("validate") == []
+    assert scheduler.ready_tasks() == ["transform"]
+    scheduler.next_tasks()
+    assert scheduler.mark_complete("transform") == ["load"]
+
+def test_failure_skips_downstream_subgraph(scheduler):
+    scheduler.next_tasks()
+    scheduler.mark_complete("extract")
+    assert sorted(scheduler.mark_failed("transform")) == ["load", "report"]
+    assert scheduler.next_tasks() == ["validate"]
+    scheduler.mark_complete("validate")
+    assert scheduler.state["load"] == TaskState.SKIPPED
+    assert scheduler.is_finished()
+
+def test_late_dependency_on_completed_task_is_ready(scheduler):
+    scheduler.next_tasks()
+    scheduler.mark_complete("extract")
+    scheduler.add_task(TaskNode("audit", ["extract"]))
+    assert "audit" in scheduler.ready_tasks()
+
+def test_validate_dag_detects_cycle(scheduler):
+    assert scheduler.validate_dag()
+    scheduler.add_task(TaskNode("extract", ["report"]))
+    assert not scheduler.validate_dag()
+
+def test_cycle_is_reported_with_its_members(scheduler):
+    scheduler.add_task(TaskNode("extract", ["report"]))
+    assert not scheduler.validate_dag()
+    cycle = scheduler.cycle
+    assert len(cycle) == 4 and {"extract", "load", "report"} <= set(cycle)
+    index = scheduler.graph.index
+    for u, v in zip(cycle, cycle[1:] + cycle[:1]):
+        assert scheduler.graph.has_edge(index[u], index[v])
+
+def test_bulk_dependencies_match_incremental_adds():
+    dag = DAGScheduler()
+    dag.add_dependencies([("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    assert dag.validate_dag()
+    assert dag.execution_order[0] == "a" and dag.execution_order[-1] == "d"
+    assert dag.next_tasks() == ["a"]
+    assert dag.mark_complete("a") == ["b", "c"]
+    dag.next_tasks()
+    dag.mark_complete("b")
+    assert dag.mark_complete("c") == ["d"]
+
+def test_critical_path_follows_costliest_chain():
+    dag = DAGScheduler()
+    dag.add_task(TaskNode("a", []))
+    dag.add_task(TaskNode("fast", ["a"], cost=1))
+    dag.add_task(TaskNode("slow", ["a"], cost=10))
+    dag.add_task(TaskNode("end", ["fast", "slow"]))
+    assert dag.critical_path() == (["a", "slow", "end"], 12.0)
+    assert set(dag.to_networkx().edges) == {("a", "fast"), ("a", "slow"), ("fast", "end"), ("slow", "end")}
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.data_collaboration import federated_trainer
+from src.data_collaboration.federated_trainer import FederatedTrainingError, SecureAggregator
+from src.data_collaboration.flat_tensors import pack_state_dict
+
+def _update(value):
+    return {"layer.weight": torch.full((2, 3), float(value)), "layer.bias": torch.full((3,), float(value))}
+
+def _aggregator(num_participants, **kwargs):
+    aggregator = SecureAggregator(num_participants=num_participants, **kwargs)
+    aggregator._decrypt_data = lambda data, participant_id: data
+    return aggregator
+
+def test_weighted_running_average():
+    aggregator = _aggregator(3)
+    aggregator.add_encrypted_weights(pack_state_dict(_update(1)), "p0", 10)
+    aggregator.add_encrypted_weights(pack_state_dict(_update(4)), "p1", 30)
+    averaged = aggregator.aggregate()
+    assert torch.allclose(averaged["layer.weight"], torch.full((2, 3), 3.25))
+    assert torch.allclose(averaged["layer.bias"], torch.full((3,), 3.25))
+
+def test_mismatched_update_is_rejected_without_side_effects():
+    aggregator = _aggregator(2)
+    aggregator.add_encrypted_weights(pack_state_dict(_update(2)), "p0")
+    bad = {"layer.weight": torch.zeros(3, 3), "layer.bias": torch.zeros(3)}
+    with pytest.raises(FederatedTrainingError):
+        aggregator.add_encrypted_weights(pack_state_dict(bad), "p1")
+    assert aggregator.total_weight == 1
+    assert aggregator.contributors == ["p0"]
+    assert torch.allclose(aggregator.aggregate()["layer.weight"], torch.full((2, 3), 2.0))
+
+def test_pooled_ingest_of_flat_payloads():
+    aggregator = _aggregator(4, workers=4)
+    submissions = [(pack_state_dict(_update(i)), f"p{i}", 1.0) for i in range(4)]
+    submissions.append((b"garbage", "p9", 1.0))
+    failures = aggregator.ingest(submissions)
+    aggregator.close()
+    assert list(failures) == ["p9"]
+    assert sorted(aggregator.contributors) == ["p0", "p1", "p2", "p3"]
+    assert torch.allclose(aggregator.aggregate()["layer.bias"], torch.full((3,), 1.5))
+
+def test_reset_rejects_updates_from_the_previous_round():
+    started, release = threading.Event(), threading.Event()
+    aggregator = SecureAggregator(num_participants=2, workers=1)
+
+    def slow_decrypt(data, participant_id):
+        started.set()
+        release.wait(5)
+        return data
+
+    aggregator._decrypt_data = slow_decrypt
+    in_progress = aggregator.submit_encrypted_weights(pack_state_dict(_update(1)), "p0")
+    queued = aggregator.submit_encrypted_weights(pack_state_dict(_update(2)), "p1")
+    assert started.wait(5)
+    aggregator.reset()
+    release.set()
+    with pytest.raises(FederatedTrainingError):
+        in_progress.result(5)
+    assert queued.cancelled()
+    aggregator.close()
+    assert aggregator.contributors == [] and aggregator.total_weight == 0
+
+def test_concurrent_uploads_share_one_pool(monkeypatch):
+    pools = []
+
+    class CountingPool(federated_trainer.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(federated_trainer, "ThreadPoolExecutor", CountingPool)
+    aggregator = _aggregator(8, workers=2)
+    barrier = threading.Barrier(8)
+
+    def upload(i):
+        barrier.wait()
+        aggregator.submit_encrypted_weights(pack_state_dict(_update(i)), f"p{i}")
+
+    handlers = [threading.Thread(target=upload, args=(i,)) for i in range(8)]
+    for t in handlers:
+        t.start()
+    for t in handlers:
+        t.join()
+    assert aggregator.wait_for_updates(timeout=5) == {}
+    aggregator.close()
+    assert len(pools) == 1
+    assert sorted(aggregator.contributors) == [f"p{i}" for i in range(8)]
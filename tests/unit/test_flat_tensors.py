@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from src.data_collaboration.flat_tensors import (
+    FlatTensorError, is_flat, load_flat, pack_state_dict, save_flat, unpack_state_dict
+)
+
+STATE = {
+    "conv.weight": np.arange(2 * 3 * 3, dtype=np.float32).reshape(2, 3, 3),
+    "conv.bias": np.array([0.5, -1.5], dtype=np.float64),
+    "bn.num_batches_tracked": np.array(7, dtype=np.int64),
+    "empty": np.zeros((0, 4), dtype=np.float16),
+}
+
+def test_round_trip_is_zero_copy_and_aligned():
+    payload = pack_state_dict(STATE)
+    assert is_flat(payload)
+    restored = unpack_state_dict(payload)
+    assert list(restored) == list(STATE)
+    for name, array in STATE.items():
+        assert restored[name].dtype == array.dtype
+        np.testing.assert_array_equal(restored[name], array)
+    weight = restored["conv.weight"]
+    assert not weight.flags.writeable and weight.base is not None
+    start = np.frombuffer(payload, dtype=np.uint8).ctypes.data
+    assert (weight.ctypes.data - start) % 64 == 0
+
+def test_memory_mapped_file(tmp_path):
+    path = tmp_path / "update.oaft"
+    save_flat(STATE, str(path))
+    restored = load_flat(str(path))
+    np.testing.assert_array_equal(restored["conv.weight"], STATE["conv.weight"])
+
+def test_truncated_payload_is_rejected():
+    payload = pack_state_dict(STATE)
+    with pytest.raises(FlatTensorError):
+        unpack_state_dict(payload[:100])
+    with pytest.raises(FlatTensorError):
+        unpack_state_dict(b"not a payload")
@@ -0,0 +1,65 @@
+from src.compliance_engine.ledger_cache import PeerSelector, QueryCache, written_keys
+
+def _read(cache, key, result, keys, immutable=False):
+    height = cache.begin_read()
+    return cache.put(key, result, height, keys, immutable)
+
+def test_block_writes_invalidate_only_matching_entries():
+    cache = QueryCache(max_staleness=2)
+    op1 = QueryCache.key("ch", "cc", "QueryOperation", ["op1"])
+    op2 = QueryCache.key("ch", "cc", "QueryOperation", ["op2"])
+    audit = QueryCache.key("ch", "cc", "QueryOperation", ["op3"])
+    _read(cache, op1, {"id": "op1"}, ["op1"])
+    _read(cache, op2, {"id": "op2"}, ["op2"])
+    _read(cache, audit, {"id": "op3"}, ["op3"], immutable=True)
+
+    assert cache.on_block(1, ["op1", "unrelated"]) == 1
+    assert cache.get(op1) == (False, None)
+    assert cache.get(op2) == (True, {"id": "op2"})
+
+    # Past max_staleness only the immutable audit record survives
+    cache.on_block(5, [])
+    assert cache.get(op2) == (False, None)
+    assert cache.get(audit) == (True, {"id": "op3"})
+
+def test_read_racing_a_block_is_not_stored():
+    cache = QueryCache()
+    key = QueryCache.key("ch", "cc", "QueryOperation", ["op1"])
+    height = cache.begin_read()
+    cache.on_block(1, ["op1"])
+    assert not cache.put(key, {"stale": True}, height, ["op1"])
+    assert cache.get(key) == (False, None)
+    assert _read(cache, key, {"fresh": True}, ["op1"])
+
+def test_selector_prefers_fast_healthy_peers():
+    selector = PeerSelector(["a", "b", "c"], cooldown=60)
+    selector.record_success("a", 0.030)
+    selector.record_success("b", 0.005)
+    assert selector.ranked()[:2] == ["c", "b"]  # unmeasured peers get probed first
+    selector.record_success("c", 0.050)
+    assert selector.choose() == "b"
+    selector.record_failure("b")
+    assert selector.ranked() == ["a", "c", "b"]
+
+def test_written_keys_skips_invalid_transactions():
+    def tx(*keys):
+        writes = [{"key": k} for k in keys]
+        return {"payload": {"data": {"actions": [{"payload": {"action": {"proposal_response_payload": {
+            "extension": {"results": {"ns_rwset": [{"rwset": {"writes": writes}}]}}}}}}]}}}
+
+    block = {"data": {"data": [tx("op1"), tx("op2", "op3")]},
+             "metadata": {"metadata": [None, None, [0, 11]]}}
+    assert written_keys(block) == ["op1"]
+
+def test_misses_are_not_cached():
+    cache = QueryCache()
+    key = QueryCache.key("ch", "cc", "QueryOperation", ["op1"])
+    assert not _read(cache, key, {"result": None}, ["op1"], immutable=True)
+    assert not _read(cache, key, {}, ["op1"], immutable=True)
+    bundle = QueryCache.key("ch", "cc", "QueryBundle", ["abc"])
+    height = cache.begin_read()
+    assert not cache.put(bundle, {"status": "pending"}, height, ["abc"], True,
+                         found=lambda result: result.get("root") == "abc")
+    assert cache.get(key) == (False, None) and cache.get(bundle) == (False, None)
+    assert _read(cache, key, {"id": "op1"}, ["op1"], immutable=True)
+    assert not cache._reads_in_flight
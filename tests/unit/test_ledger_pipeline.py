@@ -0,0 +1,95 @@
+import asyncio
+import os
+
+import pytest
+from src.compliance_engine.ledger_pipeline import CommitPipeline, LedgerError, SigningIdentityCache
+
+class MockPeer:
+    """Orders sent transactions and commits them in blocks of ``block_size``"""
+
+    def __init__(self, block_size=5, block_interval=0.005, invalid=()):
+        self.block_size = block_size
+        self.block_interval = block_interval
+        self.invalid = set(invalid)
+        self.pending = []
+        self.height = 0
+        self.max_uncommitted = 0
+        self.pipeline = None
+
+    async def send(self, fcn, args):
+        tx_id = f"tx-{args[0]}"
+        self.pending.append(tx_id)
+        self.max_uncommitted = max(self.max_uncommitted, self.pipeline.in_flight + 1)
+        return tx_id
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.block_interval)
+            block, self.pending = self.pending[:self.block_size], self.pending[self.block_size:]
+            if block:
+                self.height += 1
+                self.pipeline.on_block(self.height, [
+                    (tx, "MVCC_READ_CONFLICT" if tx in self.invalid else "VALID") for tx in block
+                ])
+
+@pytest.mark.asyncio
+async def test_pipeline_bounds_in_flight_and_resolves_on_commit():
+    peer = MockPeer(invalid={"tx-7"})
+    pipeline = peer.pipeline = CommitPipeline(peer.send, max_in_flight=8)
+    committer = asyncio.ensure_future(peer.run())
+    try:
+        futures = [await pipeline.submit("CreateOperation", [i]) for i in range(40)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+    finally:
+        committer.cancel()
+
+    assert peer.max_uncommitted <= 8
+    assert isinstance(results[7], LedgerError)
+    committed = [r for i, r in enumerate(results) if i != 7]
+    assert [r["tx_id"] for r in committed] == [f"tx-{i}" for i in range(40) if i != 7]
+    assert all(r["validation_code"] == "VALID" for r in committed)
+    assert pipeline.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_uncommitted_transaction_times_out():
+    peer = MockPeer()
+    pipeline = peer.pipeline = CommitPipeline(peer.send, max_in_flight=2, commit_timeout=0.01)
+    future = await pipeline.submit("CreateOperation", [1])
+    with pytest.raises(LedgerError):
+        await future
+    assert pipeline.in_flight == 0
+
+def test_identity_reloads_only_when_files_change(tmp_path):
+    msp = tmp_path / "users" / "auditor" / "msp"
+    (msp / "signcerts").mkdir(parents=True)
+    (msp / "keystore").mkdir()
+    cert = msp / "signcerts" / "auditorcert.pem"
+    cert.write_text("cert-1")
+    (msp / "keystore" / "a_sk").write_text("key-1")
+
+    cache = SigningIdentityCache(str(tmp_path), "auditor", lambda c, k: (c.read_text(), k.read_text()))
+    assert cache.get() == ("cert-1", "key-1")
+    assert cache.get() == ("cert-1", "key-1")
+    assert cache.loads == 1
+
+    cert.write_text("cert-2 rotated")
+    os.utime(cert, ns=(0, 10**18))
+    assert cache.get() == ("cert-2 rotated", "key-1")
+    assert cache.loads == 2
+
+@pytest.mark.asyncio
+async def test_early_commit_survives_foreign_transactions():
+    async def send(fcn, args):
+        # Our commit event lands while the send is still returning
+        pipeline.on_block(50, [("tx-ours", "VALID")])
+        return "tx-ours"
+
+    pipeline = CommitPipeline(send, max_in_flight=2, commit_timeout=0.5, early_commit_blocks=3)
+    for height in range(1, 50):
+        pipeline.on_block(height, [(f"foreign-{height}-{i}", "VALID") for i in range(10)])
+    assert len(pipeline._early) <= 8
+
+    future = await pipeline.submit("CreateOperation", [1])
+    result = await asyncio.wait_for(future, 0.1)
+    assert result["block_number"] == 50
+    assert "tx-ours" not in pipeline._early
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from src.compliance_engine.merkle_batch import (
+    BatchRecorder, MerkleTree, OperationReceipt, canonical_operation, verify_inclusion
+)
+
+@pytest.mark.parametrize("size", [1, 2, 5, 8, 13])
+def test_every_leaf_proves_inclusion(size):
+    leaves = [b"op-%d" % i for i in range(size)]
+    tree = MerkleTree(leaves)
+    root = tree.root.hex()
+    for i, leaf in enumerate(leaves):
+        assert verify_inclusion(leaf, tree.proof(i), root)
+    assert not verify_inclusion(b"forged", tree.proof(0), root)
+
+@pytest.mark.asyncio
+async def test_recorder_bundles_operations_into_one_submission():
+    submitted = []
+
+    async def submit(root, operations):
+        submitted.append((root, operations))
+        return {"tx_id": f"tx{len(submitted)}", "block_number": 7, "validation_code": "VALID"}
+
+    recorder = BatchRecorder(submit, max_batch=4, max_delay=0.01)
+    operations = [{"operation_id": f"op{i}", "kind": "allocate"} for i in range(6)]
+    receipts = await asyncio.gather(*(recorder.record(op) for op in operations))
+
+    # One full bundle of four, then the remaining two on the timer
+    assert [len(ops) for _, ops in submitted] == [4, 2]
+    assert [r.tx_id for r in receipts] == ["tx1"] * 4 + ["tx2"] * 2
+    for receipt, operation in zip(receipts, operations):
+        restored = OperationReceipt.from_dict(receipt.to_dict())
+        assert restored.operation_id == operation["operation_id"] and restored.verify()
+    tampered = OperationReceipt.from_dict(receipts[0].to_dict())
+    tampered.operation["kind"] = "release"
+    assert not tampered.verify()
+    assert canonical_operation({"b": 1, "a": 2}) == b'{"a":2,"b":1}'
+
+@pytest.mark.asyncio
+async def test_failed_submission_reaches_every_caller():
+    async def submit(root, operations):
+        raise RuntimeError("peer unavailable")
+
+    recorder = BatchRecorder(submit, max_batch=2)
+    results = await asyncio.gather(*(recorder.record({"operation_id": i}) for i in range(2)),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,148 @@
+import json
+
+import pytest
+from jsonpath_ng import parse
+from src.compliance_engine.policy_enforcer import (
+    PolicyEnforcer, PolicySyntaxError, _lookup_keys, _simple_path_keys
+)
+
+POLICIES = {"policies": [
+    {"id": "pii-region", "description": "PII stays in the EU", "severity": "high",
+     "conditions": [{"type": "jsonpath", "jsonpath": "$.data.region", "operator": "equals", "value": "eu"}]},
+    {"id": "retention", "description": "Retention is set", "severity": "medium",
+     "conditions": [{"type": "jsonpath", "jsonpath": "$.data.retention_days", "operator": "equals", "value": 30}]},
+    {"id": "tags", "description": "Tagged for audit", "severity": "low",
+     "conditions": [{"type": "jsonpath", "jsonpath": "$.tags[*]", "operator": "contains", "value": "audit"}]},
+    {"id": "requester", "description": "Internal requester", "severity": "low",
+     "conditions": [{"type": "regex", "field": "user", "pattern": r"^svc-\d+$"},
+                    {"type": "custom_logic"}]},
+]}
+
+@pytest.fixture
+def enforcer(tmp_path):
+    path = tmp_path / "policies.json"
+    path.write_text(json.dumps(POLICIES))
+    return PolicyEnforcer(str(path))
+
+def test_compliant_request_is_approved(enforcer):
+    request = {"data": {"region": "eu", "retention_days": 30}, "tags": ["ops", "audit-2024"], "user": "svc-42"}
+    assert enforcer.evaluate_request(request) == {"approved": True, "violations": []}
+
+def test_violations_match_original_semantics(enforcer):
+    request = {"data": {"region": "us", "retention_days": "30"}, "tags": [], "user": 7}
+    result = enforcer.evaluate_request(request)
+    assert not result["approved"]
+    assert [v["policy_id"] for v in result["violations"]] == ["pii-region", "tags", "requester"]
+
+def test_unknown_types_never_pass_and_bad_regex_is_rejected(tmp_path):
+    enforcer = PolicyEnforcer()
+    enforcer.policies = [{"id": "x", "description": "", "severity": "low",
+                          "conditions": [{"type": "sql", "query": "select 1"}]}]
+    assert not enforcer.evaluate_request({})["approved"]
+
+    bad = {"policies": [{"id": "r", "description": "", "severity": "low",
+                         "conditions": [{"type": "regex", "field": "f", "pattern": "("}]}]}
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps(bad))
+    with pytest.raises(PolicySyntaxError):
+        PolicyEnforcer(str(path))
+
+@pytest.mark.parametrize("path, doc", [
+    ("$.a.b", {"a": {"b": None}}),
+    ("a.b", {"a": [{"b": 1}]}),
+    ("$.a.b", {"a": {"c": 1}}),
+    ("$.a", {"a": [1, 2]}),
+    ("a.b", {"a": "text"}),
+    ("a", [1]),
+])
+def test_direct_key_access_matches_jsonpath(path, doc):
+    keys = _simple_path_keys(path)
+    assert keys is not None
+    assert list(_lookup_keys(keys, doc)) == [m.value for m in parse(path).find(doc)]
+
+def test_indexed_evaluation_matches_full_scan(enforcer):
+    enforcer.always_evaluate = {"retention"}
+    assert enforcer.policy_index.always == [1]
+    requests = [
+        {}, {"user": "svc-1"}, {"data": {"region": "eu"}}, {"tags": ["audit"], "user": "bob"},
+        {"data": None, "tags": "audit", "user": None},
+    ]
+    for request in requests:
+        full = [c.policy_id for c in enforcer.evaluation_plan if not all(check(request) for check in c.checks)]
+        indexed = [v["policy_id"] for v in enforcer.evaluate_request(request)["violations"]]
+        assert indexed == full
+
+def test_batch_matches_single_request_evaluation(enforcer):
+    requests = [
+        {"data": {"region": "eu", "retention_days": 30}, "tags": ["audit"], "user": "svc-1"},
+        {"data": {"region": "us", "retention_days": "30"}, "user": 7},
+        {}, {"data": None, "tags": "audit", "user": None}, ["not", "a", "dict"],
+    ]
+    batch = enforcer.evaluate_batch(requests, chunk_size=2)
+    expected = [[v["policy_id"] for v in enforcer.evaluate_request(r)["violations"]] for r in requests]
+    assert batch.violations == expected
+    assert batch.approved == sum(1 for ids in expected if not ids)
+    assert batch.counts["pii-region"] == sum("pii-region" in ids for ids in expected)
+
+def test_batch_process_pool_sharding(enforcer):
+    requests = [{"data": {"region": "eu" if i % 3 else "us", "retention_days": 30},
+                 "tags": ["audit"], "user": f"svc-{i}"} for i in range(50)]
+    serial = enforcer.evaluate_batch(requests, chunk_size=8)
+    sharded = enforcer.evaluate_batch(requests, workers=2, chunk_size=8)
+    assert sharded.violations == serial.violations
+    assert sharded.counts == serial.counts
+
+def test_decision_cache_is_keyed_on_policy_version(tmp_path):
+    policies = {"policies": POLICIES["policies"][:3]}
+    path = tmp_path / "policies.json"
+    path.write_text(json.dumps(policies))
+    enforcer = PolicyEnforcer(str(path), decision_cache_size=16)
+    request = {"data": {"retention_days": 30, "region": "us"}, "tags": ["audit"], "trace_id": "a"}
+
+    first = enforcer.evaluate_request(request)
+    repeat = enforcer.evaluate_request(dict(request, trace_id="b"))
+    assert repeat == first
+    assert enforcer.decision_cache.hits == 1
+
+    policies["policies"][0]["conditions"][0]["value"] = "us"
+    path.write_text(json.dumps(policies))
+    version = enforcer.policy_version
+    enforcer.load_policies(str(path))
+    assert enforcer.policy_version > version
+    assert enforcer.evaluate_request(request)["approved"]
+    assert enforcer.decision_cache.hits == 1
+
+def test_custom_logic_disables_decision_cache(enforcer):
+    assert enforcer._snapshot.relevant_keys is None
+    assert enforcer._decision_key(enforcer._snapshot, {"user": "svc-1"}) is None
+
+def test_watch_swaps_snapshot_and_survives_bad_file(tmp_path):
+    import time
+    path = tmp_path / "policies.json"
+    path.write_text(json.dumps({"policies": POLICIES["policies"][:1]}))
+    enforcer = PolicyEnforcer(str(path))
+    enforcer.watch_policies(str(path), interval=0.01)
+    try:
+        time.sleep(0.05)
+        path.write_text(json.dumps(POLICIES))
+        deadline = time.time() + 2
+        while len(enforcer.policies) != 4 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(enforcer.policies) == 4
+        path.write_text("{not json")
+        time.sleep(0.1)
+        assert len(enforcer.evaluation_plan) == 4
+    finally:
+        enforcer.stop_watching()
+
+def test_policy_changes_go_through_public_api(enforcer):
+    with pytest.raises(AttributeError):
+        enforcer.policies.append({})
+    version = enforcer.policy_version
+    enforcer.add_policy({"id": "deny-guest", "description": "", "severity": "low",
+                         "conditions": [{"type": "equals", "field": "$.user", "value": "guest"}]})
+    assert enforcer.policy_version > version
+    assert enforcer.policies[-1]["id"] == "deny-guest"
+    assert "deny-guest" in [v["policy_id"] for v in enforcer.evaluate_request({"user": "guest"})["violations"]]
+    with pytest.raises(PolicySyntaxError):
+        enforcer.add_policy({"id": "incomplete"})
@@ -1,6 +1,9 @@
 # tests/unit/test_resource_allocator.py
+import sys
+import threading
+
 import pytest
-from src.agent_management.resource_allocator import ResourceAllocator
+from src.agent_management.resource_allocator import ResourceAllocator, ResourceType
 
 @pytest.fixture
 def allocator():
@@ -24,3 +27,86 @@ def test_allocation_rejection(allocator):
         requirements={"cpu": 2, "memory": 4096}
     )
     assert allocation.status == "DENIED"
+
+@pytest.fixture
+def cluster():
+    alloc = ResourceAllocator()
+    for i in range(100):
+        alloc.register_node(f"node{i:03d}", {ResourceType.CPU: 8.0, ResourceType.MEMORY: 32.0})
+    return alloc
+
+def test_bin_packing_prefers_fittest_node(cluster):
+    cluster.allocate_resources({ResourceType.CPU: 6.0})
+    placement = cluster.allocate_resources({ResourceType.CPU: 4.0, ResourceType.MEMORY: 8.0})
+    assert placement == [("node001", {ResourceType.CPU: 4.0, ResourceType.MEMORY: 8.0})]
+
+def test_bin_packing_spans_nodes_when_no_single_fit(cluster):
+    placement = cluster.allocate_resources({ResourceType.CPU: 12.0})
+    assert [node_id for node_id, _ in placement] == ["node000", "node001"]
+    assert cluster.get_node_utilization("node001")[ResourceType.CPU] == 0.5
+
+def test_release_restores_index(cluster):
+    cluster.allocate_resources({ResourceType.CPU: 8.0})
+    cluster.release_resources("node000", {ResourceType.CPU: 8.0})
+    assert cluster.index.max_free(ResourceType.CPU) == 8.0
+    assert cluster.index.first_fit(ResourceType.CPU, 8.0) == "node000"
+
+def test_spread_picks_least_loaded(cluster):
+    cluster.allocate_resources({ResourceType.CPU: 2.0})
+    cluster.set_allocation_strategy("spread")
+    placement = cluster.allocate_resources({ResourceType.CPU: 2.0})
+    assert placement[0][0] == "node001"
+
+def test_allocate_batch_first_fit_decreasing(cluster):
+    wave = [{ResourceType.CPU: 2.0}] * 8 + [{ResourceType.CPU: 6.0}] * 2
+    result = cluster.allocate_batch(wave, heuristic="first_fit")
+    assert not result.rejected
+    assert [p[0] for p in result.placements[8:]] == ["node000", "node001"]
+    assert result.placements[0][0] == "node000"
+    assert 0.0 <= result.fragmentation < 1.0
+
+def test_allocate_batch_all_or_nothing_commits_nothing(cluster):
+    wave = [{ResourceType.CPU: 8.0}] * 101
+    with pytest.raises(RuntimeError):
+        cluster.allocate_batch(wave, all_or_nothing=True)
+    assert cluster.index.allocated.sum() == 0.0
+
+def test_allocate_batch_best_effort_reports_rejections(cluster):
+    wave = [{ResourceType.CPU: 8.0}] * 101
+    result = cluster.allocate_batch(wave)
+    assert len(result.rejected) == 1
+    assert result.placements[result.rejected[0]] is None
+
+@pytest.mark.parametrize("strategy", ["bin_packing", "spread", "random"])
+def test_allocation_while_nodes_register(strategy):
+    alloc = ResourceAllocator(allocation_strategy=strategy)
+    alloc.register_node("seed", {ResourceType.CPU: 1e6, ResourceType.MEMORY: 1e6})
+    errors = []
+    registering = threading.Event()
+    registering.set()
+
+    def register():
+        for i in range(2000):
+            alloc.register_node(f"n{i}", {ResourceType.CPU: 4.0, ResourceType.MEMORY: 8.0})
+        registering.clear()
+
+    def place():
+        while registering.is_set():
+            try:
+                alloc.allocate_resources({ResourceType.CPU: 0.01})
+                alloc.allocate_batch([{ResourceType.CPU: 0.01}])
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=register)] + [threading.Thread(target=place) for _ in range(2)]
+    # Switch threads often so registrations land between a query's reads
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
@@ -1,3 +1,8 @@
+import json
+import threading
+import time
+
+import numpy as np
 import pytest
 from src.agent_management.swarm_engine import SwarmOrchestrator, AgentState
 
@@ -21,3 +26,140 @@ def test_swarm_optimization():
     
     assert len(optimal_agents) <= 15  # 5 tasks x 3 agents
     assert all(a in orchestrator.agent_registry for a in optimal_agents)
+
+@pytest.fixture
+def topology_file(tmp_path):
+    path = tmp_path / "topology.json"
+    path.write_text(json.dumps({"nodes": [{"id": f"node{i}", "capacity": 10 + i} for i in range(40)]}))
+    return str(path)
+
+def test_allocate_task_picks_roomiest_node(topology_file):
+    orchestrator = SwarmOrchestrator(topology_file, shards=4)
+    assert orchestrator.allocate_task({"requirements": 5}) == ["node39"]
+    assert orchestrator.allocate_task({"requirements": 46}) == ["node38"]
+    assert orchestrator.allocate_task({"requirements": 5}) == ["node37"]
+
+def test_allocate_task_spans_and_rolls_back(topology_file):
+    orchestrator = SwarmOrchestrator(topology_file, shards=4)
+    assert orchestrator.allocate_task({"requirements": 90}) == ["node39", "node38"]
+    with pytest.raises(RuntimeError):
+        orchestrator.allocate_task({"requirements": 10_000})
+    assert sum(n.load for n in orchestrator.nodes.values()) == 90
+
+def test_concurrent_submissions_and_release(topology_file):
+    orchestrator = SwarmOrchestrator(topology_file, shards=4)
+    futures = [orchestrator.submit_task({"requirements": 3}) for _ in range(200)]
+    placed = [f.result() for f in futures]
+    assert sum(n.load for n in orchestrator.nodes.values()) == 600
+    orchestrator.release_resources([nid for nodes in placed for nid in nodes])
+    assert all(n.load == 0 for n in orchestrator.nodes.values())
+
+def test_streaming_parser_small_chunks(topology_file):
+    from src.agent_management.swarm_engine import iter_topology_nodes
+    nodes = list(iter_topology_nodes(topology_file, chunk_size=7))
+    assert [n["id"] for n in nodes] == [f"node{i}" for i in range(40)]
+
+def test_reload_keeps_load_and_applies_changes(topology_file, tmp_path):
+    orchestrator = SwarmOrchestrator(topology_file, shards=4)
+    orchestrator.allocate_task({"requirements": 5})
+
+    updated = tmp_path / "updated.json"
+    nodes = [{"id": f"node{i}", "capacity": 10 + i} for i in range(1, 40)] + [{"id": "edge0", "capacity": 100}]
+    updated.write_text(json.dumps({"version": 2, "nodes": nodes}))
+    orchestrator.load_topology(str(updated))
+
+    assert "node0" not in orchestrator.nodes
+    assert orchestrator.nodes["node39"].load == 5
+    assert orchestrator.allocate_task({"requirements": 60}) == ["edge0"]
+
+def test_apply_topology_diff(topology_file):
+    orchestrator = SwarmOrchestrator(topology_file, shards=4)
+    counts = orchestrator.apply_topology_diff({
+        "add": [{"id": "big", "capacity": 440}],
+        "resize": [{"id": "node39", "capacity": 1}],
+        "remove": ["node38"]
+    })
+    assert counts == {"add": 1, "resize": 1, "remove": 1}
+    assert orchestrator.allocate_task({"requirements": 400}) == ["big"]
+    assert orchestrator.allocate_task({"requirements": 47}) == ["node37"]
+
+def test_redistribute_tasks_batch_respects_capacity():
+    orchestrator = SwarmOrchestrator()
+    for i, capacity in enumerate([2, 2, 3, 1]):
+        orchestrator.register_agent(AgentState(f"agent_{i}", cpu_usage=0.1 * i, memory=1024, task_capacity=capacity))
+    for task in range(4):
+        orchestrator.assign_task(f"t{task}", f"agent_{task % 2}")
+    orchestrator.assign_task("t4", "agent_2")
+
+    placed = orchestrator.redistribute_tasks_batch(["agent_0", "agent_1"])
+    assert sorted(placed) == ["t0", "t1", "t2", "t3"]
+    assert len(orchestrator.agent_tasks["agent_2"]) == 3
+    assert len(orchestrator.agent_tasks["agent_3"]) == 1
+    assert len(orchestrator.unassigned_tasks) == 1
+    assert "agent_0" not in orchestrator.agent_tasks
+
+    # A recovered agent takes the leftover on the next redistribution
+    orchestrator.register_agent(AgentState("agent_0", cpu_usage=0.0, memory=1024, task_capacity=2))
+    assert orchestrator.redistribute_tasks("agent_3") != {}
+    assert orchestrator.unassigned_tasks == []
+    assert len(orchestrator.agent_tasks["agent_0"]) == 2
+
+def test_redistribution_spreads_across_survivors():
+    orchestrator = SwarmOrchestrator()
+    for i in range(5):
+        orchestrator.register_agent(AgentState(f"a{i}", cpu_usage=0.1 + 0.01 * i, memory=1024, task_capacity=10))
+    for task in range(8):
+        orchestrator.assign_task(f"t{task}", "a0")
+    orchestrator.assign_task("busy", "a1")
+
+    orchestrator.redistribute_tasks_batch(["a0"])
+    counts = {agent_id: len(tasks) for agent_id, tasks in orchestrator.agent_tasks.items()}
+    assert counts == {"a1": 3, "a2": 2, "a3": 2, "a4": 2}
+
+def test_reinstated_agent_takes_waiting_tasks():
+    orchestrator = SwarmOrchestrator()
+    for i in range(2):
+        orchestrator.register_agent(AgentState(f"a{i}", cpu_usage=0.1, memory=1024, task_capacity=1))
+        orchestrator.assign_task(f"t{i}", f"a{i}")
+    orchestrator.redistribute_tasks("a0")
+    assert orchestrator.unassigned_tasks == ["t0"]
+
+    assert orchestrator.reinstate_agent("a0") == {"t0": "a0"}
+    assert "a0" not in orchestrator.unavailable_agents
+
+def test_streaming_parser_ignores_nested_nodes_key(tmp_path):
+    from src.agent_management.swarm_engine import iter_topology_nodes
+    path = tmp_path / "nested.json"
+    path.write_text(json.dumps({
+        "meta": {"nodes": [{"id": "decoy", "capacity": 1}], "count": 12345},
+        "version": 3,
+        "nodes": [{"id": "real", "capacity": 5}]
+    }))
+    for chunk_size in (3, 7, 1 << 16):
+        assert [n["id"] for n in iter_topology_nodes(str(path), chunk_size=chunk_size)] == ["real"]
+
+def test_watch_topology_applies_file_changes(topology_file, monkeypatch):
+    orchestrator = SwarmOrchestrator(topology_file, shards=4)
+    applied = threading.Event()
+    diffs = []
+    apply = orchestrator.apply_topology_diff
+
+    def record(diff):
+        diffs.append(diff)
+        counts = apply(diff)
+        applied.set()
+        return counts
+
+    monkeypatch.setattr(orchestrator, "apply_topology_diff", record)
+    thread = orchestrator.watch_topology(topology_file, interval=0.01)
+    try:
+        time.sleep(0.05)
+        nodes = [{"id": f"node{i}", "capacity": 10 + i} for i in range(1, 40)] + [{"id": "edge0", "capacity": 99}]
+        with open(topology_file, "w") as f:
+            json.dump({"nodes": nodes}, f)
+        assert applied.wait(5)
+    finally:
+        orchestrator.shutdown()
+    assert not thread.is_alive()
+    assert diffs[0] == {"add": [{"id": "edge0", "capacity": 99}], "resize": [], "remove": ["node0"]}
+    assert "edge0" in orchestrator.nodes and "node0" not in orchestrator.nodes
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from src.compliance_engine import zkp_prover
+from src.compliance_engine.ec_arithmetic import (
+    curve_params, multi_scalar_mult, scalar_mult, to_affine
+)
+from src.compliance_engine.zkp_prover import ZKPProtocolError, ZKPProver, ZKPVerifier
+
+@pytest.fixture(scope="module")
+def prover():
+    return ZKPProver()
+
+def test_proof_round_trip(prover):
+    proof = prover.generate_proof(b"witness", b"ctx")
+    verifier = ZKPVerifier(prover.public_key)
+    assert verifier.verify(proof, b"witness", b"ctx")
+    assert not verifier.verify(proof, b"witness", b"other")
+    assert prover.verify_proof(proof, b"witness", b"ctx")
+    with pytest.raises(ZKPProtocolError):
+        verifier.verify(proof[:10], b"witness")
+
+def test_verifier_does_not_generate_keys(prover, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("verifier generated a key")
+    monkeypatch.setattr(zkp_prover.ec, "generate_private_key", fail)
+    verifier = ZKPVerifier(prover.public_key)
+    assert verifier.verify_batch([], []) == []
+
+def test_multi_scalar_mult_matches_separate_mults():
+    params = curve_params(ec.SECP256R1())
+    points = [to_affine(scalar_mult(k, params.generator, params), params) for k in range(2, 42)]
+    scalars = [(k * 0x9e3779b97f4a7c15) % params.n for k in range(40)]
+    expected = (sum(s * k for s, k in zip(scalars, range(2, 42)))) % params.n
+    assert to_affine(multi_scalar_mult(scalars, points, params), params) == \
+        to_affine(scalar_mult(expected, params.generator, params), params)
+
+def test_batch_isolates_bad_proofs(prover):
+    witnesses = [b"w%d" % i for i in range(40)]
+    proofs = [prover.generate_proof(w) for w in witnesses]
+    verifier = ZKPVerifier(prover.public_key)
+    assert verifier.verify_batch(proofs, witnesses) == [True] * 40
+
+    proofs[3] = proofs[4]
+    proofs[25] = proofs[25][:-1] + bytes([proofs[25][-1] ^ 1])
+    proofs[30] = b"\x02" * 5
+    results = verifier.verify_batch(proofs, witnesses)
+    assert [i for i, ok in enumerate(results) if not ok] == [3, 25, 30]
+
+def test_generate_proofs_streams_in_order(prover):
+    witnesses = [b"w%d" % i for i in range(50)]
+    contexts = [b"c%d" % i for i in range(50)]
+    prover.precompute_commitments(3)
+    streamed = list(prover.generate_proofs(witnesses, contexts, chunk_size=16))
+    pooled = list(prover.generate_proofs(witnesses, contexts, workers=2, chunk_size=16))
+    assert not prover._commitments
+    verifier = ZKPVerifier(prover.public_key)
+    assert all(verifier.verify_batch(streamed, witnesses, contexts))
+    assert all(verifier.verify_batch(pooled, witnesses, contexts))
+    assert len({proof[:33] for proof in streamed + pooled}) == 100
+
+def test_generate_proofs_rejects_mismatched_contexts(prover):
+    with pytest.raises(ValueError):
+        list(prover.generate_proofs([b"a", b"b", b"c"], [b"x", b"y"]))
+
+def test_background_precompute_refills_stock():
+    prover = ZKPProver()
+    prover.start_precompute(low_water=4, target=8)
+    try:
+        deadline = time.monotonic() + 5
+        while len(prover._commitments) < 8 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(prover._commitments) == 8
+        for _ in range(6):
+            prover.generate_proof(b"w")
+        while len(prover._commitments) < 8 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(prover._commitments) == 8
+    finally:
+        prover.stop_precompute()
+    assert prover._refill_thread is None